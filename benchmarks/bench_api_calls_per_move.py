@@ -0,0 +1,96 @@
+"""
+Количество вызовов Bot API на один ход для режимов интерфейса reply и edit.
+
+reply - на каждый ход удаляются старые сообщения и отправляются новые,
+edit - редактируется одно сообщение со статусом игры.
+
+Запуск:
+    python -m benchmarks.bench_api_calls_per_move [число ходов]
+"""
+import asyncio
+import itertools
+import os
+
+os.environ.setdefault('TOKEN', '0:benchmark')
+# Лимиты Telegram не применяются к фейковому Bot API.
+os.environ.setdefault('OUTBOUND_GLOBAL_RATE', '0')
+os.environ.setdefault('OUTBOUND_CHAT_RATE', '0')
+
+from telebot.types import Update  # noqa: E402
+
+from benchmarks.common import parse_sizes, print_table  # noqa: E402
+from benchmarks.fake_bot_api import (FakeBotApi,  # noqa: E402
+                                     make_message_update,
+                                     make_callback_update)
+import main as bot_main  # noqa: E402
+from message import (CREATE_ROOM_TEXT, BUTTON_START_GAME_TEXT,  # noqa: E402
+                     BUTTON_FORWARD, BUTTON_RIGHT, BUTTON_BACK, BUTTON_LEFT)
+
+MOVES = (100,)
+
+_ids = itertools.count(1)
+_chat_ids = itertools.count(2 * 10 ** 6)
+
+
+async def send_text(chat_id: int, text: str) -> None:
+    update = make_message_update(next(_ids), chat_id, next(_ids), text)
+    await bot_main.bot.process_new_updates([Update.de_json(update)])
+
+
+async def send_callback(chat_id: int, message_id: int, data: str) -> None:
+    update = make_callback_update(next(_ids), chat_id, message_id, data)
+    await bot_main.bot.process_new_updates([Update.de_json(update)])
+
+
+async def run_mode(api: FakeBotApi, mode: str, moves: int) -> dict:
+    """
+    Играет указанное число ходов в выбранном режиме.
+
+    Returns:
+        dict: вызовы Bot API по методам, сделанные во время ходов.
+    """
+    bot_main.GAME_UI_MODE = mode
+    chat_id = next(_chat_ids)
+    await send_text(chat_id, CREATE_ROOM_TEXT)
+    await send_text(chat_id, BUTTON_START_GAME_TEXT)
+    await bot_main.MESSAGE_CLEANER.drain()
+
+    calls_before = api.calls.copy()
+    directions = itertools.cycle((BUTTON_FORWARD, BUTTON_RIGHT, BUTTON_BACK,
+                                  BUTTON_LEFT))
+    for way in itertools.islice(directions, moves):
+        if mode == 'edit':
+            status_message_id = bot_main.status_messages[chat_id][0]
+            await send_callback(chat_id, status_message_id,
+                                bot_main.MOVE_CALLBACK_PREFIX + way)
+        else:
+            await send_text(chat_id, way)
+    await bot_main.MESSAGE_CLEANER.drain()
+    return dict(api.calls - calls_before)
+
+
+async def run(moves: int) -> None:
+    api = FakeBotApi(latency=0)
+    await api.start()
+    rows = []
+    try:
+        for mode in ('reply', 'edit'):
+            calls = await run_mode(api, mode, moves)
+            total = sum(calls.values())
+            details = ', '.join(f'{method}={count}'
+                                for method, count in sorted(calls.items()))
+            rows.append([mode, moves, total, f'{total / moves:.2f}',
+                         details])
+    finally:
+        await api.stop()
+    print_table(['mode', 'moves', 'api calls', 'calls/move', 'methods'],
+                rows)
+
+
+def main():
+    for moves in parse_sizes(MOVES):
+        asyncio.run(run(moves))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Бенчмарк расстановки эффектов MazeGame.arrange_effects.
+
+Время расстановки должно зависеть от количества эффектов, а не от размера
+лабиринта и не расти резко, когда свободных клеток становится мало.
+
+Запуск:
+    python -m benchmarks.bench_arrange_effects [количество ...]
+"""
+from benchmarks.common import measure, parse_sizes, print_table
+from game.compact_maze import CompactMaze
+from game.maze import MazeGame
+
+AMOUNTS = (1_000, 10_000, 50_000)
+MAZE_SIZE = 250
+
+
+def main():
+    rows = []
+    for amount in parse_sizes(AMOUNTS):
+        for repeat in (True, False):
+            # Эффекты ставятся на клетки без учёта стен, поэтому генерация
+            # лабиринта не нужна. Каждый запуск получает чистый лабиринт,
+            # созданный заранее, чтобы не замерять его создание.
+            maze_games = [MazeGame(MAZE_SIZE, maze_class=CompactMaze)
+                          for _ in range(3)]
+
+            def arrange():
+                maze_games.pop().arrange_effects(amount, repeat=repeat)
+
+            seconds = measure(arrange, repeat=3)
+            rows.append([f'{MAZE_SIZE}x{MAZE_SIZE}', amount, repeat,
+                         f'{seconds:.3f}', f'{seconds / amount * 1e6:.2f}'])
+    print_table(['size', 'effects', 'repeat', 'seconds', 'us/effect'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Бенчмарк взвешенной выборки эффектов (game.effect_distribution).
+
+Сравнивает время одной выборки эффекта при пачке из N выборок:
+равновероятный random.choice, random.choices с накопленными весами
+(двоичный поиск) и таблицу псевдонимов Уолкера. Последняя колонка -
+расстановка N эффектов MazeGame.arrange_effects с пресетом сложности.
+
+Запуск:
+    python -m benchmarks.bench_effect_sampling [количество ...]
+"""
+import random
+from itertools import accumulate
+
+from benchmarks.common import measure, parse_sizes, print_table
+from game.compact_maze import CompactMaze
+from game.effect_distribution import get_effect_distribution
+from game.effects import FactoryEffects
+from game.maze import MazeGame
+
+AMOUNTS = (1_000, 10_000, 100_000)
+MAZE_SIZE = 500
+PRESET = 'hard'
+
+
+def main():
+    effects = FactoryEffects.get_effects()
+    distribution = get_effect_distribution(PRESET)
+    cum_weights = list(accumulate(distribution.weights))
+    rng = random.Random(1)
+    rows = []
+    for amount in parse_sizes(AMOUNTS):
+        choice_seconds = measure(
+            lambda: [rng.choice(effects) for _ in range(amount)])
+        choices_seconds = measure(
+            lambda: rng.choices(distribution.effects,
+                                cum_weights=cum_weights, k=amount))
+        alias_seconds = measure(
+            lambda: distribution.sample_many(amount, rng))
+        maze_games = [MazeGame(MAZE_SIZE, maze_class=CompactMaze)
+                      for _ in range(3)]
+        arrange_seconds = measure(
+            lambda: maze_games.pop().arrange_effects(
+                amount, effect_weights=PRESET))
+        rows.append([amount] + [f'{seconds / amount * 1e9:.0f}' for seconds
+                                in (choice_seconds, choices_seconds,
+                                    alias_seconds)]
+                    + [f'{arrange_seconds:.3f}'])
+    print_table(['effects', 'choice ns', 'choices ns', 'alias ns',
+                 'arrange s'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Бенчмарк генерации лабиринта MazeGame.generate_maze.
+
+Показывает, что время генерации растёт линейно от числа клеток: время на
+одну клетку должно оставаться примерно постоянным от 10x10 до 1000x1000.
+
+Запуск:
+    python -m benchmarks.bench_generate_maze [размер ...]
+"""
+from benchmarks.common import measure, parse_sizes, print_table
+from game.maze import MazeGame
+
+SIZES = (10, 50, 100, 250, 500, 1000)
+
+
+def main():
+    rows = []
+    for size in parse_sizes(SIZES):
+        maze_game = None
+
+        def setup_and_generate():
+            nonlocal maze_game
+            maze_game = MazeGame(size)
+            maze_game.generate_maze()
+
+        # Большие лабиринты замеряем один раз, иначе бенчмарк идёт долго.
+        seconds = measure(setup_and_generate, repeat=3 if size <= 250 else 1)
+        cells = size * size
+        rows.append([f'{size}x{size}', cells, f'{seconds:.3f}',
+                     f'{seconds / cells * 1e6:.2f}'])
+        del maze_game
+    print_table(['size', 'cells', 'seconds', 'us/cell'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Бенчмарк алгоритмов генерации лабиринта (game.generators).
+
+Для каждого алгоритма и размера замеряет время генерации и пиковую
+дополнительную память алгоритма (tracemalloc, без памяти самого
+лабиринта). По таблице выбирается алгоритм для размера комнаты
+(config.MAZE_GENERATOR).
+
+Запуск:
+    python -m benchmarks.bench_generators [размер ...]
+"""
+import random
+import time
+import tracemalloc
+
+from benchmarks.common import parse_sizes, print_table
+from game.compact_maze import CompactMaze
+from game.generators import GENERATORS
+
+SIZES = (50, 200, 500)
+SEED = 1
+
+
+def _new_maze(size: int) -> CompactMaze:
+    maze = CompactMaze(size)
+    maze.generate()
+    return maze
+
+
+def main():
+    rows = []
+    for size in parse_sizes(SIZES):
+        for name, generator_class in GENERATORS.items():
+            generator = generator_class()
+            # Лабиринт создаётся до замера: время и память относятся только
+            # к алгоритму генерации.
+            maze = _new_maze(size)
+            start = time.perf_counter()
+            generator.generate(maze, random.Random(SEED))
+            seconds = time.perf_counter() - start
+
+            maze = _new_maze(size)
+            tracemalloc.start()
+            generator.generate(maze, random.Random(SEED))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            rows.append([f'{size}x{size}', name, f'{seconds * 1000:.1f}',
+                         f'{peak / 1024:.1f}'])
+    print_table(['size', 'generator', 'time ms', 'peak KiB'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Бенчмарк загрузки большого лабиринта из файла (game.maze_file).
+
+Для каждого размера открывает один файл лабиринта в ROOMS комнатах тремя
+способами: распаковка в CompactMaze (unpack_maze), чтение страницами
+(PagedMaze) и отображение в память (MappedMaze). Замеряет время открытия
+и память Python (tracemalloc) на все комнаты и время хода игрока.
+
+Запуск:
+    python -m benchmarks.bench_mapped_maze [размер ...]
+"""
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import parse_sizes, print_table
+from game.maze import MazeGame
+from game.maze_file import PagedMaze, MappedMaze, generate_maze_file
+from game.serialization import unpack_maze
+
+SIZES = (1000, 2000)
+ROOMS = 20
+MOVES = 20000
+SEED = 1
+
+
+def _read_and_unpack(path: str):
+    with open(path, 'rb') as file:
+        return unpack_maze(file.read())
+
+
+def main():
+    loaders = {
+        'unpack_maze': _read_and_unpack,
+        'PagedMaze': PagedMaze,
+        'MappedMaze': MappedMaze,
+    }
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'maze.ifmz')
+        for size in parse_sizes(SIZES):
+            generate_maze_file(path, size, SEED)
+            for name, loader in loaders.items():
+                tracemalloc.start()
+                start = time.perf_counter()
+                mazes = [loader(path) for _ in range(ROOMS)]
+                open_seconds = (time.perf_counter() - start) / ROOMS
+                memory = tracemalloc.get_traced_memory()[0]
+                tracemalloc.stop()
+
+                maze_game = MazeGame(maze=mazes[0].copy())
+                moves = (maze_game.move_forward, maze_game.move_right,
+                         maze_game.move_bottom, maze_game.move_left)
+                random_generator = random.Random(SEED)
+                start = time.perf_counter()
+                for _ in range(MOVES):
+                    random_generator.choice(moves)()
+                move_seconds = (time.perf_counter() - start) / MOVES
+                for maze in mazes:
+                    if hasattr(maze, 'close'):
+                        maze.close()
+                rows.append([f'{size}x{size}', name,
+                             f'{open_seconds * 1000:.2f}',
+                             f'{memory / ROOMS / 1024:.0f}',
+                             f'{move_seconds * 1e6:.1f}'])
+    print_table(['size', 'loader', 'open ms', 'KiB/room', 'move us'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Бенчмарк потоковой генерации лабиринта в файл (game.maze_file).
+
+Для каждого размера замеряет время generate_maze_file, пиковую память
+генерации (tracemalloc) и размер файла, затем время хода игрока по
+лабиринту PagedMaze и количество страниц, прочитанных с диска. Пиковая
+память должна расти пропорционально длине строки, а не числу клеток.
+
+Запуск:
+    python -m benchmarks.bench_maze_file [размер ...]
+"""
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import parse_sizes, print_table
+from game.maze import MazeGame
+from game.maze_file import PagedMaze, generate_maze_file
+
+SIZES = (500, 1000)
+MOVES = 20000
+SEED = 1
+
+
+def main():
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'maze.ifmz')
+        for size in parse_sizes(SIZES):
+            start = time.perf_counter()
+            generate_maze_file(path, size, SEED)
+            seconds = time.perf_counter() - start
+            # Память замеряется отдельным запуском: tracemalloc замедляет
+            # генерацию.
+            tracemalloc.start()
+            generate_maze_file(path, size, SEED)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            maze = PagedMaze(path)
+            maze_game = MazeGame(maze=maze)
+            moves = (maze_game.move_forward, maze_game.move_right,
+                     maze_game.move_bottom, maze_game.move_left)
+            random_generator = random.Random(SEED)
+            reads = 0
+            read_page = maze._read_page
+
+            def counted_read_page(page):
+                nonlocal reads
+                reads += 1
+                return read_page(page)
+
+            maze._read_page = counted_read_page
+            start = time.perf_counter()
+            for _ in range(MOVES):
+                random_generator.choice(moves)()
+            move_seconds = (time.perf_counter() - start) / MOVES
+            maze.close()
+            rows.append([f'{size}x{size}', f'{seconds:.2f}',
+                         f'{peak / 1024:.0f}',
+                         f'{os.path.getsize(path) / 2 ** 20:.2f}',
+                         f'{move_seconds * 1e6:.1f}', reads])
+    print_table(['size', 'generate s', 'peak KiB', 'file MiB', 'move us',
+                 'page reads'], rows)
+
+
+if __name__ == '__main__':
+    main()
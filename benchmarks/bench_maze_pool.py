@@ -0,0 +1,55 @@
+"""
+Бенчмарк пула готовых лабиринтов (game.maze_pool).
+
+Сравнивает время получения лабиринта для начала игры: генерация в
+обработчике против взятия готового лабиринта из пула, который пополняется
+фоновым потоком между запросами.
+
+Запуск:
+    python -m benchmarks.bench_maze_pool [размер ...]
+"""
+import time
+
+from benchmarks.common import parse_sizes, print_table
+from game.compact_maze import CompactMaze
+from game.maze_pool import MazePool
+
+SIZES = (5, 50, 150)
+EFFECTS = 15
+REQUESTS = 20
+CAPACITY = 4
+
+
+def main():
+    rows = []
+    for size in parse_sizes(SIZES):
+        pool = MazePool(capacity=CAPACITY, maze_class=CompactMaze)
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            pool.generate(size, EFFECTS)
+        inline = (time.perf_counter() - start) / REQUESTS
+
+        pool = MazePool(capacity=CAPACITY, maze_class=CompactMaze)
+        pool.reserve(size, EFFECTS)
+        pool.start()
+        wait_seconds = 0.0
+        for _ in range(REQUESTS):
+            # Запросы приходят реже, чем генерируется лабиринт, и пул
+            # успевает пополниться.
+            while pool.ready_count(size, EFFECTS) < CAPACITY:
+                time.sleep(0.001)
+            start = time.perf_counter()
+            pool.get(size, EFFECTS)
+            wait_seconds += time.perf_counter() - start
+        pool.stop()
+        stats = pool.stats()
+        rows.append([f'{size}x{size}', f'{inline * 1000:.2f}',
+                     f'{wait_seconds / REQUESTS * 1000:.3f}',
+                     f'{stats["hit_rate"]:.0%}',
+                     f'{stats["refill_latency_p95"] * 1000:.2f}'])
+    print_table(['size', 'inline ms', 'pool ms', 'hit rate',
+                 'refill p95 ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Бенчмарк накладных расходов метрик (runtime.metrics).
+
+Замеряет время вызова функции и корутины без обёртки, с обёрткой
+Metrics.timed при выключенных и включённых метриках, а также вызов
+обёрнутого MazeGame._check_move.
+
+Запуск:
+    python -m benchmarks.bench_metrics [количество вызовов ...]
+"""
+import asyncio
+
+from benchmarks.common import measure, parse_sizes, print_table
+from game.maze import MazeGame
+from runtime.metrics import Metrics
+
+CALLS = (100_000,)
+MAZE_SIZE = 50
+
+
+def run_calls(func, calls: int) -> float:
+    return measure(lambda: [func() for _ in range(calls)])
+
+
+def run_coroutines(func, calls: int) -> float:
+    async def run():
+        for _ in range(calls):
+            await func()
+
+    return measure(lambda: asyncio.run(run()))
+
+
+def main():
+    metrics = Metrics()
+
+    def handler():
+        return None
+
+    async def async_handler():
+        return None
+
+    maze_game = MazeGame(MAZE_SIZE)
+    maze_game.generate_maze()
+    rows = []
+    for calls in parse_sizes(CALLS):
+        check_move = type(maze_game)._check_move
+        timings = {
+            'plain': (run_calls(handler, calls),
+                      run_coroutines(async_handler, calls),
+                      run_calls(lambda: check_move(maze_game, 'top'),
+                                calls)),
+        }
+        wrapped = metrics.timed('handler')(handler)
+        async_wrapped = metrics.timed('async_handler')(async_handler)
+        metrics.instrument(MazeGame, ('_check_move',))
+        for enabled in (False, True):
+            metrics.enabled = enabled
+            timings['enabled' if enabled else 'disabled'] = (
+                run_calls(wrapped, calls),
+                run_coroutines(async_wrapped, calls),
+                run_calls(lambda: maze_game._check_move('top'), calls))
+        MazeGame._check_move = check_move
+        for name, seconds in timings.items():
+            rows.append([calls, name] + [f'{value / calls * 1e9:.0f}'
+                                         for value in seconds])
+    print_table(['calls', 'metrics', 'func ns', 'coroutine ns',
+                 '_check_move ns'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Бенчмарк поля расстояний (game.pathfinding).
+
+Для каждого размера замеряет построение поля расстояний от клетки выхода
+(один обход в ширину), запрос расстояния до выхода через
+MazeGame.get_distance_to_exit (поле и клетка выхода из кэша),
+восстановление пути от самой удалённой клетки и память поля.
+
+Запуск:
+    python -m benchmarks.bench_pathfinding [размер ...]
+"""
+import time
+
+from benchmarks.common import measure, parse_sizes, print_table
+from game.compact_maze import CompactMaze
+from game.maze import MazeGame
+from game.pathfinding import DistanceField, get_distance_field, \
+    get_wall_masks, get_win_index
+
+SIZES = (100, 500, 1000)
+QUERIES = 100000
+SEED = 1
+
+
+def main():
+    rows = []
+    for size in parse_sizes(SIZES):
+        maze_game = MazeGame(size, maze_class=CompactMaze, seed=SEED)
+        maze_game.generate_maze()
+        maze_game.arrange_effects(15)
+        maze = maze_game.get_maze()
+        masks = get_wall_masks(maze)
+        source = get_win_index(maze)
+        build_seconds = measure(
+            lambda: DistanceField(masks, size, source),
+            repeat=3 if size <= 500 else 1)
+
+        field = get_distance_field(maze, source)
+        start = time.perf_counter()
+        for _ in range(QUERIES):
+            maze_game.get_distance_to_exit()
+        query_seconds = (time.perf_counter() - start) / QUERIES
+
+        farthest, distance = field.farthest()
+        path_seconds = measure(lambda: field.path(farthest))
+        field_bytes = field.distances.itemsize * len(field.distances)
+        rows.append([f'{size}x{size}', f'{build_seconds * 1000:.1f}',
+                     f'{query_seconds * 1e6:.2f}', distance,
+                     f'{path_seconds * 1000:.2f}',
+                     f'{field_bytes / 2 ** 20:.1f}'])
+    print_table(['size', 'build ms', 'query us', 'longest path',
+                 'path ms', 'field MiB'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Бенчмарк хранилищ комнат: пропускная способность входа в комнату, ходов и
+выхода из комнаты для каждого хранилища.
+
+Запуск:
+    python -m benchmarks.bench_room_storage [количество участников ...]
+"""
+import os
+import tempfile
+import time
+
+from benchmarks.common import parse_sizes, print_table
+from database.rooms import RoomAggregator
+from database.storage import (NullRoomStorage, MemoryRoomStorage,
+                              SQLiteRoomStorage)
+
+PARTICIPANTS = (1_000, 10_000)
+PARTICIPANTS_PER_ROOM = 10
+MOVES_PER_PARTICIPANT = 20
+DIRECTIONS = ('top', 'right', 'bottom', 'left')
+
+
+def run(storage, participants: int) -> list[float]:
+    """
+    Прогоняет сценарий вход - ходы - выход и возвращает количество
+    операций в секунду для каждого этапа.
+    """
+    aggregator = RoomAggregator()
+    aggregator.set_storage(storage)
+    aggregator.load_rooms()
+    rooms = [aggregator.create_room()
+             for _ in range(participants // PARTICIPANTS_PER_ROOM)]
+    for room_number in rooms:
+        maze = aggregator.get_room(room_number).maze
+        maze.generate_maze()
+        maze.arrange_effects(15)
+        aggregator.save_room(room_number)
+
+    start = time.perf_counter()
+    for participant_id in range(participants):
+        aggregator.join_room_participant(
+            rooms[participant_id % len(rooms)], participant_id, 'name',
+            'surname')
+    storage.flush()
+    join_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    moves = 0
+    for step in range(MOVES_PER_PARTICIPANT):
+        direction = DIRECTIONS[step % len(DIRECTIONS)]
+        for participant_id in range(participants):
+            maze = aggregator.get_maze_by_participant_id(participant_id)
+            maze._move(direction)
+            aggregator.save_participant(participant_id)
+            moves += 1
+    storage.flush()
+    move_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for participant_id in range(participants):
+        aggregator.leave_room_participant(
+            rooms[participant_id % len(rooms)], participant_id)
+    storage.flush()
+    leave_seconds = time.perf_counter() - start
+
+    for room_number in rooms:
+        aggregator.remove_room(room_number)
+    storage.flush()
+    return [participants / join_seconds, moves / move_seconds,
+            participants / leave_seconds]
+
+
+def main():
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for participants in parse_sizes(PARTICIPANTS):
+            path = os.path.join(directory, f'rooms_{participants}.db')
+            backends = (
+                ('none', NullRoomStorage()),
+                ('memory', MemoryRoomStorage()),
+                ('sqlite', SQLiteRoomStorage(path)),
+                ('sqlite batch=1', SQLiteRoomStorage(path, batch_size=1)),
+            )
+            for name, storage in backends:
+                rates = run(storage, participants)
+                storage.close()
+                rows.append([name, participants,
+                             *(f'{rate:,.0f}' for rate in rates)])
+    print_table(['storage', 'participants', 'join/s', 'move/s', 'leave/s'],
+                rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Бенчмарк шардирования комнат по процессам (runtime.sharding).
+
+Фронт (этот процесс) раскладывает обновления по шардам тем же
+маршрутизатором, что и при polling. Каждый шард - отдельный процесс со
+своим ботом и своим фейковым Bot API без задержки, поэтому замеряется
+процессорная стоимость обработки обновлений. На машине с N ядрами число
+обновлений в секунду должно расти почти линейно до N шардов.
+
+Запуск:
+    python -m benchmarks.bench_sharding [количество шардов ...]
+"""
+import asyncio
+import itertools
+import os
+import time
+
+os.environ.setdefault('TOKEN', '0:benchmark')
+# Лимиты Telegram не применяются к фейковому Bot API.
+os.environ.setdefault('OUTBOUND_GLOBAL_RATE', '0')
+os.environ.setdefault('OUTBOUND_CHAT_RATE', '0')
+
+from benchmarks.common import parse_sizes, print_table  # noqa: E402
+from benchmarks.fake_bot_api import (FakeBotApi,  # noqa: E402
+                                     make_message_update)
+from message import (CREATE_ROOM_TEXT, BUTTON_START_GAME_TEXT,  # noqa: E402
+                     BUTTON_FORWARD, BUTTON_RIGHT, BUTTON_BACK, BUTTON_LEFT,
+                     JOIN_TO_ROOM_TEXT)
+from runtime.sharding import (ShardRouter, start_shards,  # noqa: E402
+                              stop_shards, serve_shard, EVENT_PROCESSED)
+
+SHARDS = (1, 2, 4)
+CHATS = 400
+MOVES = 20
+
+
+async def _serve_benchmark_shard(index, count, updates, events):
+    api = FakeBotApi(latency=0)
+    await api.start()
+    try:
+        await serve_shard(index, count, updates, events)
+    finally:
+        await api.stop()
+
+
+def run_benchmark_shard(index, count, updates, events):
+    asyncio.run(_serve_benchmark_shard(index, count, updates, events))
+
+
+def make_rounds(chats: int) -> list[list[dict]]:
+    """
+    Создаёт обновления сценария: каждый чат создаёт комнату, начинает игру и
+    делает MOVES ходов.
+    """
+    ids = itertools.count(1)
+    chat_ids = list(range(10 ** 6, 10 ** 6 + chats))
+    moves = itertools.cycle((BUTTON_FORWARD, BUTTON_RIGHT, BUTTON_BACK,
+                             BUTTON_LEFT))
+    texts = [BUTTON_START_GAME_TEXT, *itertools.islice(moves, MOVES)]
+    rounds = [[make_message_update(next(ids), chat_id, next(ids),
+                                   CREATE_ROOM_TEXT)
+               for chat_id in chat_ids]]
+    for text in texts:
+        rounds.append([make_message_update(next(ids), chat_id, next(ids),
+                                           text)
+                       for chat_id in chat_ids])
+    return rounds
+
+
+def wait_processed(events, router: ShardRouter, expected: int) -> None:
+    processed = 0
+    while processed < expected:
+        kind, shard, payload = events.get()
+        router.apply_event(kind, shard, payload)
+        if kind == EVENT_PROCESSED:
+            processed += payload
+
+
+def run(shards: int) -> tuple[int, float]:
+    processes, queues, events = start_shards(shards,
+                                             target=run_benchmark_shard)
+    router = ShardRouter(shards)
+    try:
+        # Прогрев: шарды импортируют бота и поднимают фейковый Bot API.
+        warmup = [make_message_update(0, chat_id, 0, JOIN_TO_ROOM_TEXT)
+                  for chat_id in range(shards)]
+        for shard, batch in router.route_batch(warmup).items():
+            queues[shard].put(batch)
+        wait_processed(events, router, len(warmup))
+
+        rounds = make_rounds(CHATS)
+        total = sum(len(updates) for updates in rounds)
+        start = time.perf_counter()
+        for updates in rounds:
+            router.apply_events(events)
+            for shard, batch in router.route_batch(updates).items():
+                queues[shard].put(batch)
+            # Ждём раунд целиком, чтобы фронт узнал о входе в комнаты до
+            # следующего раунда, как при живом polling.
+            wait_processed(events, router, len(updates))
+        seconds = time.perf_counter() - start
+    finally:
+        stop_shards(processes, queues)
+    return total, seconds
+
+
+def main():
+    print(f'Ядер процессора: {os.cpu_count()}')
+    rows = []
+    base_rate = None
+    for shards in parse_sizes(SHARDS):
+        updates, seconds = run(shards)
+        rate = updates / seconds
+        base_rate = base_rate or rate
+        rows.append([shards, updates, f'{seconds:.2f}', f'{rate:,.0f}',
+                     f'{rate / base_rate:.2f}x'])
+    print_table(['shards', 'updates', 'seconds', 'updates/s', 'speedup'],
+                rows)
+
+
+if __name__ == '__main__':
+    main()
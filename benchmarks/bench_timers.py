@@ -0,0 +1,115 @@
+"""
+Бенчмарк общего планировщика таймеров (runtime.timers).
+
+Для каждого количества активных игр замеряет постановку таймеров, перенос
+таймера на каждом ходу (MOVES ходов каждого игрока), память планировщика
+после всех ходов и время, за которое срабатывают все таймеры. Для
+сравнения те же таймеры ставятся отдельной задачей asyncio.sleep на
+каждого игрока.
+
+Запуск:
+    python -m benchmarks.bench_timers [количество таймеров ...]
+"""
+import asyncio
+import time
+import tracemalloc
+
+from benchmarks.common import parse_sizes, print_table
+from runtime.timers import TimerScheduler
+
+COUNTS = (1000, 10000, 50000)
+# Таймеры срабатывают в течение SPREAD секунд после DELAY.
+DELAY = 1.0
+SPREAD = 0.2
+# Количество переносов каждого таймера (ходов игрока).
+MOVES = 100
+
+
+async def run_scheduler(count: int) -> tuple[float, float, float, float]:
+    scheduler = TimerScheduler(clock=time.monotonic)
+    fired = 0
+
+    def expire(key):
+        nonlocal fired
+        fired += 1
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    now = time.monotonic()
+    for key in range(count):
+        scheduler.schedule(key, now + DELAY + SPREAD * key / count, expire)
+    schedule_seconds = time.perf_counter() - start
+
+    # Каждый ход переносит таймер участника. Отменённые записи не должны
+    # копиться в куче, поэтому память замеряется после всех ходов.
+    start = time.perf_counter()
+    for _ in range(MOVES):
+        now = time.monotonic()
+        for key in range(count):
+            scheduler.schedule(key, now + DELAY + SPREAD * key / count,
+                               expire)
+    move_seconds = (time.perf_counter() - start) / MOVES
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    while fired < count:
+        await asyncio.sleep(0.01)
+    late = time.monotonic() - (now + DELAY + SPREAD)
+    return schedule_seconds, move_seconds, memory, late
+
+
+async def run_tasks(count: int) -> tuple[float, float, float, float]:
+    fired = 0
+
+    async def expire(delay):
+        nonlocal fired
+        await asyncio.sleep(delay)
+        fired += 1
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    now = time.monotonic()
+    tasks = [asyncio.create_task(expire(DELAY + SPREAD * key / count))
+             for key in range(count)]
+    schedule_seconds = time.perf_counter() - start
+
+    # Перенос таймера задачи - отмена и новая задача.
+    move_seconds = 0.0
+    for _ in range(MOVES):
+        start = time.perf_counter()
+        now = time.monotonic()
+        for key in range(count):
+            tasks[key].cancel()
+            tasks[key] = asyncio.create_task(
+                expire(now + DELAY + SPREAD * key / count
+                       - time.monotonic()))
+        move_seconds += time.perf_counter() - start
+        # Отменённые задачи завершаются на следующей итерации цикла
+        # событий.
+        await asyncio.sleep(0)
+    move_seconds /= MOVES
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+    late = time.monotonic() - (now + DELAY + SPREAD)
+    return schedule_seconds, move_seconds, memory, late
+
+
+def main():
+    rows = []
+    for count in parse_sizes(COUNTS):
+        for name, run in (('heap', run_scheduler), ('tasks', run_tasks)):
+            schedule_seconds, move_seconds, memory, late = \
+                asyncio.run(run(count))
+            rows.append([count, name,
+                         f'{schedule_seconds / count * 1e6:.2f}',
+                         f'{move_seconds / count * 1e6:.2f}',
+                         f'{memory / count:.0f}',
+                         f'{late * 1000:.1f}'])
+    print_table(['timers', 'scheduler', 'schedule us', 'move us',
+                 'bytes/timer', 'late ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
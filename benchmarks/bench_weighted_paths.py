@@ -0,0 +1,76 @@
+"""
+Бенчмарк поиска пути с наименьшим временем (game.pathfinding).
+
+Для каждого размера замеряет построение массива смежности, алгоритм
+Дейкстры до всех клеток с индексной кучей (IndexedHeap) и с heapq с
+ленивым удалением устаревших записей, и A* от точки входа до выхода.
+
+Запуск:
+    python -m benchmarks.bench_weighted_paths [размер ...]
+"""
+import heapq
+from array import array
+
+from benchmarks.common import measure, parse_sizes, print_table
+from game.compact_maze import CompactMaze
+from game.maze import MazeGame
+from game.pathfinding import (Adjacency, INFINITE_TIME, find_fastest_paths,
+                              find_win_index, get_adjacency, get_cell_costs,
+                              get_wall_masks)
+
+SIZES = (100, 500, 1000)
+# Доля клеток с эффектами.
+EFFECTS_SHARE = 0.05
+SEED = 1
+
+
+def _heapq_dijkstra(adjacency: Adjacency, costs: array, source: int):
+    offsets, targets = adjacency.offsets, adjacency.targets
+    times = array('d', [INFINITE_TIME]) * len(costs)
+    times[source] = 0.0
+    queue = [(0.0, source)]
+    while queue:
+        time, index = heapq.heappop(queue)
+        if time > times[index]:
+            continue
+        for position in range(offsets[index], offsets[index + 1]):
+            neighbor = targets[position]
+            new_time = time + costs[neighbor]
+            if new_time < times[neighbor]:
+                times[neighbor] = new_time
+                heapq.heappush(queue, (new_time, neighbor))
+    return times
+
+
+def main():
+    rows = []
+    for size in parse_sizes(SIZES):
+        maze_game = MazeGame(size, maze_class=CompactMaze, seed=SEED)
+        maze_game.generate_maze()
+        maze_game.arrange_effects(int(size * size * EFFECTS_SHARE))
+        maze = maze_game.get_maze()
+        source = size // 2
+        repeat = 3 if size <= 500 else 1
+
+        masks = get_wall_masks(maze)
+        adjacency_seconds = measure(lambda: Adjacency(masks, size), repeat)
+        adjacency = get_adjacency(maze)
+        costs = get_cell_costs(maze)
+        dijkstra_seconds = measure(lambda: find_fastest_paths(maze, source),
+                                   repeat)
+        heapq_seconds = measure(
+            lambda: _heapq_dijkstra(adjacency, costs, source), repeat)
+        win_index = find_win_index(maze)
+        astar_seconds = measure(
+            lambda: find_fastest_paths(maze, source, win_index), repeat)
+        best_time = maze_game.get_best_game_time()
+        rows.append([f'{size}x{size}', f'{adjacency_seconds * 1000:.0f}',
+                     f'{dijkstra_seconds * 1000:.0f}',
+                     f'{heapq_seconds * 1000:.0f}',
+                     f'{astar_seconds * 1000:.0f}', f'{best_time:.1f}'])
+    print_table(['size', 'adjacency ms', 'dijkstra ms', 'heapq ms',
+                 'a* ms', 'best time'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Общие утилиты бенчмарков.
+
+Бенчмарки запускаются из корня репозитория как модули, например:
+    python -m benchmarks.bench_generate_maze
+"""
+import sys
+import time
+from typing import Callable, Iterable
+
+
+def measure(func: Callable[[], object], repeat: int = 3) -> float:
+    """
+    Замеряет время выполнения функции.
+
+    Args:
+        func: Callable (замеряемая функция без аргументов)
+        repeat: int (количество повторов)
+
+    Returns:
+        float: лучшее время одного запуска в секундах.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def parse_sizes(default: Iterable[int]) -> list[int]:
+    """
+    Получает размеры лабиринтов из аргументов командной строки.
+
+    Args:
+        default: Iterable[int] (размеры по умолчанию)
+
+    Returns:
+        list[int]: размеры лабиринтов.
+    """
+    if len(sys.argv) > 1:
+        return [int(size) for size in sys.argv[1:]]
+    return list(default)
+
+
+def print_table(header: list[str], rows: list[list]) -> None:
+    """
+    Печатает результаты бенчмарка в виде таблицы.
+
+    Args:
+        header: list[str] (заголовки колонок)
+        rows: list[list] (строки таблицы)
+    """
+    widths = [max(len(str(value)) for value in column)
+              for column in zip(header, *rows)]
+    for row in [header, *rows]:
+        print('  '.join(str(value).rjust(width)
+                        for value, width in zip(row, widths)))
@@ -0,0 +1,122 @@
+"""
+Локальный фейковый сервер Telegram Bot API для нагрузочных тестов.
+
+Отвечает на любые методы бота успешным результатом с заданной задержкой,
+имитирующей HTTP round-trip до Telegram, и считает количество вызовов
+каждого метода.
+"""
+import asyncio
+import time
+from collections import Counter
+
+from aiohttp import web
+from telebot import asyncio_helper
+
+
+class FakeBotApi:
+    """
+    Фейковый Bot API.
+
+    Fields:
+        latency: float (задержка ответа в секундах)
+        calls: Counter (количество вызовов по методам)
+    """
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.calls = Counter()
+        self._message_id = 0
+        self._runner = None
+        self._original_api_url = asyncio_helper.API_URL
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        self.calls[method] += 1
+        params = dict(await request.post()) or dict(request.query)
+        await asyncio.sleep(self.latency)
+        return web.json_response({'ok': True,
+                                  'result': self._result(method, params)})
+
+    def _result(self, method: str, params: dict):
+        if method in ('sendMessage', 'editMessageText'):
+            self._message_id += 1
+            chat_id = int(params.get('chat_id', 0))
+            return {
+                'message_id': int(params.get('message_id',
+                                             self._message_id)),
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'text': params.get('text', ''),
+            }
+        if method == 'getUpdates':
+            return []
+        return True
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> None:
+        """
+        Запускает сервер и направляет на него запросы telebot.
+        """
+        app = web.Application()
+        app.router.add_route('*', '/bot{token}/{method}', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        asyncio_helper.API_URL = f'http://{host}:{port}/bot{{0}}/{{1}}'
+
+    async def stop(self) -> None:
+        """
+        Останавливает сервер и возвращает адрес Telegram.
+        """
+        asyncio_helper.API_URL = self._original_api_url
+        session = asyncio_helper.session_manager.session
+        if session is not None:
+            await session.close()
+        await self._runner.cleanup()
+
+
+def make_message_update(update_id: int, chat_id: int, message_id: int,
+                        text: str) -> dict:
+    """
+    Создаёт JSON обновления с текстовым сообщением от пользователя.
+    """
+    chat = {'id': chat_id, 'type': 'private', 'first_name': f'P{chat_id}'}
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': chat,
+            'from': {'id': chat_id, 'is_bot': False,
+                     'first_name': f'P{chat_id}'},
+            'text': text,
+        },
+    }
+
+
+def make_callback_update(update_id: int, chat_id: int, message_id: int,
+                         data: str) -> dict:
+    """
+    Создаёт JSON обновления с нажатием inline-кнопки под сообщением бота.
+    """
+    user = {'id': chat_id, 'is_bot': False, 'first_name': f'P{chat_id}'}
+    return {
+        'update_id': update_id,
+        'callback_query': {
+            'id': str(update_id),
+            'from': user,
+            'chat_instance': str(chat_id),
+            'data': data,
+            'message': {
+                'message_id': message_id,
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'text': '',
+            },
+        },
+    }
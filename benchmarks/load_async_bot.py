@@ -0,0 +1,85 @@
+"""
+Нагрузочный тест асинхронного бота на локальном фейковом Bot API.
+
+Каждый чат создаёт комнату, начинает игру и делает несколько ходов.
+Обновления всех чатов обрабатываются одной пачкой, как при polling.
+Так как исходящие запросы не блокируют друг друга, пропускная способность
+(обновлений в секунду) растёт вместе с числом одновременных чатов.
+
+Запуск:
+    python -m benchmarks.load_async_bot [число чатов ...]
+"""
+import asyncio
+import itertools
+import os
+import time
+
+os.environ.setdefault('TOKEN', '0:benchmark')
+# Лимиты Telegram не применяются к фейковому Bot API.
+os.environ.setdefault('OUTBOUND_GLOBAL_RATE', '0')
+os.environ.setdefault('OUTBOUND_CHAT_RATE', '0')
+
+from telebot.types import Update  # noqa: E402
+
+from benchmarks.common import parse_sizes, print_table  # noqa: E402
+from benchmarks.fake_bot_api import (FakeBotApi,  # noqa: E402
+                                     make_message_update)
+import main as bot_main  # noqa: E402
+from message import (CREATE_ROOM_TEXT, BUTTON_START_GAME_TEXT,  # noqa: E402
+                     BUTTON_FORWARD, BUTTON_RIGHT, BUTTON_BACK, BUTTON_LEFT)
+
+CHATS = (1, 10, 50, 100, 200)
+MOVES = 10
+LATENCY = 0.05
+
+_ids = itertools.count(1)
+_chat_ids = itertools.count(10 ** 6)
+
+
+async def run_scenario(chats: int) -> tuple[int, float]:
+    """
+    Прогоняет сценарий игры для указанного числа чатов.
+
+    Returns:
+        tuple[int, float]: количество обновлений и затраченное время.
+    """
+    chat_ids = [next(_chat_ids) for _ in range(chats)]
+    moves = itertools.cycle((BUTTON_FORWARD, BUTTON_RIGHT, BUTTON_BACK,
+                             BUTTON_LEFT))
+    texts = [CREATE_ROOM_TEXT, BUTTON_START_GAME_TEXT,
+             *itertools.islice(moves, MOVES)]
+    updates_count = 0
+    start = time.perf_counter()
+    for text in texts:
+        updates = [Update.de_json(make_message_update(next(_ids), chat_id,
+                                                      next(_ids), text))
+                   for chat_id in chat_ids]
+        await bot_main.bot.process_new_updates(updates)
+        updates_count += len(updates)
+    await bot_main.MESSAGE_CLEANER.drain()
+    return updates_count, time.perf_counter() - start
+
+
+async def run(chats_list: list[int]) -> None:
+    api = FakeBotApi(latency=LATENCY)
+    await api.start()
+    rows = []
+    try:
+        for chats in chats_list:
+            calls_before = api.total_calls
+            updates, seconds = await run_scenario(chats)
+            rows.append([chats, updates, api.total_calls - calls_before,
+                         f'{seconds:.2f}', f'{updates / seconds:.1f}'])
+    finally:
+        await api.stop()
+    print(f'Задержка Bot API: {LATENCY * 1000:.0f} мс')
+    print_table(['chats', 'updates', 'api calls', 'seconds', 'updates/s'],
+                rows)
+
+
+def main():
+    asyncio.run(run(parse_sizes(CHATS)))
+
+
+if __name__ == '__main__':
+    main()
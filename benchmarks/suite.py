@@ -0,0 +1,442 @@
+"""
+Набор бенчмарков игрового движка и комнат с сохранением результатов в JSON
+для сравнения между версиями.
+
+Бенчмарки (имя - что замеряется):
+    maze_generate - Maze.generate (создание клеток), мкс на клетку
+    generate_maze - MazeGame.generate_maze (построение стен), мкс на клетку
+    arrange_effects - MazeGame.arrange_effects, мкс на эффект
+    check_move - MazeGame._check_move на лабиринте участника, нс на вызов
+    move - MazeGame._move (случайное блуждание участника), нс на вызов
+    create_room - RoomAggregator.create_room при N комнатах, мкс на комнату
+    join_room - RoomAggregator.join_room_participant, мкс на вход
+    participant_memory - память одного участника в комнате с лабиринтом
+        MAZE_SIZE (tracemalloc), байт
+
+Каждый бенчмарк повторяется несколько раз, значение - лучший запуск
+(меньше - лучше для всех бенчмарков). Запуски сохраняются в JSON вместе
+со средним и стандартным отклонением.
+
+Запуск:
+    python -m benchmarks.suite [--quick] [--only ИМЯ ...]
+        [--output results.json] [--compare baseline.json]
+        [--threshold 0.1]
+
+Пример проверки изменения:
+    python -m benchmarks.suite --output baseline.json
+    (изменение)
+    python -m benchmarks.suite --compare baseline.json
+
+С --compare код возврата 1, если хотя бы один бенчмарк стал хуже больше
+чем на threshold (по умолчанию 10%).
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from benchmarks.common import print_table
+from config import MAZE_EFFECTS, MAZE_SIZE
+from database.rooms import RoomAggregator
+from database.storage import MemoryRoomStorage
+from game.compact_maze import CompactMaze
+from game.maze import Maze, MazeGame
+
+SIZES = {
+    'maze_generate': (10, 100, 500),
+    'generate_maze': (10, 100, 500),
+    'arrange_effects': (1_000, 10_000, 100_000),
+    'moves': (100, 1000),
+    'rooms': (10, 1_000, 100_000),
+    'participants': (1_000, 10_000),
+}
+QUICK_SIZES = {
+    'maze_generate': (10, 100),
+    'generate_maze': (10, 100),
+    'arrange_effects': (1_000,),
+    'moves': (100,),
+    'rooms': (10, 1_000),
+    'participants': (1_000,),
+}
+REPEAT = 5
+# Размер лабиринта для расстановки эффектов (эффекты ставятся без учёта
+# стен, поэтому генерация стен не нужна).
+ARRANGE_MAZE_SIZE = 500
+MOVES = 100_000
+DIRECTIONS = ('top', 'right', 'bottom', 'left')
+SEED = 1
+# Попытки хода каждого участника при замере памяти.
+MEMORY_MOVE_ATTEMPTS = 40
+BACKENDS = (('Maze', Maze), ('CompactMaze', CompactMaze))
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str) -> Callable:
+    """
+    Регистрирует функцию бенчмарка.
+
+    Функция получает словарь размеров (SIZES или QUICK_SIZES) и возвращает
+    список результатов (см. make_result).
+    """
+    def decorator(func: Callable) -> Callable:
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+def run_repeated(func: Callable[[], float], repeat: int = REPEAT,
+                 setup: Optional[Callable[[], object]] = None
+                 ) -> list[float]:
+    """
+    Запускает замер несколько раз.
+
+    Args:
+        func: Callable (замер: получает результат setup, если он задан, и
+        возвращает время в секундах)
+        repeat: int (количество запусков)
+        setup: Optional[Callable] (подготовка данных перед каждым запуском,
+        не входит в замер)
+
+    Returns:
+        list[float]: время каждого запуска в секундах.
+    """
+    runs = []
+    for _ in range(repeat):
+        data = setup() if setup is not None else None
+        gc.collect()
+        runs.append(func(data) if setup is not None else func())
+    return runs
+
+
+def timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def make_result(name: str, params: dict, unit: str, runs: list[float],
+                scale: float = 1.0) -> dict:
+    """
+    Создаёт запись результата.
+
+    Args:
+        name: str (имя бенчмарка)
+        params: dict (параметры: размер, бэкенд и т. п.)
+        unit: str (единица значения)
+        runs: list[float] (замеры запусков)
+        scale: float (множитель замера в единицу, например 1e6 / клеток)
+
+    Returns:
+        dict: результат; value - лучший (минимальный) запуск.
+    """
+    values = [run * scale for run in runs]
+    return {
+        'name': name,
+        'params': params,
+        'unit': unit,
+        'value': min(values),
+        'mean': statistics.fmean(values),
+        'stdev': statistics.stdev(values) if len(values) > 1 else 0.0,
+        'runs': values,
+    }
+
+
+def result_key(result: dict) -> str:
+    params = ','.join(f'{key}={value}'
+                      for key, value in sorted(result['params'].items()))
+    return f'{result["name"]}[{params}]'
+
+
+@benchmark('maze_generate')
+def bench_maze_generate(sizes: dict) -> list[dict]:
+    results = []
+    for backend, maze_class in BACKENDS:
+        for size in sizes['maze_generate']:
+            runs = run_repeated(
+                lambda maze: timed(maze.generate),
+                setup=lambda: maze_class(size))
+            results.append(make_result(
+                'maze_generate', {'backend': backend, 'size': size},
+                'us/cell', runs, 1e6 / (size * size)))
+    return results
+
+
+@benchmark('generate_maze')
+def bench_generate_maze(sizes: dict) -> list[dict]:
+    results = []
+    for backend, maze_class in BACKENDS:
+        for size in sizes['generate_maze']:
+            runs = run_repeated(
+                lambda maze_game: timed(maze_game.generate_maze),
+                setup=lambda: MazeGame(size, maze_class=maze_class,
+                                       seed=SEED))
+            results.append(make_result(
+                'generate_maze', {'backend': backend, 'size': size},
+                'us/cell', runs, 1e6 / (size * size)))
+    return results
+
+
+@benchmark('arrange_effects')
+def bench_arrange_effects(sizes: dict) -> list[dict]:
+    results = []
+    for amount in sizes['arrange_effects']:
+        for repeat in (False, True):
+            runs = run_repeated(
+                lambda maze_game: timed(lambda: maze_game.arrange_effects(
+                    amount, repeat=repeat)),
+                setup=lambda: MazeGame(ARRANGE_MAZE_SIZE,
+                                       maze_class=CompactMaze, seed=SEED))
+            results.append(make_result(
+                'arrange_effects', {'amount': amount, 'repeat': repeat},
+                'us/effect', runs, 1e6 / amount))
+    return results
+
+
+def _participant_maze(size: int, maze_class) -> MazeGame:
+    """
+    Возвращает лабиринт участника (копию лабиринта комнаты), по которому
+    ходит игрок.
+    """
+    room_maze = MazeGame(size, maze_class=maze_class, seed=SEED)
+    room_maze.generate_maze()
+    room_maze.arrange_effects(size)
+    return MazeGame(maze=room_maze.copy_maze())
+
+
+@benchmark('check_move')
+def bench_check_move(sizes: dict) -> list[dict]:
+    results = []
+    directions = random.Random(SEED).choices(DIRECTIONS, k=MOVES)
+    for backend, maze_class in BACKENDS:
+        for size in sizes['moves']:
+            maze_game = _participant_maze(size, maze_class)
+            check_move = maze_game._check_move
+
+            def run():
+                for direction in directions:
+                    check_move(direction)
+
+            runs = run_repeated(lambda: timed(run))
+            results.append(make_result(
+                'check_move', {'backend': backend, 'size': size},
+                'ns/call', runs, 1e9 / MOVES))
+    return results
+
+
+@benchmark('move')
+def bench_move(sizes: dict) -> list[dict]:
+    results = []
+    directions = random.Random(SEED).choices(DIRECTIONS, k=MOVES)
+    for backend, maze_class in BACKENDS:
+        for size in sizes['moves']:
+
+            def run(maze_game):
+                move = maze_game._move
+                return timed(lambda: [move(direction)
+                                      for direction in directions])
+
+            runs = run_repeated(
+                run, setup=lambda: _participant_maze(size, maze_class))
+            results.append(make_result(
+                'move', {'backend': backend, 'size': size},
+                'ns/call', runs, 1e9 / MOVES))
+    return results
+
+
+def _reset_rooms(aggregator: RoomAggregator) -> None:
+    # Комнаты агрегатора общие для всех экземпляров (поля класса), поэтому
+    # каждый замер начинается с пустого хранилища в памяти: так замер
+    # включает упаковку и сохранение состояния участников.
+    aggregator.set_storage(MemoryRoomStorage())
+    aggregator.load_rooms()
+
+
+@benchmark('rooms')
+def bench_rooms(sizes: dict) -> list[dict]:
+    results = []
+    aggregator = RoomAggregator()
+    for count in sizes['rooms']:
+        # Большое количество комнат замеряется один раз, иначе набор идёт
+        # долго.
+        repeat = REPEAT if count <= 1_000 else 1
+        create_runs = []
+        join_runs = []
+        for _ in range(repeat):
+            _reset_rooms(aggregator)
+            gc.collect()
+            start = time.perf_counter()
+            rooms = [aggregator.create_room() for _ in range(count)]
+            create_runs.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            for participant_id, room_number in enumerate(rooms):
+                aggregator.join_room_participant(room_number, participant_id,
+                                                 'name', 'surname')
+            join_runs.append(time.perf_counter() - start)
+        _reset_rooms(aggregator)
+        results.append(make_result('create_room', {'rooms': count},
+                                   'us/room', create_runs, 1e6 / count))
+        results.append(make_result('join_room', {'rooms': count},
+                                   'us/join', join_runs, 1e6 / count))
+    return results
+
+
+@benchmark('participant_memory')
+def bench_participant_memory(sizes: dict) -> list[dict]:
+    results = []
+    aggregator = RoomAggregator()
+    directions = random.Random(SEED).choices(DIRECTIONS,
+                                             k=MEMORY_MOVE_ATTEMPTS)
+    for count in sizes['participants']:
+        _reset_rooms(aggregator)
+        rooms = [aggregator.create_room() for _ in range(count)]
+        # Лабиринты комнат - как в игре (main.start_game).
+        for index, room_number in enumerate(rooms):
+            maze_game = MazeGame(MAZE_SIZE, seed=SEED + index)
+            maze_game.generate_maze()
+            maze_game.arrange_effects(MAZE_EFFECTS)
+            aggregator.set_room_maze(room_number, maze_game)
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for participant_id, room_number in enumerate(rooms):
+            aggregator.join_room_participant(room_number, participant_id,
+                                             'name', 'surname')
+        joined = tracemalloc.get_traced_memory()[0]
+        # Ходы добавляют посещённые клетки в лабиринт участника. Часть
+        # попыток упирается в стены.
+        for participant_id in range(count):
+            maze_game = aggregator.get_maze_by_participant_id(participant_id)
+            for direction in directions:
+                maze_game._move(direction)
+        moved = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        _reset_rooms(aggregator)
+        results.append(make_result(
+            'participant_memory',
+            {'participants': count, 'move_attempts': 0},
+            'bytes', [(joined - before) / count]))
+        results.append(make_result(
+            'participant_memory',
+            {'participants': count, 'move_attempts': len(directions)},
+            'bytes', [(moved - before) / count]))
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+            text=True, check=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(names: list[str], quick: bool = False) -> dict:
+    """
+    Запускает бенчмарки.
+
+    Args:
+        names: list[str] (имена бенчмарков из BENCHMARKS)
+        quick: bool (уменьшенные размеры)
+
+    Returns:
+        dict: метаданные запуска и результаты (results).
+    """
+    sizes = QUICK_SIZES if quick else SIZES
+    results = []
+    for name in names:
+        print(f'{name}...', file=sys.stderr)
+        results.extend(BENCHMARKS[name](sizes))
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'quick': quick,
+        'results': results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float
+            ) -> tuple[list[list], int]:
+    """
+    Сравнивает результаты с базовыми.
+
+    Args:
+        report: dict (текущий запуск)
+        baseline: dict (сохранённый запуск)
+        threshold: float (допустимое ухудшение, 0.1 - на 10%)
+
+    Returns:
+        tuple: строки таблицы сравнения и количество ухудшений.
+    """
+    baseline_results = {result_key(result): result
+                        for result in baseline['results']}
+    rows = []
+    regressions = 0
+    for result in report['results']:
+        key = result_key(result)
+        old = baseline_results.get(key)
+        if old is None or not old['value']:
+            rows.append([key, result['unit'], '-',
+                         f'{result["value"]:.4g}', '-', 'new'])
+            continue
+        change = result['value'] / old['value'] - 1
+        if change > threshold:
+            status = 'REGRESSION'
+            regressions += 1
+        elif change < -threshold:
+            status = 'faster'
+        else:
+            status = ''
+        rows.append([key, result['unit'], f'{old["value"]:.4g}',
+                     f'{result["value"]:.4g}', f'{change:+.1%}', status])
+    return rows, regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Бенчмарки игрового движка и комнат')
+    parser.add_argument('--quick', action='store_true',
+                        help='уменьшенные размеры')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS),
+                        help='запустить только указанные бенчмарки')
+    parser.add_argument('--output', help='сохранить результаты в JSON')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='сравнить с сохранёнными результатами')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='допустимое ухудшение при сравнении')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.only or list(BENCHMARKS), args.quick)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+    print_table(['benchmark', 'unit', 'best', 'mean', 'stdev'],
+                [[result_key(result), result['unit'],
+                  f'{result["value"]:.4g}', f'{result["mean"]:.4g}',
+                  f'{result["stdev"]:.4g}']
+                 for result in report['results']])
+    if not args.compare:
+        return 0
+    with open(args.compare, encoding='utf-8') as file:
+        baseline = json.load(file)
+    rows, regressions = compare(report, baseline, args.threshold)
+    print()
+    print_table(['benchmark', 'unit', 'baseline', 'current', 'change',
+                 'status'], rows)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,53 @@
 import os
 
 TOKEN = os.getenv('TOKEN')
+
+# Режим игрового интерфейса:
+# reply - на каждый ход отправляются новые сообщения с клавиатурой,
+# edit - одно сообщение игрока редактируется на каждом ходу.
+GAME_UI_MODE = os.getenv('GAME_UI_MODE', 'reply')
+
+# Лимиты исходящих запросов к Bot API (запросов в секунду, 0 - без лимита).
+OUTBOUND_GLOBAL_RATE = float(os.getenv('OUTBOUND_GLOBAL_RATE', 30))
+OUTBOUND_CHAT_RATE = float(os.getenv('OUTBOUND_CHAT_RATE', 1))
+OUTBOUND_CHAT_BURST = float(os.getenv('OUTBOUND_CHAT_BURST', 4))
+
+# Путь к файлу SQLite с комнатами. Если не задан, комнаты хранятся только в
+# памяти процесса и теряются при перезапуске.
+ROOM_STORAGE_PATH = os.getenv('ROOM_STORAGE_PATH')
+
+# Количество процессов-шардов с комнатами. Больше 1 - фронт-процесс
+# принимает обновления и пересылает их шардам (runtime.sharding).
+SHARDS = int(os.getenv('SHARDS', 1))
+
+# Размер лабиринта и количество эффектов в игре.
+MAZE_SIZE = int(os.getenv('MAZE_SIZE', 5))
+MAZE_EFFECTS = int(os.getenv('MAZE_EFFECTS', 15))
+# Алгоритм генерации лабиринта (game.generators.GENERATORS). Сравнение
+# алгоритмов по времени и памяти: python -m benchmarks.bench_generators.
+MAZE_GENERATOR = os.getenv('MAZE_GENERATOR', 'backtracker')
+# Пресет сложности - редкость эффектов (game.effect_distribution.
+# DIFFICULTY_PRESETS: easy, normal, hard). Если не задан, все эффекты
+# равновероятны.
+MAZE_DIFFICULTY = os.getenv('MAZE_DIFFICULTY') or None
+# Количество готовых лабиринтов в пуле (game.maze_pool).
+MAZE_POOL_CAPACITY = int(os.getenv('MAZE_POOL_CAPACITY', 4))
+
+# Время на прохождение лабиринта в секундах реального времени и сколько
+# секунд отнимает каждая единица замедления клетки (холод, топь, камни).
+GAME_DURATION = float(os.getenv('GAME_DURATION', 300))
+GAME_CELL_PENALTY = float(os.getenv('GAME_CELL_PENALTY', 10))
+# Предметы, которые участник получает в начале игры (имена классов
+# game.inventory.ITEMS через запятую, имя можно повторять).
+START_INVENTORY = [name.strip() for name in
+                   os.getenv('START_INVENTORY',
+                             'EnergyDrink,BucketOfColdWater').split(',')
+                   if name.strip()]
+
+# Метрики (runtime.metrics): порт локального HTTP-сервера (GET /metrics,
+# 0 - не запускать) и файл, в который метрики записываются каждые
+# METRICS_DUMP_INTERVAL секунд. Если не задано ни то, ни другое, метрики
+# не собираются.
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+METRICS_DUMP_PATH = os.getenv('METRICS_DUMP_PATH')
+METRICS_DUMP_INTERVAL = float(os.getenv('METRICS_DUMP_INTERVAL', 60))
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
 from typing import Union, Optional
 
+from database.abstract.abstract_storage import AbstractRoomStorage
 from game.abstract.abstract_maze import AbstractMazeGame, BaseCell
+from game.inventory import Inventory
 
 
 class AbstractRoom(ABC):
@@ -121,6 +123,25 @@ class AbstractRoom(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_inventory_participant(self,
+                                  participant_id: Union[int, str]
+                                  ) -> Optional[Inventory]:
+        """
+        Возвращает инвентарь участника.
+        """
+        pass
+
+    @abstractmethod
+    def set_inventory_participant(self,
+                                  participant_id: Union[int, str],
+                                  inventory: Inventory,
+                                  ) -> bool:
+        """
+        Заменяет инвентарь участника.
+        """
+        pass
+
     @abstractmethod
     def get_participant(self,
                         participant_id: Union[int, str],
@@ -138,6 +159,31 @@ class AbstractRoom(ABC):
         """
         pass
 
+    @abstractmethod
+    def set_maze(self, maze: AbstractMazeGame) -> None:
+        """
+        Заменяет лабиринт комнаты и лабиринты участников.
+        """
+        pass
+
+    @abstractmethod
+    def reset_participant_maze(self,
+                               participant_id: Union[int, str]
+                               ) -> bool:
+        """
+        Выдаёт участнику новый лабиринт поверх лабиринта комнаты.
+        """
+        pass
+
+    @abstractmethod
+    def is_game_running(self,
+                        except_participant_id: Union[int, str, None] = None
+                        ) -> bool:
+        """
+        Проверяет, идёт ли в комнате игра.
+        """
+        pass
+
     @abstractmethod
     def get_start_time_participant(self,
                                    participant_id: Union[int, str]
@@ -192,11 +238,13 @@ class AbstractRoomAggregator(ABC):
     Также является фасадом упрощающим взаимодействие с AbstractRoom.
 
     Fields:
-        _rooms: list (список комнат)
+        _rooms: dict (индекс комнат: номер комнаты -> комната)
+        _storage: AbstractRoomStorage (хранилище комнат)
         __room_class: AbstractRoom (класс комнаты)
         __maze_game_class: AbstractMazeGame (класс игрового лабиринта)
     """
-    _rooms: list
+    _rooms: dict
+    _storage: AbstractRoomStorage
     __room_class: AbstractRoom
     __maze_game_class: AbstractMazeGame
 
@@ -286,6 +334,25 @@ class AbstractRoomAggregator(ABC):
         Устанавливает время начала игры для указанного участника.
         """
 
+    @abstractmethod
+    def get_end_time_participant(self,
+                                 participant_id: Union[int, str]
+                                 ) -> Union[bool, float]:
+        """
+        Возвращает время окончания игры для указанного участника.
+        """
+        pass
+
+    @abstractmethod
+    def set_end_time_participant(self,
+                                 participant_id: Union[int, str],
+                                 time_end: Optional[float],
+                                 ) -> bool:
+        """
+        Устанавливает время окончания игры для указанного участника.
+        """
+        pass
+
     @abstractmethod
     def get_game_time_participant(self,
                                   participant_id: Union[int, str]
@@ -315,6 +382,25 @@ class AbstractRoomAggregator(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_inventory_participant(self,
+                                  participant_id: Union[int, str]
+                                  ) -> Optional[Inventory]:
+        """
+        Возвращает инвентарь участника.
+        """
+        pass
+
+    @abstractmethod
+    def set_inventory_participant(self,
+                                  participant_id: Union[int, str],
+                                  inventory: Inventory,
+                                  ) -> bool:
+        """
+        Заменяет инвентарь участника.
+        """
+        pass
+
     @abstractmethod
     def get_maze_by_participant_id(self,
                                    participant_id: Union[int, str]
@@ -324,6 +410,65 @@ class AbstractRoomAggregator(ABC):
         """
         pass
 
+    @abstractmethod
+    def set_storage(self, storage: AbstractRoomStorage) -> None:
+        """
+        Устанавливает хранилище комнат.
+        """
+        pass
+
+    @abstractmethod
+    def load_rooms(self) -> int:
+        """
+        Восстанавливает комнаты из хранилища.
+        """
+        pass
+
+    @abstractmethod
+    def set_room_maze(self, room_number: str,
+                      maze: AbstractMazeGame) -> bool:
+        """
+        Заменяет лабиринт комнаты готовым лабиринтом.
+        """
+        pass
+
+    @abstractmethod
+    def reset_participant_maze(self,
+                               participant_id: Union[int, str]
+                               ) -> bool:
+        """
+        Выдаёт участнику новый лабиринт поверх текущего лабиринта комнаты.
+        """
+        pass
+
+    @abstractmethod
+    def save_room(self, room_number: str, maze_seed=None) -> bool:
+        """
+        Сохраняет лабиринт комнаты в хранилище.
+        """
+        pass
+
+    @abstractmethod
+    def save_participant(self, participant_id: Union[int, str]) -> bool:
+        """
+        Сохраняет данные и положение участника в хранилище.
+        """
+        pass
+
+    @abstractmethod
+    def set_shard(self, index: int, count: int) -> None:
+        """
+        Устанавливает шард, которому принадлежат комнаты агрегатора.
+        """
+        pass
+
+    @abstractmethod
+    def get_participant_ids(self) -> list[Union[int, str]]:
+        """
+        Возвращает идентификаторы всех участников, состоящих в комнатах.
+        """
+        pass
+
     def __new__(cls) -> 'AbstractRoomAggregator':
         """
         Singleton, тк агрегатор единый для всей системы.
@@ -0,0 +1,81 @@
+from abc import ABC, abstractmethod
+from typing import Union
+
+
+class AbstractRoomStorage(ABC):
+    """
+    Хранилище комнат и участников.
+
+    Хранит лабиринты комнат и состояние участников в упакованном виде
+    (game.serialization), чтобы комнаты переживали перезапуск бота.
+
+    Данные участника - словарь с ключами:
+        room_number: str (номер комнаты)
+        name: Optional[str] (имя)
+        surname: Optional[str] (фамилия)
+        start_time: Optional[float] (время начала игры)
+        end_time: Optional[float] (время окончания игры)
+        game_time: Optional[float] (игровое время)
+        state: bytes (упакованное состояние лабиринта участника)
+
+    Fields:
+        persistent: bool (False - хранилище ничего не сохраняет, и данные
+            для него можно не готовить)
+    """
+    persistent = True
+
+    @abstractmethod
+    def save_room(self, room_number: str, maze: bytes) -> None:
+        """
+        Сохраняет комнату с упакованным лабиринтом.
+        """
+        pass
+
+    @abstractmethod
+    def delete_room(self, room_number: str) -> None:
+        """
+        Удаляет комнату и всех её участников.
+        """
+        pass
+
+    @abstractmethod
+    def save_participant(self,
+                         participant_id: Union[int, str],
+                         data: dict,
+                         ) -> None:
+        """
+        Сохраняет данные участника.
+        """
+        pass
+
+    @abstractmethod
+    def delete_participant(self, participant_id: Union[int, str]) -> None:
+        """
+        Удаляет участника.
+        """
+        pass
+
+    @abstractmethod
+    def load_rooms(self) -> dict[str, tuple[bytes, dict]]:
+        """
+        Возвращает все сохранённые комнаты.
+
+        Returns:
+            dict: номер комнаты -> (упакованный лабиринт, словарь
+            идентификатор участника -> данные участника).
+        """
+        pass
+
+    @abstractmethod
+    def flush(self) -> None:
+        """
+        Записывает накопленные изменения.
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Записывает накопленные изменения и закрывает хранилище.
+        """
+        pass
@@ -3,8 +3,19 @@ from typing import Union, Optional
 
 from database.abstract.abstract_room import (AbstractRoom,
                                              AbstractRoomAggregator)
+from database.abstract.abstract_storage import AbstractRoomStorage
+from database.storage import NullRoomStorage
 from game.abstract.abstract_maze import AbstractMazeGame, BaseCell
+from game.inventory import Inventory
 from game.maze import MazeGame
+from game.maze_seed import MazeSeed, pack_maze_seed
+from game.serialization import (pack_maze, load_maze,
+                                pack_participant_state,
+                                unpack_participant_state)
+
+# Границы номеров комнат (включительно).
+ROOM_NUMBER_MIN = 1000000
+ROOM_NUMBER_MAX = 999999999
 
 
 class Room(AbstractRoom):
@@ -19,15 +30,22 @@ class Room(AbstractRoom):
         participants: dict (участники комнаты)
     """
 
+    __maze_game_class = MazeGame
+
     def __init__(self, maze: AbstractMazeGame):
         self.maze = maze
-        self.room_number = str(random.randint(1000000, 999999999))
+        self.room_number = str(random.randint(ROOM_NUMBER_MIN,
+                                              ROOM_NUMBER_MAX))
         self.__participants = {}
 
     def add_participant(self, participant_id: Union[int, str]) -> None:
         """
         Добавить участника в комнату.
 
+        Участник получает собственный игровой лабиринт поверх копии
+        лабиринта комнаты. Копия хранит только положение участника и
+        посещённые им клетки, стены остаются общими для всей комнаты.
+
         Args:
             participant_id: Union[int, str] (номер участника, может быть числом
             или строкой)
@@ -36,10 +54,11 @@ class Room(AbstractRoom):
             'end_time': None,
             'previous_cells': [],
             'name': None,
-            'last_name': None,
-            'maze': self.maze.copy_maze(),
-            'time_start': None,
-            'game_time': None,
+            'surname': None,
+            'maze': self.__maze_game_class(maze=self.maze.copy_maze()),
+            'start_time': None,
+            'game_time': 0.0,
+            'inventory': Inventory(),
         }
 
     def remove_participant(self, participant_id: Union[int, str]) -> None:
@@ -323,6 +342,43 @@ class Room(AbstractRoom):
             return True
         return False
 
+    def get_inventory_participant(self,
+                                  participant_id: Union[int, str]
+                                  ) -> Optional[Inventory]:
+        """
+        Возвращает инвентарь участника.
+
+        Args:
+            participant_id: Union[int, str] (номер участника)
+
+        Returns:
+            Inventory: инвентарь участника
+            None: участника с таким номером нет в комнате
+        """
+        if self.check_participants(participant_id):
+            return self.__participants[participant_id]['inventory']
+
+    def set_inventory_participant(self,
+                                  participant_id: Union[int, str],
+                                  inventory: Inventory,
+                                  ) -> bool:
+        """
+        Заменяет инвентарь участника.
+
+        Args:
+            participant_id: Union[int, str] (номер участника)
+            inventory: Inventory (инвентарь)
+
+        Returns:
+            bool:
+                True - инвентарь установлен
+                False - участника с таким номером нет в комнате
+        """
+        if self.check_participants(participant_id):
+            self.__participants[participant_id]['inventory'] = inventory
+            return True
+        return False
+
     def get_participant(self,
                         participant_id: Union[int, str],
                         ) -> Optional[dict]:
@@ -347,6 +403,71 @@ class Room(AbstractRoom):
         """
         return self.__participants
 
+    def set_maze(self, maze: AbstractMazeGame) -> None:
+        """
+        Заменяет лабиринт комнаты (например, готовым лабиринтом из пула).
+
+        Каждый участник получает новый лабиринт поверх копии лабиринта
+        комнаты и начинает с точки входа.
+
+        Args:
+            maze: AbstractMazeGame (сгенерированный игровой лабиринт)
+        """
+        self.maze = maze
+        for participant in self.__participants.values():
+            participant['maze'] = self.__maze_game_class(
+                maze=maze.copy_maze())
+            participant['previous_cells'] = []
+
+    def reset_participant_maze(self,
+                               participant_id: Union[int, str]
+                               ) -> bool:
+        """
+        Выдаёт участнику новый лабиринт поверх копии лабиринта комнаты.
+
+        Участник начинает с точки входа, лабиринты остальных участников не
+        меняются.
+
+        Args:
+            participant_id: Union[int, str] (номер участника)
+
+        Returns:
+            bool:
+                True - лабиринт выдан
+                False - участника с таким номером нет в комнате
+        """
+        participant = self.__participants.get(participant_id)
+        if participant is None:
+            return False
+        participant['maze'] = self.__maze_game_class(
+            maze=self.maze.copy_maze())
+        participant['previous_cells'] = []
+        return True
+
+    def is_game_running(self,
+                        except_participant_id: Union[int, str, None] = None
+                        ) -> bool:
+        """
+        Проверяет, идёт ли в комнате игра.
+
+        Игра идёт, пока хотя бы у одного участника запущены часы (end_time
+        не None).
+
+        Args:
+            except_participant_id: Union[int, str, None] (участник, игра
+            которого не учитывается)
+
+        Returns:
+            bool:
+                True - игра идёт
+                False - ни у одного участника часы не запущены
+        """
+        for participant_id, participant in self.__participants.items():
+            if (participant_id != except_participant_id
+                    and participant['end_time'] is not None):
+                return True
+        return False
+
 
 class RoomAggregator(AbstractRoomAggregator):
     """
@@ -355,11 +476,20 @@ class RoomAggregator(AbstractRoomAggregator):
     Является посредником взаимодействия контроллер-комната и хранилищем комнат.
 
     Fields:
-        _rooms: list (список комнат)
-         __room_class: AbstractRoom (класс комнаты)
+        _rooms: dict (индекс комнат: номер комнаты -> комната)
+        _participant_rooms: dict (индекс участников: идентификатор
+            участника -> комната, в которой он состоит)
+        _storage: AbstractRoomStorage (хранилище комнат, по умолчанию не
+            сохраняет ничего)
+        _shard: tuple[int, int] (номер шарда и количество шардов, см.
+            runtime.sharding)
+        __room_class: AbstractRoom (класс комнаты)
         __maze_game_class: AbstractMazeGame (класс игрового лабиринта)
     """
-    _rooms: list[AbstractRoom] = []
+    _rooms: dict[str, AbstractRoom] = {}
+    _participant_rooms: dict[Union[int, str], AbstractRoom] = {}
+    _storage: AbstractRoomStorage = NullRoomStorage()
+    _shard: tuple[int, int] = (0, 1)
     __room_class = Room
     __maze_game_class = MazeGame
 
@@ -370,12 +500,11 @@ class RoomAggregator(AbstractRoomAggregator):
         Returns:
             str: номер комнаты.
         """
+        room_number = self._new_room_number()
         room = self.__room_class(self.__maze_game_class())
-        while room.room_number in [existing_room.room_number for
-                                   existing_room in self._rooms]:
-            del room
-            room = self.__room_class(self.__maze_game_class())
-        self._rooms.append(room)
+        room.room_number = room_number
+        self._rooms[room_number] = room
+        self.save_room(room.room_number)
         return room.room_number
 
     def get_room(self, room_number: str) -> Optional[AbstractRoom]:
@@ -389,9 +518,7 @@ class RoomAggregator(AbstractRoomAggregator):
             AbstractRoom: найденная комната.
             None: комната не найдена.
         """
-        for room in self._rooms:
-            if room.room_number == room_number:
-                return room
+        return self._rooms.get(room_number)
 
     def remove_room(self, room_number: str) -> bool:
         """
@@ -402,9 +529,12 @@ class RoomAggregator(AbstractRoomAggregator):
                 True: комната удалена.
                 False: комната не удалена (например, её не было).
         """
-        room = self.get_room(room_number)
+        room = self._rooms.pop(room_number, None)
         if room:
-            self._rooms.remove(room)
+            for participant_id in room.get_participants():
+                if self._participant_rooms.get(participant_id) is room:
+                    del self._participant_rooms[participant_id]
+            self._storage.delete_room(room_number)
             return True
         return False
 
@@ -433,7 +563,9 @@ class RoomAggregator(AbstractRoomAggregator):
             return False
         room.add_participant(participant_id)
         room.set_participant_name(participant_id, name)
-        room.set_participant_surname(participant_id, name)
+        room.set_participant_surname(participant_id, surname)
+        self._participant_rooms[participant_id] = room
+        self.save_participant(participant_id)
         return True
 
     def leave_room_participant(self, room_number: str,
@@ -452,9 +584,12 @@ class RoomAggregator(AbstractRoomAggregator):
                 False: ошибка добавления (например, не найдена комната)
         """
         room = self.get_room(room_number)
-        if not room:
+        if not room or not room.check_participants(participant_id):
             return False
         room.remove_participant(participant_id)
+        if self._participant_rooms.get(participant_id) is room:
+            del self._participant_rooms[participant_id]
+        self._storage.delete_participant(participant_id)
         return True
 
     def get_room_by_participant(self,
@@ -470,9 +605,9 @@ class RoomAggregator(AbstractRoomAggregator):
             str: номер найденной комнаты.
             None: комната не найдена.
         """
-        for room in self._rooms:
-            if room.check_participants(participant_id):
-                return room.room_number
+        room = self._get_room_by_participant(participant_id)
+        if room:
+            return room.room_number
 
     def get_participant(self,
                         participant_id: Union[int, str]
@@ -487,9 +622,9 @@ class RoomAggregator(AbstractRoomAggregator):
             dict: данные участника.
             None: участник не найден.
         """
-        for room in self._rooms:
-            if room.check_participants(participant_id):
-                return room.get_participant(participant_id)
+        room = self._get_room_by_participant(participant_id)
+        if room:
+            return room.get_participant(participant_id)
 
     def get_participants(self,
                          room_number: str,
@@ -504,9 +639,9 @@ class RoomAggregator(AbstractRoomAggregator):
             list: список идентификаторов участников
             None: комната не найдена
         """
-        for room in self._rooms:
-            if room.room_number == room_number:
-                return room.get_participants()
+        room = self.get_room(room_number)
+        if room:
+            return room.get_participants()
 
     def get_start_time_participant(self,
                                    participant_id: Union[int, str]
@@ -524,9 +659,9 @@ class RoomAggregator(AbstractRoomAggregator):
             bool:
                 False - не состоит в комнате
         """
-        for room in self._rooms:
-            if room.check_participants(participant_id):
-                return room.get_start_time_participant(participant_id)
+        room = self._get_room_by_participant(participant_id)
+        if room:
+            return room.get_start_time_participant(participant_id)
         return False
 
     def set_start_time_participant(self,
@@ -547,9 +682,54 @@ class RoomAggregator(AbstractRoomAggregator):
                 True - время установлено
                 False - не состоит в комнате
         """
-        for room in self._rooms:
-            if room.check_participants(participant_id):
-                room.set_start_time_participant(participant_id, time_start)
+        room = self._get_room_by_participant(participant_id)
+        if room:
+            return room.set_start_time_participant(participant_id,
+                                                   time_start)
+        return False
+
+    def get_end_time_participant(self,
+                                 participant_id: Union[int, str]
+                                 ) -> Union[bool, float]:
+        """
+        Возвращает время окончания игры для указанного участника.
+
+        Если участника нет в комнате, вернёт False.
+
+        Args:
+            participant_id: Union[int, str] (номер участника)
+
+        Returns:
+            float: время окончания игры
+            bool:
+                False - не состоит в комнате
+        """
+        room = self._get_room_by_participant(participant_id)
+        if room:
+            return room.get_end_time_participant(participant_id)
+        return False
+
+    def set_end_time_participant(self,
+                                 participant_id: Union[int, str],
+                                 time_end: Optional[float],
+                                 ) -> bool:
+        """
+        Устанавливает время окончания игры для указанного участника.
+
+        Если участника нет в комнате, вернёт False.
+
+        Args:
+            participant_id: Union[int, str] (номер участника)
+            time_end: Optional[float] (время окончания игры)
+
+        Returns:
+            bool:
+                True - время установлено
+                False - не состоит в комнате
+        """
+        room = self._get_room_by_participant(participant_id)
+        if room:
+            return room.set_end_time_participant(participant_id, time_end)
         return False
 
     def get_game_time_participant(self,
@@ -568,7 +748,7 @@ class RoomAggregator(AbstractRoomAggregator):
             bool:
                 False - не состоит в комнате
         """
-        room = self.get_room(participant_id)
+        room = self._get_room_by_participant(participant_id)
         if room:
             return room.get_game_time_participant(participant_id)
         return False
@@ -591,10 +771,9 @@ class RoomAggregator(AbstractRoomAggregator):
                 True - время установлено
                 False - не состоит в комнате
         """
-        room = self.get_room(participant_id)
+        room = self._get_room_by_participant(participant_id)
         if room:
-            self.set_game_time_participant(participant_id, time_)
-            return True
+            return room.set_game_time_participant(participant_id, time_)
         return False
 
     def add_game_time_participant(self,
@@ -615,10 +794,47 @@ class RoomAggregator(AbstractRoomAggregator):
                 True - время добавлено
                 False - не состоит в комнате
         """
-        room = self.get_room(participant_id)
+        room = self._get_room_by_participant(participant_id)
         if room:
-            room.add_game_time_participant(participant_id, time_)
-            return True
+            return room.add_game_time_participant(participant_id, time_)
+        return False
+
+    def get_inventory_participant(self,
+                                  participant_id: Union[int, str]
+                                  ) -> Optional[Inventory]:
+        """
+        Возвращает инвентарь участника.
+
+        Args:
+            participant_id: Union[int, str] (номер участника)
+
+        Returns:
+            Inventory: инвентарь участника
+            None: участник не состоит в комнате
+        """
+        room = self._get_room_by_participant(participant_id)
+        if room:
+            return room.get_inventory_participant(participant_id)
+
+    def set_inventory_participant(self,
+                                  participant_id: Union[int, str],
+                                  inventory: Inventory,
+                                  ) -> bool:
+        """
+        Заменяет инвентарь участника.
+
+        Args:
+            participant_id: Union[int, str] (номер участника)
+            inventory: Inventory (инвентарь)
+
+        Returns:
+            bool:
+                True - инвентарь установлен
+                False - не состоит в комнате
+        """
+        room = self._get_room_by_participant(participant_id)
+        if room:
+            return room.set_inventory_participant(participant_id, inventory)
         return False
 
     def get_maze_by_participant_id(self,
@@ -627,6 +843,8 @@ class RoomAggregator(AbstractRoomAggregator):
         """
         Возвращает игровой лабиринт для указанного участника.
 
+        У каждого участника свой игровой лабиринт (положение и посещённые
+        клетки), построенный поверх общего лабиринта комнаты.
         Если участника нет в комнате, вернёт None.
 
         Args:
@@ -638,11 +856,237 @@ class RoomAggregator(AbstractRoomAggregator):
         """
         room = self._get_room_by_participant(participant_id)
         if room:
-            return room.maze
+            return room.get_participant(participant_id)['maze']
 
     def _get_room_by_participant(self,
                                  participant_id: Union[int, str]
                                  ) -> Optional[AbstractRoom]:
-        for room in self._rooms:
-            if room.check_participants(participant_id):
-                return room
+        """
+        Возвращает комнату участника по индексу участников за O(1).
+
+        Args:
+            participant_id: Union[int, str] (номер участника)
+
+        Returns:
+            AbstractRoom: комната участника
+            None: участник не найден
+        """
+        return self._participant_rooms.get(participant_id)
+
+    def set_storage(self, storage: AbstractRoomStorage) -> None:
+        """
+        Устанавливает хранилище комнат.
+
+        Комнаты, уже загруженные в память, остаются. Чтобы восстановить
+        комнаты из нового хранилища, нужно вызвать load_rooms.
+
+        Args:
+            storage: AbstractRoomStorage (хранилище комнат)
+        """
+        self._storage = storage
+
+    def load_rooms(self) -> int:
+        """
+        Восстанавливает комнаты и участников из хранилища.
+
+        Комнаты, загруженные в память ранее, заменяются сохранёнными.
+        Лабиринты восстанавливаются в компактном виде (CompactMaze).
+
+        Returns:
+            int: количество восстановленных комнат.
+        """
+        self._rooms.clear()
+        self._participant_rooms.clear()
+        for room_number, (maze, participants) in \
+                self._storage.load_rooms().items():
+            room = self.__room_class(
+                self.__maze_game_class(maze=load_maze(maze)))
+            room.room_number = room_number
+            self._rooms[room_number] = room
+            for participant_id, data in participants.items():
+                self._restore_participant(room, participant_id, data)
+        return len(self._rooms)
+
+    def _restore_participant(self,
+                             room: AbstractRoom,
+                             participant_id: Union[int, str],
+                             data: dict,
+                             ) -> None:
+        """
+        Добавляет в комнату участника с сохранёнными данными.
+
+        Args:
+            room: AbstractRoom (комната)
+            participant_id: Union[int, str] (номер участника)
+            data: dict (данные участника из хранилища)
+        """
+        room.add_participant(participant_id)
+        room.set_participant_name(participant_id, data['name'])
+        room.set_participant_surname(participant_id, data['surname'])
+        room.set_start_time_participant(participant_id, data['start_time'])
+        room.set_end_time_participant(participant_id, data['end_time'])
+        room.set_game_time_participant(participant_id, data['game_time'])
+        participant = room.get_participant(participant_id)
+        maze, previous_cells, inventory = unpack_participant_state(
+            data['state'], room.maze.get_maze())
+        participant['maze'].set_maze(maze)
+        participant['inventory'] = inventory
+        participant['previous_cells'].extend(previous_cells)
+        self._participant_rooms[participant_id] = room
+
+    def set_room_maze(self,
+                      room_number: str,
+                      maze: AbstractMazeGame,
+                      ) -> bool:
+        """
+        Заменяет лабиринт комнаты готовым лабиринтом.
+
+        Лабиринт комнаты и положение участников сохраняются в хранилище.
+
+        Args:
+            room_number: str (номер комнаты)
+            maze: AbstractMazeGame (сгенерированный игровой лабиринт)
+
+        Returns:
+            bool:
+                True - лабиринт заменён
+                False - комната не найдена
+        """
+        room = self.get_room(room_number)
+        if not room:
+            return False
+        room.set_maze(maze)
+        self.save_room(room_number, maze.get_maze_seed())
+        for participant_id in room.get_participants():
+            self.save_participant(participant_id)
+        return True
+
+    def reset_participant_maze(self,
+                               participant_id: Union[int, str]
+                               ) -> bool:
+        """
+        Выдаёт участнику новый лабиринт поверх текущего лабиринта комнаты.
+
+        Лабиринт комнаты и лабиринты остальных участников не меняются.
+        Положение участника сохраняется в хранилище.
+
+        Args:
+            participant_id: Union[int, str] (номер участника)
+
+        Returns:
+            bool:
+                True - лабиринт выдан
+                False - не состоит в комнате
+        """
+        room = self._get_room_by_participant(participant_id)
+        if not room or not room.reset_participant_maze(participant_id):
+            return False
+        self.save_participant(participant_id)
+        return True
+
+    def save_room(self,
+                  room_number: str,
+                  maze_seed: Optional[MazeSeed] = None,
+                  ) -> bool:
+        """
+        Сохраняет лабиринт комнаты в хранилище.
+
+        Вызывается после генерации лабиринта и расстановки эффектов. Если
+        передано зерно лабиринта, сохраняется только оно (около 20 байт),
+        иначе - упакованная сетка лабиринта.
+
+        Args:
+            room_number: str (номер комнаты)
+            maze_seed: Optional[MazeSeed] (зерно лабиринта комнаты)
+
+        Returns:
+            bool:
+                True - лабиринт сохранён
+                False - комната не найдена
+        """
+        room = self.get_room(room_number)
+        if not room:
+            return False
+        if not self._storage.persistent:
+            return True
+        if maze_seed:
+            data = pack_maze_seed(maze_seed)
+        else:
+            data = pack_maze(room.maze.get_maze())
+        self._storage.save_room(room_number, data)
+        return True
+
+    def save_participant(self, participant_id: Union[int, str]) -> bool:
+        """
+        Сохраняет данные и положение участника в хранилище.
+
+        Вызывается после ходов участника. Хранилище может накапливать
+        изменения и записывать их пачками.
+
+        Args:
+            participant_id: Union[int, str] (номер участника)
+
+        Returns:
+            bool:
+                True - участник сохранён
+                False - участник не найден
+        """
+        room = self._get_room_by_participant(participant_id)
+        if not room:
+            return False
+        if not self._storage.persistent:
+            # Упаковка состояния растёт с числом посещённых клеток, без
+            # хранилища её на каждом ходу не делаем.
+            return True
+        participant = room.get_participant(participant_id)
+        self._storage.save_participant(participant_id, {
+            'room_number': room.room_number,
+            'name': participant.get('name'),
+            'surname': participant.get('surname'),
+            'start_time': participant.get('start_time'),
+            'end_time': participant.get('end_time'),
+            'game_time': participant.get('game_time'),
+            'state': pack_participant_state(
+                participant['maze'].get_maze(),
+                participant['previous_cells'],
+                participant['inventory'],
+            ),
+        })
+        return True
+
+    def set_shard(self, index: int, count: int) -> None:
+        """
+        Устанавливает шард, которому принадлежат комнаты агрегатора.
+
+        Номера новых комнат выбираются так, чтобы int(номер) % count ==
+        index: по номеру комнаты фронт-процесс находит её шард.
+
+        Args:
+            index: int (номер шарда)
+            count: int (количество шардов)
+        """
+        self._shard = (index, count)
+
+    def _new_room_number(self) -> str:
+        """
+        Выбирает свободный номер комнаты этого шарда.
+
+        Номер берётся сразу из чисел вида k * count + index, поэтому
+        номера других шардов не перебираются.
+        """
+        index, count = self._shard
+        low = -(-(ROOM_NUMBER_MIN - index) // count)
+        high = (ROOM_NUMBER_MAX - index) // count
+        while True:
+            room_number = str(random.randint(low, high) * count + index)
+            if room_number not in self._rooms:
+                return room_number
+
+    def get_participant_ids(self) -> list[Union[int, str]]:
+        """
+        Возвращает идентификаторы всех участников, состоящих в комнатах.
+
+        Returns:
+            list: идентификаторы участников.
+        """
+        return list(self._participant_rooms)
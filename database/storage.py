@@ -0,0 +1,302 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from typing import Optional, Union
+
+from database.abstract.abstract_storage import AbstractRoomStorage
+
+logger = logging.getLogger(__name__)
+
+PARTICIPANT_FIELDS = ('room_number', 'name', 'surname', 'start_time',
+                      'end_time', 'game_time', 'state')
+
+
+class NullRoomStorage(AbstractRoomStorage):
+    """
+    Хранилище, которое ничего не хранит.
+
+    Используется по умолчанию, пока хранилище не настроено: агрегатор
+    комнат видит, что хранилище не постоянное, и не упаковывает состояние
+    участников на каждом ходу.
+    """
+    persistent = False
+
+    def save_room(self, room_number: str, maze: bytes) -> None:
+        pass
+
+    def delete_room(self, room_number: str) -> None:
+        pass
+
+    def save_participant(self,
+                         participant_id: Union[int, str],
+                         data: dict,
+                         ) -> None:
+        pass
+
+    def delete_participant(self, participant_id: Union[int, str]) -> None:
+        pass
+
+    def load_rooms(self) -> dict[str, tuple[bytes, dict]]:
+        return {}
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryRoomStorage(AbstractRoomStorage):
+    """
+    Хранилище комнат в памяти процесса.
+
+    Не переживает перезапуск, используется для сравнения с другими
+    хранилищами.
+
+    Fields:
+        _rooms: dict (номер комнаты -> упакованный лабиринт)
+        _participants: dict (идентификатор участника -> данные участника)
+        _room_participants: dict (номер комнаты -> идентификаторы её
+            участников, чтобы удаление комнаты не просматривало всех
+            участников)
+    """
+
+    def __init__(self):
+        self._rooms = {}
+        self._participants = {}
+        self._room_participants = {}
+
+    def save_room(self, room_number: str, maze: bytes) -> None:
+        self._rooms[room_number] = maze
+
+    def delete_room(self, room_number: str) -> None:
+        self._rooms.pop(room_number, None)
+        for participant_id in self._room_participants.pop(room_number, ()):
+            del self._participants[participant_id]
+
+    def save_participant(self,
+                         participant_id: Union[int, str],
+                         data: dict,
+                         ) -> None:
+        previous = self._participants.get(participant_id)
+        if (previous is not None
+                and previous['room_number'] != data['room_number']):
+            self._room_participants[previous['room_number']].discard(
+                participant_id)
+        self._participants[participant_id] = dict(data)
+        self._room_participants.setdefault(
+            data['room_number'], set()).add(participant_id)
+
+    def delete_participant(self, participant_id: Union[int, str]) -> None:
+        data = self._participants.pop(participant_id, None)
+        if data is not None:
+            self._room_participants[data['room_number']].discard(
+                participant_id)
+
+    def load_rooms(self) -> dict[str, tuple[bytes, dict]]:
+        rooms = {room_number: (maze, {})
+                 for room_number, maze in self._rooms.items()}
+        for participant_id, data in self._participants.items():
+            if data['room_number'] in rooms:
+                rooms[data['room_number']][1][participant_id] = dict(data)
+        return rooms
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteRoomStorage(AbstractRoomStorage):
+    """
+    Хранилище комнат в SQLite.
+
+    1) База работает в режиме WAL: чтение не блокируется записью, а запись
+       не ждёт fsync на каждую транзакцию (synchronous=NORMAL).
+    2) Изменения копятся в очереди и записываются одной транзакцией через
+       executemany, когда накопилось batch_size изменений или прошло
+       flush_interval секунд с прошлой записи (за этим следит задача
+       start_flush в цикле событий). Несколько изменений одного участника
+       (например, ходы) схлопываются в последнее.
+    3) Запросы - постоянные строки с параметрами, поэтому sqlite3 готовит
+       каждый запрос один раз и берёт его из кэша подготовленных запросов.
+    4) Лабиринты хранятся в упакованном двоичном виде (BLOB).
+
+    Fields:
+        _connection: sqlite3.Connection (соединение с базой)
+        _pending: dict (очередь изменений: (таблица, ключ) -> (операция,
+            параметры))
+        batch_size: int (количество изменений, после которого они
+            записываются)
+        flush_interval: float (максимальное время в секундах между
+            записями)
+        _flush_task: Optional[asyncio.Task] (задача периодической записи)
+    """
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS rooms ('
+        ' room_number TEXT PRIMARY KEY,'
+        ' maze BLOB NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS participants ('
+        ' participant_id PRIMARY KEY,'
+        ' room_number TEXT NOT NULL,'
+        ' name TEXT,'
+        ' surname TEXT,'
+        ' start_time REAL,'
+        ' end_time REAL,'
+        ' game_time REAL,'
+        ' state BLOB NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS participants_room'
+        ' ON participants (room_number)',
+    )
+    # Операция -> запросы, выполняемые для каждого набора параметров.
+    _STATEMENTS = {
+        'save_room': (
+            'INSERT OR REPLACE INTO rooms (room_number, maze) VALUES (?, ?)',
+        ),
+        'delete_room': (
+            'DELETE FROM participants WHERE room_number = ?',
+            'DELETE FROM rooms WHERE room_number = ?',
+        ),
+        'save_participant': (
+            'INSERT OR REPLACE INTO participants (participant_id, '
+            'room_number, name, surname, start_time, end_time, game_time, '
+            'state) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        ),
+        'delete_participant': (
+            'DELETE FROM participants WHERE participant_id = ?',
+        ),
+    }
+
+    def __init__(self,
+                 path: str,
+                 batch_size: int = 256,
+                 flush_interval: float = 1.0,
+                 ):
+        """
+        Args:
+            path: str (путь к файлу базы)
+            batch_size: int (количество изменений в одной транзакции)
+            flush_interval: float (максимальное время в секундах между
+            записями)
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Хранилище используется из потока генерации лабиринтов тоже,
+        # записи упорядочены вызывающим кодом.
+        self._connection = sqlite3.connect(path, check_same_thread=False,
+                                           isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        for statement in self._SCHEMA:
+            self._connection.execute(statement)
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _enqueue(self, key: tuple, operation: str, params: tuple) -> None:
+        """
+        Добавляет изменение в очередь.
+
+        Более раннее изменение того же объекта удаляется из очереди, новое
+        встаёт в её конец, поэтому порядок изменений разных объектов
+        сохраняется.
+        """
+        self._pending.pop(key, None)
+        self._pending[key] = (operation, params)
+        if (len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush
+                >= self.flush_interval):
+            self.flush()
+
+    def save_room(self, room_number: str, maze: bytes) -> None:
+        self._enqueue(('room', room_number), 'save_room',
+                      (room_number, maze))
+
+    def delete_room(self, room_number: str) -> None:
+        self._enqueue(('room', room_number), 'delete_room', (room_number,))
+
+    def save_participant(self,
+                         participant_id: Union[int, str],
+                         data: dict,
+                         ) -> None:
+        self._enqueue(
+            ('participant', participant_id), 'save_participant',
+            (participant_id,
+             *(data.get(field) for field in PARTICIPANT_FIELDS)),
+        )
+
+    def delete_participant(self, participant_id: Union[int, str]) -> None:
+        self._enqueue(('participant', participant_id), 'delete_participant',
+                      (participant_id,))
+
+    def load_rooms(self) -> dict[str, tuple[bytes, dict]]:
+        self.flush()
+        rooms = {room_number: (maze, {}) for room_number, maze in
+                 self._connection.execute(
+                     'SELECT room_number, maze FROM rooms')}
+        for participant_id, *values in self._connection.execute(
+                'SELECT participant_id, room_number, name, surname, '
+                'start_time, end_time, game_time, state FROM participants'):
+            data = dict(zip(PARTICIPANT_FIELDS, values))
+            if data['room_number'] in rooms:
+                rooms[data['room_number']][1][participant_id] = data
+        return rooms
+
+    def flush(self) -> None:
+        """
+        Записывает очередь изменений одной транзакцией.
+
+        Подряд идущие одинаковые операции выполняются одним executemany.
+        """
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        pending = list(self._pending.values())
+        self._pending.clear()
+        groups = []
+        for operation, params in pending:
+            if groups and groups[-1][0] == operation:
+                groups[-1][1].append(params)
+            else:
+                groups.append((operation, [params]))
+        with self._connection:
+            self._connection.execute('BEGIN')
+            for operation, params_list in groups:
+                for statement in self._STATEMENTS[operation]:
+                    self._connection.executemany(statement, params_list)
+
+    async def run_flush(self) -> None:
+        """
+        Записывает очередь не позже чем через flush_interval секунд после
+        прошлой записи, пока задачу не отменят.
+
+        Без неё изменения, не набравшие batch_size, ждали бы в очереди
+        следующего изменения.
+        """
+        while True:
+            await asyncio.sleep(max(
+                self._last_flush + self.flush_interval - time.monotonic(),
+                0))
+            if time.monotonic() - self._last_flush < self.flush_interval:
+                # Очередь уже записали во время ожидания.
+                continue
+            try:
+                self.flush()
+            except sqlite3.Error:
+                logger.exception('Не удалось записать изменения комнат')
+
+    def start_flush(self) -> asyncio.Task:
+        """
+        Запускает периодическую запись очереди (из цикла событий).
+        """
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.run_flush())
+        return self._flush_task
+
+    def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        self.flush()
+        self._connection.close()
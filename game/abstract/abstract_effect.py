@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Type
+from typing import Iterable, Type
 
 
 class AbstractEffectType(ABC):
@@ -15,9 +15,13 @@ class AbstractEffect(ABC):
     """
     Конкретный эффект, содержит тип эффекта и коофицент, влияющий на дальнейшие
     расчёты последствий вставания на клетку.
+
+    Вес (weight) задаёт относительную частоту эффекта при взвешенной
+    выборке.
     """
     coefficient: float
     effect_type: AbstractEffectType
+    weight: float
 
     @abstractmethod
     def get_effect(self) -> dict:
@@ -41,6 +45,8 @@ class BaseEffect(AbstractEffect):
     Содержит реализованный метод get_effect, работающий без корректировок для
     любых дочерних классов. Реализует паттерн Singleton.
     """
+    weight = 1.0
+
     def get_effect(self) -> dict:
         """
         Получение данных об эффекте по умолчанию.
@@ -67,18 +73,18 @@ class AbstractFactoryEffects(ABC):
     @classmethod
     @abstractmethod
     def get_effects_by_type(cls,
-                            effect_types: list[Type[AbstractEffectType]]
-                            ) -> list[Type[AbstractEffect]]:
+                            effect_types: Iterable[Type[AbstractEffectType]]
+                            ) -> tuple[AbstractEffect, ...]:
         """
-        Возвращает список с эффектами отфильтрованных по указанным типам.
+        Возвращает эффекты, отфильтрованные по указанным типам.
         """
         pass
 
-    @staticmethod
+    @classmethod
     @abstractmethod
-    def get_effects() -> list[Type[AbstractEffect]]:
+    def get_effects(cls) -> tuple[AbstractEffect, ...]:
         """
-        Возвращает список со всеми эффектами.
+        Возвращает все эффекты.
         """
         pass
 
@@ -94,6 +100,10 @@ class AbstractFactoryEffects(ABC):
 class AbstractReducingImpactEffects(ABC):
     """
     Уменьшает воздействие негативных эффектов.
+
+    Коэффициент эффекта того же типа (effect_type) делится на коэффициент
+    предмета, но не становится меньше 1.
     """
+    name: str
     coefficient: float
     effect_type: AbstractEffectType
@@ -0,0 +1,32 @@
+import random
+from abc import ABC, abstractmethod
+
+from game.abstract.abstract_maze import AbstractMaze
+
+
+class AbstractMazeGenerator(ABC):
+    """
+    Алгоритм генерации лабиринта.
+
+    Получает лабиринт, у всех клеток которого есть все стены, и удаляет
+    стены так, что из любой клетки можно попасть в любую другую ровно одним
+    путём (идеальный лабиринт). Работает через API AbstractMaze, поэтому
+    подходит для любого класса лабиринта (Maze, CompactMaze, MazeOverlay).
+
+    Fields:
+        name: str (имя алгоритма, используется в MazeGame и MazeSeed)
+    """
+    name: str
+
+    @abstractmethod
+    def generate(self,
+                 maze: AbstractMaze,
+                 random_generator: random.Random,
+                 ) -> None:
+        """
+        Генерирует лабиринт.
+
+        После генерации все клетки помечены посещёнными (mark_visited).
+        Текущая клетка лабиринта может быть любой.
+        """
+        pass
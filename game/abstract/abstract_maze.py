@@ -1,13 +1,32 @@
+import random
 from abc import ABC, abstractmethod
 from typing import Union, Optional, Type
 
 from game.abstract.abstract_effect import AbstractEffectType
 
 
+# Битовые маски стен клетки. Все четыре стены помещаются в 4 бита.
+WALL_TOP = 1
+WALL_RIGHT = 2
+WALL_BOTTOM = 4
+WALL_LEFT = 8
+ALL_WALLS = WALL_TOP | WALL_RIGHT | WALL_BOTTOM | WALL_LEFT
+
+WALL_BITS = {
+    'top': WALL_TOP,
+    'right': WALL_RIGHT,
+    'bottom': WALL_BOTTOM,
+    'left': WALL_LEFT,
+}
+
+
 class BaseCell(ABC):
     """
     Базовый класс клетки в лабиринте.
     """
+    # Пустые слоты позволяют наследникам (например, представлениям клеток)
+    # не создавать __dict__ на каждый объект.
+    __slots__ = ()
     x: int  # Положение клетки по X
     y: int  # Положение клетки по Y
     visited: bool  # Посещена ли клетка при создании лабиринта
@@ -19,6 +38,14 @@ class BaseCell(ABC):
     def walls(self):
         return self._walls
 
+    @property
+    def wall_mask(self) -> int:
+        """
+        Стены клетки в виде 4-битной маски (см. WALL_BITS).
+        """
+        walls = self.walls
+        return sum(bit for wall, bit in WALL_BITS.items() if walls[wall])
+
 
 class AbstractMaze(ABC):
     @abstractmethod
@@ -40,10 +67,36 @@ class AbstractMaze(ABC):
         pass
 
     @abstractmethod
-    def check_neighbors(self) -> Union[bool, BaseCell]:
+    def check_neighbors(self,
+                        random_generator: Optional[random.Random] = None,
+                        ) -> Union[bool, BaseCell]:
         """
         Проверка соседних клеток. Если такие имеются - возвращает BaseCell,
         иначе False.
+
+        Соседи перебираются в порядке top, right, bottom, left, поэтому при
+        одном и том же генераторе случайных чисел (random_generator) выбор
+        не зависит от класса лабиринта.
+        """
+        pass
+
+    def get_wall_mask(self, x: int, y: int) -> int:
+        """
+        Возвращает стены клетки в виде 4-битной маски (см. WALL_BITS).
+
+        Реализации с массивом стен переопределяют метод, чтобы читать маску
+        без создания объекта клетки.
+
+        Args:
+            x: int (координата X существующей клетки).
+            y: int (координата Y существующей клетки).
+        """
+        return self.check_cell(x, y).wall_mask
+
+    @abstractmethod
+    def mark_visited(self, cell: BaseCell) -> None:
+        """
+        Помечает клетку посещённой при генерации лабиринта.
         """
         pass
 
@@ -92,12 +145,41 @@ class AbstractMazeGame(ABC):
                         effect_types: list[
                             Optional[Type[AbstractEffectType]]] = None,
                         win: bool = True,
+                        effect_weights: Union[str, dict, None] = None,
                         ) -> None:
         """
         Проставляет указанное количество эффектов на случайные клетки.
         """
         pass
 
+    @abstractmethod
+    def get_maze_seed(self):
+        """
+        Получить зерно (MazeSeed) для повторной генерации лабиринта.
+        """
+        pass
+
+    @abstractmethod
+    def get_distance_to_exit(self) -> Optional[int]:
+        """
+        Получить количество ходов от текущей клетки до выхода.
+        """
+        pass
+
+    @abstractmethod
+    def get_path_to_exit(self) -> list[BaseCell]:
+        """
+        Получить кратчайший путь от текущей клетки до выхода.
+        """
+        pass
+
+    @abstractmethod
+    def get_best_game_time(self) -> Optional[float]:
+        """
+        Получить наименьшее возможное время прохождения лабиринта.
+        """
+        pass
+
     @abstractmethod
     def get_maze(self) -> AbstractMaze:
         """
@@ -1,8 +1,8 @@
-from abstract.abstract_effect import AbstractReducingImpactEffects
-from effect_type import (ReduceTimeRemainingEffectType,
-                         IncreasesEffectTypeCellCompletionTime,
-                         ChangingItemsEffectType
-                         )
+from game.abstract.abstract_effect import AbstractReducingImpactEffects
+from game.effect_type import (ReduceTimeRemainingEffectType,
+                              IncreasesEffectTypeCellCompletionTime,
+                              ChangingItemsEffectType
+                              )
 
 
 class BaseObstaclesReducingTimeRemainingEffect(AbstractReducingImpactEffects):
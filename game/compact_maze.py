@@ -0,0 +1,375 @@
+import random
+from collections.abc import Sequence
+from typing import Union, Optional
+
+from game.abstract.abstract_maze import (BaseCell, AbstractMaze, WALL_TOP,
+                                         WALL_RIGHT, WALL_BOTTOM, WALL_LEFT,
+                                         ALL_WALLS, WALL_BITS)
+from game.overlay_maze import MazeOverlay
+
+
+def _get_bit(bits: bytearray, index: int) -> bool:
+    return bool(bits[index >> 3] & (1 << (index & 7)))
+
+
+def _set_bit(bits: bytearray, index: int, value: bool) -> None:
+    if value:
+        bits[index >> 3] |= 1 << (index & 7)
+    else:
+        bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+
+class _PendingEffects(list):
+    """
+    Пустой список эффектов клетки, у которой эффектов ещё нет.
+
+    Регистрирует себя в лабиринте только при добавлении первого эффекта,
+    поэтому чтение эффектов не создаёт списков для каждой клетки.
+    """
+
+    def __init__(self, maze: 'CompactMaze', index: int):
+        super().__init__()
+        self._maze = maze
+        self._index = index
+
+    def _register(self) -> None:
+        self._maze._effects.setdefault(self._index, self)
+
+    def append(self, effect) -> None:
+        self._register()
+        super().append(effect)
+
+    def extend(self, effects) -> None:
+        self._register()
+        super().extend(effects)
+
+    def insert(self, index: int, effect) -> None:
+        self._register()
+        super().insert(index, effect)
+
+
+class CellView(BaseCell):
+    """
+    Лёгкое представление клетки компактного лабиринта (CompactMaze).
+
+    Не хранит собственного состояния: стены, флаги посещения и эффекты
+    читаются и записываются в массивы лабиринта по индексу клетки.
+
+    Fields:
+        x: int (координата X).
+        y: int (координата Y).
+    """
+    __slots__ = ('_maze', '_index', 'x', 'y')
+
+    def __init__(self, maze: 'CompactMaze', index: int):
+        self._maze = maze
+        self._index = index
+        self.y, self.x = divmod(index, maze.maze_size)
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def wall_mask(self) -> int:
+        return self._maze._walls[self._index]
+
+    @property
+    def walls(self) -> dict:
+        mask = self._maze._walls[self._index]
+        return {wall: bool(mask & bit) for wall, bit in WALL_BITS.items()}
+
+    def remove_walls(self, *args) -> None:
+        """
+        Удаляет у клетки указанные стены.
+
+        Args:
+            args: tuple[str] (кортеж со стенами: top, right, bottom, left).
+        """
+        for wall in args:
+            if wall in WALL_BITS:
+                self._maze._walls[self._index] &= ~WALL_BITS[wall] & 0xFF
+
+    @property
+    def visited(self) -> bool:
+        return _get_bit(self._maze._visited, self._index)
+
+    @visited.setter
+    def visited(self, value: bool):
+        _set_bit(self._maze._visited, self._index, value)
+
+    @property
+    def user_visited(self) -> bool:
+        return _get_bit(self._maze._user_visited, self._index)
+
+    @user_visited.setter
+    def user_visited(self, value: bool):
+        _set_bit(self._maze._user_visited, self._index, value)
+
+    @property
+    def effects(self) -> list:
+        effects = self._maze._effects.get(self._index)
+        if effects is None:
+            return _PendingEffects(self._maze, self._index)
+        return effects
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CellView):
+            return (self._maze is other._maze
+                    and self._index == other._index)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self._maze), self._index))
+
+    def __repr__(self) -> str:
+        return f'({self.x};{self.y})'
+
+
+class CellSequence(Sequence):
+    """
+    Последовательность клеток компактного лабиринта.
+
+    Создаёт представления клеток (CellView) по требованию, не храня их.
+    """
+
+    def __init__(self, maze: 'CompactMaze'):
+        self._maze = maze
+
+    def __len__(self) -> int:
+        return len(self._maze._walls)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Клетки с таким индексом нет в лабиринте')
+        return CellView(self._maze, index)
+
+    def copy(self) -> list[CellView]:
+        """
+        Возвращает список представлений всех клеток.
+        """
+        return list(self)
+
+
+class CompactMaze(AbstractMaze):
+    """
+    Компактный лабиринт, хранящий клетки в массивах.
+
+    Альтернатива Maze для больших лабиринтов и большого числа комнат.
+    Вместо объекта Cell на каждую клетку хранит:
+    1) Стены - 4-битную маску на клетку в bytearray (_walls).
+    2) Флаги visited и user_visited - битовые множества (_visited,
+       _user_visited).
+    3) Эффекты - разреженный словарь индекс клетки -> список эффектов.
+
+    Снаружи предоставляет тот же API AbstractMaze через лёгкие представления
+    клеток (CellView).
+
+    Fields:
+        maze_size: int (размер лабиринта по X и Y).
+        _walls: None | bytearray (маски стен клеток).
+        _visited: None | bytearray (клетки, посещённые при генерации).
+        _user_visited: None | bytearray (клетки, посещённые игроком).
+        _effects: None | dict (эффекты клеток).
+        _current_index: int (индекс клетки, в которой находится
+            пользователь).
+    """
+    _walls = None
+    _visited = None
+    _user_visited = None
+    _effects = None
+    _current_index = 0
+    # Количество клеток, ещё не посещённых при генерации лабиринта.
+    _not_visited_count = 0
+
+    def __init__(self, maze_size: int, *args, **kwargs):
+        self.maze_size = maze_size  # Размер лабиринта
+
+    def generate(self) -> None:
+        """
+        Генерирует лабиринт.
+
+        Создаёт массивы на maze_size * maze_size клеток, у каждой клетки
+        изначально есть все четыре стены.
+        """
+        cells = self.maze_size * self.maze_size
+        bitset_size = (cells + 7) // 8
+        self._walls = bytearray([ALL_WALLS]) * cells
+        self._visited = bytearray(bitset_size)
+        self._user_visited = bytearray(bitset_size)
+        self._effects = {}
+        self._not_visited_count = cells
+        self._current_index = self._get_standard_entry_index()
+
+    def _get_standard_entry_index(self) -> int:
+        return self.maze_size // 2
+
+    def get_standard_entry_point(self) -> CellView:
+        """
+        Получает изначальное положение пользователя в лабиринте.
+
+        Изначальное положение: центр лабиринта по X и 0 по Y.
+
+        Returns:
+            CellView: точка в которой по умолчанию находится пользователь.
+        """
+        return CellView(self, self._get_standard_entry_index())
+
+    def check_cell(self, x: int, y: int) -> Union[bool, CellView]:
+        """
+        Проверяет существует ли клетка в лабиринте.
+
+        Args:
+            x: int (координата X проверяемой клетки).
+            y: int (координата Y проверяемой клетки).
+
+        Returns:
+            Union[False, CellView]:
+                bool[False] - клетки с такими координатами нет в лабиринте.
+                CellView - найденная клетка.
+        """
+        if 0 <= x < self.maze_size and 0 <= y < self.maze_size:
+            return CellView(self, x + y * self.maze_size)
+        return False
+
+    def _neighbor_indexes(self, index: int) -> dict:
+        """
+        Возвращает индексы соседних клеток (None, если клетки нет).
+        """
+        size = self.maze_size
+        y, x = divmod(index, size)
+        return {
+            'top': index - size if y > 0 else None,
+            'right': index + 1 if x < size - 1 else None,
+            'bottom': index + size if y < size - 1 else None,
+            'left': index - 1 if x > 0 else None,
+        }
+
+    def check_neighbors(self,
+                        random_generator: Optional[random.Random] = None,
+                        ) -> Union[bool, CellView]:
+        """
+        Получение случайной соседней не посещённой клетки.
+
+        Args:
+            random_generator: Optional[random.Random] (генератор случайных
+            чисел, по умолчанию модуль random)
+
+        Returns:
+            Union[False, CellView]:
+                bool[False] - соседних, не посещённых клеток нет.
+                CellView - случайная соседняя клетка.
+        """
+        visited = self._visited
+        neighbors = [
+            index for index in
+            self._neighbor_indexes(self._current_index).values()
+            if index is not None and not _get_bit(visited, index)
+        ]
+        if not neighbors:
+            return False
+        return CellView(self, (random_generator or random).choice(neighbors))
+
+    def get_neighbors(self) -> dict:
+        """
+        Возвращает словарь с соседними клетками.
+
+        Если клетки не существует, она будет False.
+
+        Returns:
+            dict: (словарь с клетками).
+        """
+        return {
+            direction: CellView(self, index) if index is not None else False
+            for direction, index in
+            self._neighbor_indexes(self._current_index).items()
+        }
+
+    def get_wall_mask(self, x: int, y: int) -> int:
+        """
+        Возвращает стены клетки в виде 4-битной маски (см. WALL_BITS).
+
+        Маска читается напрямую из массива стен без создания CellView.
+
+        Args:
+            x: int (координата X существующей клетки).
+            y: int (координата Y существующей клетки).
+
+        Returns:
+            int (маска из битов WALL_*).
+        """
+        return self._walls[x + y * self.maze_size]
+
+    def remove_walls(self, next_cell: CellView) -> None:
+        """
+        Удаляет стены у текущей и следующей клетки.
+
+        Args:
+            next_cell: CellView (клетка в которую мы переходим).
+        """
+        current = self._current_index
+        following = next_cell.index
+        walls = self._walls
+        difference = following - current
+        if difference == 1:
+            walls[current] &= ~WALL_RIGHT & 0xFF
+            walls[following] &= ~WALL_LEFT & 0xFF
+        elif difference == -1:
+            walls[current] &= ~WALL_LEFT & 0xFF
+            walls[following] &= ~WALL_RIGHT & 0xFF
+        elif difference == self.maze_size:
+            walls[current] &= ~WALL_BOTTOM & 0xFF
+            walls[following] &= ~WALL_TOP & 0xFF
+        elif difference == -self.maze_size:
+            walls[current] &= ~WALL_TOP & 0xFF
+            walls[following] &= ~WALL_BOTTOM & 0xFF
+
+    def mark_visited(self, cell: CellView) -> None:
+        """
+        Помечает клетку посещённой при генерации лабиринта.
+
+        Args:
+            cell: CellView (посещаемая клетка).
+        """
+        if not _get_bit(self._visited, cell.index):
+            _set_bit(self._visited, cell.index, True)
+            self._not_visited_count -= 1
+
+    def check_exist_not_visited_cell(self) -> bool:
+        """
+        Проверяет есть ли в лабиринте не посещённые клетки.
+
+        Returns:
+            bool:
+                True - Есть.
+                False - Нет.
+        """
+        return self._not_visited_count > 0
+
+    def copy(self) -> AbstractMaze:
+        """
+        Копирует лабиринт.
+
+        Возвращает копию с копированием при записи (MazeOverlay), массивы
+        стен и эффекты остаются общими.
+
+        Returns:
+            AbstractMaze: новый лабиринт
+        """
+        return MazeOverlay(self)
+
+    @property
+    def current_cell(self) -> CellView:
+        return CellView(self, self._current_index)
+
+    @current_cell.setter
+    def current_cell(self, cell: CellView):
+        self._current_index = cell.index
+
+    @property
+    def maze(self) -> CellSequence:
+        return CellSequence(self)
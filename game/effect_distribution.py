@@ -0,0 +1,235 @@
+"""
+Распределение эффектов по редкости для MazeGame.arrange_effects.
+
+Веса эффектов компилируются в таблицу псевдонимов Уолкера (AliasTable):
+построение O(n), одна выборка - одно случайное число и одно сравнение,
+то есть O(1) независимо от количества эффектов.
+
+Веса задаются:
+1) Именем пресета сложности (DIFFICULTY_PRESETS).
+2) Словарём эффект (класс или имя класса) -> вес. Эффекты, которых нет
+   в словаре, не выбираются.
+"""
+import random
+from typing import Optional, Sequence, Type, Union
+
+from game.abstract.abstract_effect import AbstractEffect, AbstractEffectType
+from game.effects import FactoryEffects
+
+# Пресеты сложности: имя класса эффекта -> вес. None - веса (редкость) из
+# атрибута weight классов эффектов.
+DIFFICULTY_PRESETS = {
+    'easy': {'HeatEffect': 0.5, 'ColdEffect': 3, 'FloodEffect': 0.25,
+             'SharpStonesEffect': 1},
+    'normal': None,
+    'hard': {'HeatEffect': 2, 'ColdEffect': 1, 'FloodEffect': 2,
+             'SharpStonesEffect': 1.5},
+}
+# Количество распределений в кэше get_effect_distribution.
+DISTRIBUTIONS_CACHE_SIZE = 64
+
+EffectWeights = Union[str, dict]
+_distributions = {}
+
+
+class AliasTable:
+    """
+    Таблица псевдонимов Уолкера для выборки индексов с заданными весами.
+
+    Каждому индексу i соответствует «корзина» с вероятностью остаться в i
+    и псевдонимом (_alias), в который выборка уходит иначе. Построение -
+    алгоритм Воуза.
+
+    Fields:
+        size: int (количество индексов)
+        _threshold: list[float] (i + вероятность остаться в корзине i:
+            случайное число из [0, size) меньше порога - выбран i)
+        _alias: list[int] (псевдоним корзины)
+    """
+    __slots__ = ('size', '_threshold', '_alias')
+
+    def __init__(self, weights: Sequence[float]):
+        """
+        Args:
+            weights: Sequence[float] (неотрицательные веса индексов)
+
+        Raises:
+            ValueError: весов нет, есть отрицательный вес или сумма весов
+            равна нулю.
+        """
+        size = len(weights)
+        total = float(sum(weights))
+        if not size or total <= 0 or min(weights) < 0:
+            raise ValueError('Веса должны быть неотрицательными, а их сумма '
+                             '- положительной')
+        self.size = size
+        probability = [weight * size / total for weight in weights]
+        alias = list(range(size))
+        small = [index for index, value in enumerate(probability)
+                 if value < 1]
+        large = [index for index, value in enumerate(probability)
+                 if value >= 1]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            alias[less] = more
+            probability[more] -= 1 - probability[less]
+            if probability[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+        # Остатки из-за ошибок округления - полные корзины.
+        for index in small + large:
+            probability[index] = 1.0
+        self._threshold = [index + value
+                           for index, value in enumerate(probability)]
+        self._alias = alias
+
+    def sample(self, random_generator: Optional[random.Random] = None
+               ) -> int:
+        """
+        Выбирает индекс с учётом весов.
+
+        Args:
+            random_generator: Optional[random.Random] (генератор случайных
+            чисел, по умолчанию модуль random)
+
+        Returns:
+            int: индекс.
+        """
+        # Целая часть случайного числа выбирает корзину, дробная - остаться
+        # в ней или уйти в псевдоним.
+        value = (random_generator or random).random() * self.size
+        index = int(value)
+        if value < self._threshold[index]:
+            return index
+        return self._alias[index]
+
+    def sample_many(self, amount: int,
+                    random_generator: Optional[random.Random] = None,
+                    ) -> list[int]:
+        """
+        Выбирает amount индексов (с возвращением) с учётом весов.
+
+        Args:
+            amount: int (количество индексов)
+            random_generator: Optional[random.Random] (генератор случайных
+            чисел, по умолчанию модуль random)
+
+        Returns:
+            list[int]: индексы.
+        """
+        random_ = (random_generator or random).random
+        size = self.size
+        threshold = self._threshold
+        alias = self._alias
+        values = [random_() * size for _ in range(amount)]
+        return [index if value < threshold[index] else alias[index]
+                for value, index in zip(values, map(int, values))]
+
+
+class EffectDistribution:
+    """
+    Эффекты с весами, скомпилированными в таблицу псевдонимов.
+
+    Fields:
+        effects: tuple[AbstractEffect] (эффекты с положительным весом)
+        weights: tuple[float] (веса эффектов)
+        source: tuple[AbstractEffect] (эффекты реестра, из которых
+            построено распределение; по нему проверяется актуальность кэша)
+        _table: AliasTable (таблица псевдонимов)
+    """
+
+    def __init__(self, effects: Sequence[AbstractEffect],
+                 weights: Sequence[float],
+                 source: tuple = ()):
+        pairs = [(effect, weight) for effect, weight in zip(effects, weights)
+                 if weight > 0]
+        if not pairs:
+            raise ValueError('Нет эффектов с положительным весом')
+        self.effects = tuple(effect for effect, _ in pairs)
+        self.weights = tuple(float(weight) for _, weight in pairs)
+        self.source = source
+        self._table = AliasTable(self.weights)
+
+    def sample(self, random_generator: Optional[random.Random] = None
+               ) -> AbstractEffect:
+        """
+        Выбирает эффект с учётом весов.
+        """
+        return self.effects[self._table.sample(random_generator)]
+
+    def sample_many(self, amount: int,
+                    random_generator: Optional[random.Random] = None,
+                    ) -> list[AbstractEffect]:
+        """
+        Выбирает amount эффектов (с повторениями) с учётом весов.
+        """
+        effects = self.effects
+        return [effects[index] for index in
+                self._table.sample_many(amount, random_generator)]
+
+
+def resolve_weights(effects: Sequence[AbstractEffect],
+                    effect_weights: EffectWeights) -> list[float]:
+    """
+    Возвращает веса эффектов по пресету или словарю весов.
+
+    Args:
+        effects: Sequence[AbstractEffect] (эффекты)
+        effect_weights: Union[str, dict] (имя пресета DIFFICULTY_PRESETS или
+        словарь эффект (класс или имя класса) -> вес)
+
+    Returns:
+        list[float]: веса в порядке effects.
+
+    Raises:
+        ValueError: пресета с таким именем нет.
+    """
+    if isinstance(effect_weights, str):
+        if effect_weights not in DIFFICULTY_PRESETS:
+            raise ValueError(f'Неизвестный пресет сложности: '
+                             f'{effect_weights}')
+        effect_weights = DIFFICULTY_PRESETS[effect_weights]
+        if effect_weights is None:
+            return [effect.weight for effect in effects]
+    weights = {(key if isinstance(key, str) else key.__name__): weight
+               for key, weight in effect_weights.items()}
+    return [weights.get(type(effect).__name__, 0) for effect in effects]
+
+
+def get_effect_distribution(effect_weights: EffectWeights,
+                            effect_types: Optional[list[
+                                Type[AbstractEffectType]]] = None,
+                            ) -> EffectDistribution:
+    """
+    Возвращает распределение эффектов (с кэшем).
+
+    Распределение строится заново, если реестр эффектов изменился
+    (FactoryEffects.register, FactoryEffects.invalidate).
+
+    Args:
+        effect_weights: Union[str, dict] (пресет или словарь весов, см.
+        resolve_weights)
+        effect_types: Optional[list[AbstractEffectType]] (использовать
+        только эффекты из указанных категорий)
+
+    Returns:
+        EffectDistribution: распределение.
+    """
+    if isinstance(effect_weights, dict):
+        weights_key = tuple(sorted(
+            ((key if isinstance(key, str) else key.__name__), weight)
+            for key, weight in effect_weights.items()))
+    else:
+        weights_key = effect_weights
+    key = (weights_key, tuple(effect_types) if effect_types else None)
+    source = FactoryEffects.get_effects_by_type(effect_types)
+    distribution = _distributions.get(key)
+    if distribution is None or distribution.source is not source:
+        distribution = EffectDistribution(
+            source, resolve_weights(source, effect_weights), source)
+        if len(_distributions) >= DISTRIBUTIONS_CACHE_SIZE:
+            _distributions.clear()
+        _distributions[key] = distribution
+    return distribution
@@ -1,4 +1,4 @@
-from typing import Type
+from typing import Iterable, Optional, Type
 
 from game.abstract.abstract_effect import (BaseEffect, AbstractEffectType,
                                            AbstractEffect,
@@ -9,6 +9,148 @@ from game.effect_type import (ReduceTimeRemainingEffectType,
                               WinEffectType)
 
 
+class FactoryEffects(AbstractFactoryEffects):
+    """
+    Реестр эффектов: создаёт и возвращает объекты эффектов.
+
+    Эффекты регистрируются декоратором register. Кортежи эффектов (всех и
+    по типам) и индекс по имени строятся один раз при первом запросе и
+    дальше отдаются из кэша, поэтому получение эффектов при создании
+    комнаты ничего не стоит. Регистрация и отмена регистрации сбрасывают
+    кэш (invalidate).
+
+    Порядок эффектов - порядок регистрации: от него зависят лабиринты,
+    повторно генерируемые по зерну (game.maze_seed).
+
+    Fields:
+        _effect_classes: list (зарегистрированные классы эффектов)
+        _effects: Optional[tuple] (эффекты, None - кэш не построен)
+        _effects_by_name: dict (имя класса -> эффект, включая эффект
+            победы)
+        _selections: dict (ключ выборки по типам -> кортеж эффектов)
+    """
+    _effect_classes: list[Type[AbstractEffect]] = []
+    _effects: Optional[tuple] = None
+    _effects_by_name: dict = {}
+    _selections: dict = {}
+
+    @classmethod
+    def register(cls, effect_class: Type[AbstractEffect]
+                 ) -> Type[AbstractEffect]:
+        """
+        Регистрирует эффект (используется как декоратор класса).
+
+        Args:
+            effect_class: Type[AbstractEffect] (класс эффекта)
+
+        Returns:
+            Type[AbstractEffect]: тот же класс.
+        """
+        if effect_class not in cls._effect_classes:
+            cls._effect_classes.append(effect_class)
+            cls.invalidate()
+        return effect_class
+
+    @classmethod
+    def unregister(cls, effect_class: Type[AbstractEffect]) -> bool:
+        """
+        Отменяет регистрацию эффекта.
+
+        Returns:
+            bool:
+                True - регистрация отменена
+                False - эффект не был зарегистрирован
+        """
+        if effect_class not in cls._effect_classes:
+            return False
+        cls._effect_classes.remove(effect_class)
+        cls.invalidate()
+        return True
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """
+        Сбрасывает кэш эффектов. Кэш будет построен заново при следующем
+        запросе (например, после изменения весов эффектов плагином).
+        """
+        cls._effects = None
+        cls._effects_by_name = {}
+        cls._selections = {}
+
+    @classmethod
+    def _build(cls) -> tuple:
+        effects = tuple(effect_class() for effect_class in cls._effect_classes)
+        win_effect = cls.get_win_effect()
+        cls._effects_by_name = {type(effect).__name__: effect
+                                for effect in (*effects, win_effect)}
+        cls._effects = effects
+        return effects
+
+    @classmethod
+    def get_effects(cls) -> tuple[AbstractEffect, ...]:
+        """
+        Получение всех эффектов, кроме эффекта победы.
+
+        Returns:
+            tuple[AbstractEffect]: эффекты в порядке регистрации.
+        """
+        effects = cls._effects
+        if effects is None:
+            effects = cls._build()
+        return effects
+
+    @staticmethod
+    def _selection_key(effect_types: Optional[Iterable[
+            Type[AbstractEffectType]]]) -> Optional[tuple]:
+        return tuple(effect_types) if effect_types else None
+
+    @classmethod
+    def get_effects_by_type(cls,
+                            effect_types: Iterable[Type[AbstractEffectType]]
+                            ) -> tuple[AbstractEffect, ...]:
+        """
+        Получение эффекта по типам.
+
+        Args:
+            effect_types: Iterable[AbstractEffectType] (типы эффектов)
+
+        Returns:
+            tuple[AbstractEffect]: эффекты указанных типов в порядке
+            регистрации.
+        """
+        key = cls._selection_key(effect_types)
+        effects = cls.get_effects()
+        if key is None:
+            return effects
+        selection = cls._selections.get(key)
+        if selection is None:
+            selection = tuple(effect for effect in effects
+                              if effect.effect_type in key)
+            cls._selections[key] = selection
+        return selection
+
+    @classmethod
+    def get_effect_by_name(cls, name: str) -> Optional[AbstractEffect]:
+        """
+        Возвращает эффект по имени класса (включая эффект победы).
+
+        Returns:
+            AbstractEffect: эффект.
+            None: эффект с таким именем не зарегистрирован.
+        """
+        if cls._effects is None:
+            cls._build()
+        return cls._effects_by_name.get(name)
+
+    @staticmethod
+    def get_win_effect() -> AbstractEffect:
+        """
+        Получить эффект победы.
+        """
+        return WinEffect()
+
+
+@FactoryEffects.register
 class HeatEffect(BaseEffect):
     """
     Эффект - жара. Уменьшает оставшееся время на прохождение лабиринта.
@@ -22,6 +164,7 @@ class HeatEffect(BaseEffect):
                f' {(self.coefficient - 1) * 100}%.'
 
 
+@FactoryEffects.register
 class ColdEffect(BaseEffect):
     """
     Эффект - холод. Увеличивает время прохождения клетки.
@@ -35,11 +178,14 @@ class ColdEffect(BaseEffect):
                f' {(self.coefficient - 1) * 100}%.'
 
 
+@FactoryEffects.register
 class FloodEffect(BaseEffect):
     """
-    Эффект - топь. Увеличивает время прохождения клетки.
+    Эффект - топь. Увеличивает время прохождения клетки. Встречается реже
+    остальных эффектов.
     """
     coefficient = 3
+    weight = 0.5
     effect_type = IncreasesEffectTypeCellCompletionTime
 
     def get_message(self) -> str:
@@ -48,11 +194,13 @@ class FloodEffect(BaseEffect):
                f' {(self.coefficient - 1) * 100}%.'
 
 
+@FactoryEffects.register
 class SharpStonesEffect(BaseEffect):
     """
     Эффект - острые камни. Увеличивает время прохождения клетки.
     """
     coefficient = 2.25
+    weight = 0.75
     effect_type = IncreasesEffectTypeCellCompletionTime
 
     def get_message(self) -> str:
@@ -70,54 +218,3 @@ class WinEffect(BaseEffect):
 
     def get_message(self) -> str:
         return f'Вы прошли лабиринт!'
-
-
-class FactoryEffects(AbstractFactoryEffects):
-    """
-    Создаёт и возвращает объекты эффектов.
-    """
-
-    @classmethod
-    def get_effects_by_type(cls,
-                            effect_types: list[Type[AbstractEffectType]]
-                            ) -> list[Type[AbstractEffect]]:
-        """
-        Получение эффекта по типам.
-
-        Args:
-            effect_types: list[AbstractEffectType] (список с типами эффектов)
-
-        Returns:
-            list[AbstractEffect]: список с эффектами отфильтрованными по
-            указанному типу.
-        """
-        effects = cls.get_effects()
-        effects_with_correct_type = []
-        for effect in effects:
-            if effect.effect_type in effect_types:
-                effects_with_correct_type.append(effect)
-        return effects_with_correct_type
-
-    @staticmethod
-    def get_effects() -> list[Type[AbstractEffect]]:
-        """
-        Получение списка всех эффектов.
-
-        Returns:
-            list[AbstractEffect]: список с эффектами.
-        """
-        effects = AbstractEffect.__subclasses__()
-        for effect in effects:
-            if effect is BaseEffect:
-                effects.extend(BaseEffect.__subclasses__())
-                effects.remove(effect)
-            if effect is WinEffect:
-                effects.remove(effect)
-        return list(map(lambda effect: effect(), effects))
-
-    @staticmethod
-    def get_win_effect() -> AbstractEffect:
-        """
-        Получить эффект победы.
-        """
-        return WinEffect()
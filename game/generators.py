@@ -0,0 +1,375 @@
+"""
+Алгоритмы генерации лабиринта.
+
+Все алгоритмы строят идеальный лабиринт (между любыми двумя клетками ровно
+один путь), но отличаются видом лабиринта, скоростью и памятью:
+
+1) backtracker - обход в глубину. Длинные извилистые коридоры. Стек
+   может хранить почти все клетки.
+2) kruskal - алгоритм Краскала с системой непересекающихся множеств.
+   Много коротких тупиков, память - список всех стен.
+3) eller - алгоритм Эллера. Строит лабиринт по строкам, собственная память
+   пропорциональна одной строке. Может писать строки прямо в файл
+   (game.maze_file.generate_maze_file).
+4) wilson - алгоритм Уилсона (случайные блуждания со стиранием петель).
+   Равномерно случайный лабиринт, самый медленный.
+5) binary_tree - двоичное дерево. Самый быстрый, без дополнительной памяти,
+   но с заметным перекосом: верхняя строка и левый столбец - прямые
+   коридоры.
+6) sidewinder - как binary_tree, но перекос только в верхней строке.
+   Память - одна серия клеток строки.
+"""
+import random
+from typing import Iterator, Type
+
+from game.abstract.abstract_generator import AbstractMazeGenerator
+from game.abstract.abstract_maze import (AbstractMaze, BaseCell, ALL_WALLS,
+                                         WALL_TOP, WALL_RIGHT, WALL_BOTTOM,
+                                         WALL_LEFT)
+
+
+def _carve(maze: AbstractMaze, cell: BaseCell, neighbor: BaseCell) -> None:
+    """
+    Удаляет стены между соседними клетками.
+    """
+    maze.current_cell = cell
+    maze.remove_walls(neighbor)
+
+
+def _mark_all_visited(maze: AbstractMaze) -> None:
+    for cell in maze.maze:
+        maze.mark_visited(cell)
+
+
+class BacktrackerGenerator(AbstractMazeGenerator):
+    """
+    Обход в глубину (recursive backtracker).
+
+    Каждая клетка попадает в стек и извлекается из него не более одного
+    раза, а проверка наличия не посещённых клеток выполняется за O(1),
+    поэтому генерация работает за O(maze_size * maze_size).
+    """
+    name = 'backtracker'
+
+    def generate(self,
+                 maze: AbstractMaze,
+                 random_generator: random.Random,
+                 ) -> None:
+        maze.mark_visited(maze.current_cell)
+        # Стек посещённых клеток. Нужен для ситуации если нет соседних клеток,
+        # но ещё не все клетки посещены, тогда мы будем брать поочерёдно
+        # каждый элемент стека и искать его соседей до тех пор, пока не найдём
+        # или не переберём весь лабиринт.
+        _last_cell = []
+        while maze.check_exist_not_visited_cell():
+            next_cell = maze.check_neighbors(random_generator)
+            if next_cell:
+                # Если у текущей клетки есть не посещённая соседняя, переходим
+                # в неё, помечаем как посещённую. Также добавляем текущую
+                # клетку в стек посещённых клеток.
+                maze.mark_visited(next_cell)
+                _last_cell.append(maze.current_cell)
+                maze.remove_walls(next_cell)
+                maze.current_cell = next_cell
+            elif _last_cell:
+                # Если у текущей клетки нет не посещённых соседних, то
+                # откатываемся на предыдущую вершину. Действие повторяется до
+                # тех пор, пока не будет найдена клетка у которой есть
+                # не посещённые соседние клетки.
+                maze.current_cell = _last_cell.pop()
+            else:
+                break
+
+
+class KruskalGenerator(AbstractMazeGenerator):
+    """
+    Алгоритм Краскала.
+
+    Перебирает все внутренние стены в случайном порядке и удаляет стену,
+    если клетки по обе стороны ещё не связаны. Связность хранится в системе
+    непересекающихся множеств (union-find) со сжатием путей и объединением
+    по размеру, поэтому генерация работает почти за O(количество клеток).
+    """
+    name = 'kruskal'
+
+    def generate(self,
+                 maze: AbstractMaze,
+                 random_generator: random.Random,
+                 ) -> None:
+        size = maze.maze_size
+        cells = maze.maze
+        # Стена кодируется числом: индекс клетки * 2 + 0 (правая стена)
+        # или 1 (нижняя стена).
+        walls = [index * 2 + 1 for index in range(size * (size - 1))]
+        walls.extend(index * 2 for index in range(size * size)
+                     if index % size != size - 1)
+        random_generator.shuffle(walls)
+
+        parents = list(range(size * size))
+        sizes = [1] * (size * size)
+
+        def find(index: int) -> int:
+            while parents[index] != index:
+                # Сжатие путей делением пополам.
+                parents[index] = parents[parents[index]]
+                index = parents[index]
+            return index
+
+        remaining = size * size - 1
+        for wall in walls:
+            if not remaining:
+                break
+            index, bottom = divmod(wall, 2)
+            neighbor = index + size if bottom else index + 1
+            root, neighbor_root = find(index), find(neighbor)
+            if root == neighbor_root:
+                continue
+            if sizes[root] < sizes[neighbor_root]:
+                root, neighbor_root = neighbor_root, root
+            parents[neighbor_root] = root
+            sizes[root] += sizes[neighbor_root]
+            _carve(maze, cells[index], cells[neighbor])
+            remaining -= 1
+        _mark_all_visited(maze)
+
+
+class EllerGenerator(AbstractMazeGenerator):
+    """
+    Алгоритм Эллера.
+
+    Строит лабиринт по одной строке. Для строки хранит номер множества
+    каждой клетки (клетки одного множества уже связаны через обработанные
+    строки). В строке случайно объединяет соседние клетки разных множеств,
+    затем из каждого множества ведёт вниз хотя бы один проход. В последней
+    строке объединяются все разные множества.
+
+    Собственная память алгоритма пропорциональна длине строки.
+
+    Fields:
+        join_chance: float (вероятность объединить соседние клетки строки)
+        down_chance: float (вероятность прохода вниз из клетки)
+    """
+    name = 'eller'
+
+    def __init__(self, join_chance: float = 0.5, down_chance: float = 0.4):
+        self.join_chance = join_chance
+        self.down_chance = down_chance
+
+    def iter_rows(self,
+                  maze_size: int,
+                  random_generator: random.Random,
+                  ) -> Iterator[bytearray]:
+        """
+        Генерирует лабиринт по строкам без объекта лабиринта.
+
+        Используется для потоковой записи больших лабиринтов в файл
+        (game.maze_file). При одинаковом генераторе случайных чисел строки
+        совпадают с лабиринтом, построенным generate.
+
+        Args:
+            maze_size: int (размер лабиринта)
+            random_generator: random.Random (генератор случайных чисел)
+
+        Returns:
+            Iterator[bytearray]: маски стен клеток каждой строки сверху вниз
+            (см. WALL_BITS).
+        """
+        size = maze_size
+        next_set = 0
+        # Номера множеств клеток текущей строки (None - новое множество).
+        row_sets = [None] * size
+        row = bytearray([ALL_WALLS]) * size
+        for y in range(size):
+            last_row = y == size - 1
+            members = {}
+            for x in range(size):
+                if row_sets[x] is None:
+                    row_sets[x] = next_set
+                    next_set += 1
+                members.setdefault(row_sets[x], []).append(x)
+
+            for x in range(size - 1):
+                left_set, right_set = row_sets[x], row_sets[x + 1]
+                if left_set == right_set:
+                    continue
+                if not last_row and \
+                        random_generator.random() >= self.join_chance:
+                    continue
+                row[x] &= ~WALL_RIGHT & 0xFF
+                row[x + 1] &= ~WALL_LEFT & 0xFF
+                # Меньшее множество переходит в большее.
+                if len(members[left_set]) < len(members[right_set]):
+                    left_set, right_set = right_set, left_set
+                for member in members[right_set]:
+                    row_sets[member] = left_set
+                members[left_set].extend(members.pop(right_set))
+
+            if last_row:
+                yield row
+                break
+            next_row = bytearray([ALL_WALLS]) * size
+            next_row_sets = [None] * size
+            for set_id, xs in members.items():
+                down = [x for x in xs
+                        if random_generator.random() < self.down_chance]
+                if not down:
+                    down = [random_generator.choice(xs)]
+                for x in down:
+                    row[x] &= ~WALL_BOTTOM & 0xFF
+                    next_row[x] &= ~WALL_TOP & 0xFF
+                    next_row_sets[x] = set_id
+            yield row
+            row = next_row
+            row_sets = next_row_sets
+
+    def generate(self,
+                 maze: AbstractMaze,
+                 random_generator: random.Random,
+                 ) -> None:
+        rows = self.iter_rows(maze.maze_size, random_generator)
+        for y, row in enumerate(rows):
+            for x, mask in enumerate(row):
+                if not mask & WALL_RIGHT:
+                    _carve(maze, maze.check_cell(x, y),
+                           maze.check_cell(x + 1, y))
+                if not mask & WALL_BOTTOM:
+                    _carve(maze, maze.check_cell(x, y),
+                           maze.check_cell(x, y + 1))
+        _mark_all_visited(maze)
+
+
+class WilsonGenerator(AbstractMazeGenerator):
+    """
+    Алгоритм Уилсона.
+
+    Из каждой клетки вне дерева лабиринта выполняется случайное блуждание до
+    клетки дерева. Для клетки запоминается только последнее направление
+    выхода из неё, поэтому петли стираются сами. Затем путь по запомненным
+    направлениям добавляется в дерево. Все идеальные лабиринты получаются с
+    равной вероятностью.
+    """
+    name = 'wilson'
+
+    def generate(self,
+                 maze: AbstractMaze,
+                 random_generator: random.Random,
+                 ) -> None:
+        size = maze.maze_size
+        cells = maze.maze
+        cells_count = size * size
+        in_tree = bytearray(cells_count)
+        in_tree[random_generator.randrange(cells_count)] = 1
+        # Последний выход из клетки при текущем блуждании.
+        exits = {}
+
+        def neighbors(index: int) -> list[int]:
+            y, x = divmod(index, size)
+            result = []
+            if y > 0:
+                result.append(index - size)
+            if x < size - 1:
+                result.append(index + 1)
+            if y < size - 1:
+                result.append(index + size)
+            if x > 0:
+                result.append(index - 1)
+            return result
+
+        for start in range(cells_count):
+            if in_tree[start]:
+                continue
+            index = start
+            while not in_tree[index]:
+                exits[index] = random_generator.choice(neighbors(index))
+                index = exits[index]
+            index = start
+            while not in_tree[index]:
+                in_tree[index] = 1
+                _carve(maze, cells[index], cells[exits[index]])
+                index = exits[index]
+            exits.clear()
+        _mark_all_visited(maze)
+
+
+class BinaryTreeGenerator(AbstractMazeGenerator):
+    """
+    Двоичное дерево.
+
+    Из каждой клетки удаляется верхняя или левая стена (если соседа с одной
+    стороны нет - стена с другой стороны). Не требует дополнительной памяти.
+    """
+    name = 'binary_tree'
+
+    def generate(self,
+                 maze: AbstractMaze,
+                 random_generator: random.Random,
+                 ) -> None:
+        size = maze.maze_size
+        for y in range(size):
+            for x in range(size):
+                if x == 0 and y == 0:
+                    continue
+                if x == 0 or (y > 0 and random_generator.random() < 0.5):
+                    neighbor = maze.check_cell(x, y - 1)
+                else:
+                    neighbor = maze.check_cell(x - 1, y)
+                _carve(maze, maze.check_cell(x, y), neighbor)
+        _mark_all_visited(maze)
+
+
+class SidewinderGenerator(AbstractMazeGenerator):
+    """
+    Sidewinder.
+
+    Верхняя строка - один коридор. В остальных строках клетки собираются в
+    серии соседних клеток, связанных вправо. Серия закрывается случайно (или
+    в конце строки), и из случайной клетки серии удаляется верхняя стена.
+    """
+    name = 'sidewinder'
+
+    def __init__(self, close_chance: float = 0.5):
+        self.close_chance = close_chance
+
+    def generate(self,
+                 maze: AbstractMaze,
+                 random_generator: random.Random,
+                 ) -> None:
+        size = maze.maze_size
+        for x in range(size - 1):
+            _carve(maze, maze.check_cell(x, 0), maze.check_cell(x + 1, 0))
+        for y in range(1, size):
+            run_start = 0
+            for x in range(size):
+                if x == size - 1 or \
+                        random_generator.random() < self.close_chance:
+                    run_x = random_generator.randint(run_start, x)
+                    _carve(maze, maze.check_cell(run_x, y),
+                           maze.check_cell(run_x, y - 1))
+                    run_start = x + 1
+                else:
+                    _carve(maze, maze.check_cell(x, y),
+                           maze.check_cell(x + 1, y))
+        _mark_all_visited(maze)
+
+
+GENERATORS: dict[str, Type[AbstractMazeGenerator]] = {
+    generator.name: generator for generator in (
+        BacktrackerGenerator, KruskalGenerator, EllerGenerator,
+        WilsonGenerator, BinaryTreeGenerator, SidewinderGenerator,
+    )
+}
+
+
+def get_generator(name: str) -> AbstractMazeGenerator:
+    """
+    Возвращает алгоритм генерации по имени.
+
+    Args:
+        name: str (имя алгоритма, ключ GENERATORS)
+
+    Returns:
+        AbstractMazeGenerator: алгоритм генерации.
+    """
+    if name not in GENERATORS:
+        raise ValueError(f'Неизвестный алгоритм генерации: {name}')
+    return GENERATORS[name]()
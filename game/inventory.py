@@ -0,0 +1,236 @@
+"""
+Инвентарь участника: предметы, уменьшающие воздействие эффектов
+(game.reducing_effect).
+
+Инвентарь хранит количество каждого предмета в bytearray по номеру
+предмета в ITEMS (до 255 штук каждого), поэтому копирование и сохранение
+инвентаря - копирование нескольких байт.
+
+Формат (pack_inventory): количество номеров предметов (1 байт) и
+количество каждого предмета (по 1 байту).
+"""
+from typing import Iterable, Optional, Type
+
+from game.abstract.abstract_effect import (AbstractEffect,
+                                           AbstractReducingImpactEffects)
+from game.reducing_effect import (BucketOfColdWater, BottleCocaCola,
+                                  FrequentRest, EnergyDrink,
+                                  StaminaEnhancerPills, ReducingBodyDensity)
+
+# Номер предмета - индекс в кортеже, поэтому новые предметы добавляются
+# только в конец.
+ITEMS = (BucketOfColdWater, BottleCocaCola, FrequentRest, EnergyDrink,
+         StaminaEnhancerPills, ReducingBodyDensity)
+# Максимальное количество одного предмета в инвентаре.
+ITEM_LIMIT = 255
+
+
+def _index_items_by_type() -> dict:
+    """
+    Строит индекс тип эффекта -> номера предметов этого типа по
+    возрастанию коэффициента.
+    """
+    index = {}
+    for number in sorted(range(len(ITEMS)),
+                         key=lambda number: ITEMS[number].coefficient):
+        index.setdefault(ITEMS[number].effect_type, []).append(number)
+    return {effect_type: tuple(numbers)
+            for effect_type, numbers in index.items()}
+
+
+_ITEM_NUMBERS = {item: number for number, item in enumerate(ITEMS)}
+_ITEMS_BY_NAME = {item.__name__: item for item in ITEMS}
+_ITEMS_BY_TYPE = _index_items_by_type()
+
+
+def get_item(name: str) -> Type[AbstractReducingImpactEffects]:
+    """
+    Возвращает предмет по имени класса.
+
+    Args:
+        name: str (имя класса предмета, например EnergyDrink)
+
+    Returns:
+        Type[AbstractReducingImpactEffects]: предмет.
+
+    Raises:
+        ValueError: предмета с таким именем нет.
+    """
+    try:
+        return _ITEMS_BY_NAME[name]
+    except KeyError:
+        raise ValueError(f'Неизвестный предмет: {name}') from None
+
+
+def reduce_coefficient(effect: AbstractEffect,
+                       item: Type[AbstractReducingImpactEffects]) -> float:
+    """
+    Возвращает коэффициент эффекта, уменьшенный предметом.
+
+    Коэффициент делится на коэффициент предмета, но не становится меньше 1
+    (предмет не превращает помеху в преимущество).
+    """
+    return max(1.0, effect.coefficient / item.coefficient)
+
+
+class Inventory:
+    """
+    Инвентарь участника.
+
+    Fields:
+        _counts: bytearray (количество предметов по номеру в ITEMS)
+    """
+    __slots__ = ('_counts',)
+
+    def __init__(self, counts: Optional[bytes] = None):
+        self._counts = bytearray(len(ITEMS))
+        if counts:
+            # Данные старой версии могут быть короче, новой - длиннее:
+            # неизвестные предметы отбрасываются.
+            known = counts[:len(ITEMS)]
+            self._counts[:len(known)] = known
+
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> 'Inventory':
+        """
+        Создаёт инвентарь из имён предметов (имя может повторяться).
+        """
+        inventory = cls()
+        for name in names:
+            inventory.add(get_item(name))
+        return inventory
+
+    def add(self, item: Type[AbstractReducingImpactEffects],
+            count: int = 1) -> int:
+        """
+        Добавляет предмет в инвентарь.
+
+        Args:
+            item: Type[AbstractReducingImpactEffects] (предмет)
+            count: int (количество)
+
+        Returns:
+            int: количество предмета в инвентаре (не больше ITEM_LIMIT).
+        """
+        number = _ITEM_NUMBERS[item]
+        self._counts[number] = min(ITEM_LIMIT, self._counts[number] + count)
+        return self._counts[number]
+
+    def remove(self, item: Type[AbstractReducingImpactEffects],
+               count: int = 1) -> bool:
+        """
+        Убирает предмет из инвентаря.
+
+        Returns:
+            bool:
+                True - предмет убран
+                False - предметов меньше, чем count
+        """
+        number = _ITEM_NUMBERS[item]
+        if self._counts[number] < count:
+            return False
+        self._counts[number] -= count
+        return True
+
+    def count(self, item: Type[AbstractReducingImpactEffects]) -> int:
+        return self._counts[_ITEM_NUMBERS[item]]
+
+    def items(self) -> dict:
+        """
+        Возвращает словарь предмет -> количество (только имеющиеся).
+        """
+        return {ITEMS[number]: count
+                for number, count in enumerate(self._counts) if count}
+
+    def find_item(self, effect: AbstractEffect
+                  ) -> Optional[Type[AbstractReducingImpactEffects]]:
+        """
+        Находит предмет против эффекта, не расходуя его.
+
+        Выбирается самый слабый предмет, полностью снимающий эффект, а
+        если такого нет - самый сильный из имеющихся. Предметов одного
+        типа эффекта несколько, поэтому поиск занимает O(1).
+
+        Args:
+            effect: AbstractEffect (эффект клетки)
+
+        Returns:
+            Type[AbstractReducingImpactEffects]: предмет.
+            None: подходящих предметов нет.
+        """
+        counts = self._counts
+        found = None
+        for number in _ITEMS_BY_TYPE.get(effect.effect_type, ()):
+            if counts[number]:
+                found = number
+                if ITEMS[number].coefficient >= effect.coefficient:
+                    break
+        return None if found is None else ITEMS[found]
+
+    def apply(self, effect: AbstractEffect
+              ) -> tuple[float, Optional[Type[AbstractReducingImpactEffects]]]:
+        """
+        Применяет к эффекту подходящий предмет и расходует его.
+
+        Args:
+            effect: AbstractEffect (эффект клетки)
+
+        Returns:
+            tuple: коэффициент эффекта с учётом предмета и использованный
+            предмет (None - предмет не нашёлся, коэффициент не изменён).
+        """
+        item = self.find_item(effect)
+        if item is None:
+            return effect.coefficient, None
+        self._counts[_ITEM_NUMBERS[item]] -= 1
+        return reduce_coefficient(effect, item), item
+
+    def clear(self) -> None:
+        self._counts = bytearray(len(ITEMS))
+
+    def copy(self) -> 'Inventory':
+        return Inventory(self._counts)
+
+    def __bool__(self) -> bool:
+        return any(self._counts)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Inventory):
+            return self._counts == other._counts
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f'Inventory({self.items()})'
+
+
+def pack_inventory(inventory: Inventory) -> bytes:
+    """
+    Упаковывает инвентарь в байты.
+
+    Args:
+        inventory: Inventory (инвентарь)
+
+    Returns:
+        bytes: упакованный инвентарь.
+    """
+    return bytes([len(inventory._counts)]) + inventory._counts
+
+
+def unpack_inventory(data: bytes, offset: int = 0
+                     ) -> tuple[Inventory, int]:
+    """
+    Распаковывает инвентарь.
+
+    Args:
+        data: bytes (данные)
+        offset: int (смещение начала инвентаря)
+
+    Returns:
+        tuple: инвентарь и смещение конца инвентаря. Если данных нет
+        (состояние сохранено до появления инвентаря), инвентарь пустой.
+    """
+    if offset >= len(data):
+        return Inventory(), offset
+    length = data[offset]
+    offset += 1
+    return Inventory(data[offset:offset + length]), offset + length
@@ -3,8 +3,25 @@ from typing import Union, Optional, Type
 
 from game.abstract.abstract_effect import AbstractEffectType
 from game.abstract.abstract_maze import BaseCell, AbstractMaze, \
-    AbstractMazeGame
+    AbstractMazeGame, WALL_TOP, WALL_RIGHT, WALL_BOTTOM, WALL_LEFT
+from game.effect_distribution import EffectWeights, get_effect_distribution
 from game.effects import FactoryEffects
+from game.generators import get_generator
+from game.maze_seed import (MazeSeed, SEED_LIMIT, DEFAULT_GENERATOR,
+                            DIFFICULTY_NAMES)
+from game.overlay_maze import MazeOverlay
+from game.pathfinding import (UNREACHABLE, get_exit_field, get_best_time,
+                              invalidate as invalidate_distances,
+                              invalidate_effects)
+
+# Направление движения -> смещение по X и Y, стена текущей клетки и стена
+# соседней клетки, которые не должны мешать движению.
+_DIRECTIONS = {
+    'top': (0, -1, WALL_TOP, WALL_BOTTOM),
+    'right': (1, 0, WALL_RIGHT, WALL_LEFT),
+    'bottom': (0, 1, WALL_BOTTOM, WALL_TOP),
+    'left': (-1, 0, WALL_LEFT, WALL_RIGHT),
+}
 
 
 class Cell(BaseCell):
@@ -94,6 +111,8 @@ class Maze(AbstractMaze):
     # По умолчанию None. При генерации лабиринта хранит текущую клетку, на
     # которой сейчас находится пользователь.
     _current_cell = None
+    # Количество клеток, ещё не посещённых при генерации лабиринта.
+    _not_visited_count = 0
 
     def __init__(self, maze_size: int, *args, **kwargs):
         self.maze_size = maze_size  # Размер лабиринта
@@ -107,6 +126,7 @@ class Maze(AbstractMaze):
         """
         self._maze = [Cell(x, y) for y in range(self.maze_size) for x in
                       range(self.maze_size)]
+        self._not_visited_count = len(self._maze)
         # Получаем базовое положение пользователя в лабиринте
         cell = self.get_standard_entry_point()
         self._current_cell = cell
@@ -121,9 +141,7 @@ class Maze(AbstractMaze):
         Returns:
             Cell: точка в которой по умолчанию находится пользователь.
         """
-        for cell in self._maze:
-            if cell.x == self.maze_size // 2 and cell.y == 0:
-                return cell
+        return self.check_cell(self.maze_size // 2, 0)
 
     def check_cell(self, x: int, y: int) -> Union[bool, Cell]:
         """
@@ -140,18 +158,25 @@ class Maze(AbstractMaze):
                 bool[False] - клетки с такими координатами нет в лабиринте.
                 Cell - найденная клетка.
         """
-        try:
+        # Без проверки границ отрицательные и выходящие за ряд координаты
+        # попадали бы на клетки соседнего ряда.
+        if 0 <= x < self.maze_size and 0 <= y < self.maze_size:
             return self._maze[x + y * self.maze_size]
-        except IndexError:
-            return False
+        return False
 
-    def check_neighbors(self) -> Union[bool, Cell]:
+    def check_neighbors(self,
+                        random_generator: Optional[random.Random] = None,
+                        ) -> Union[bool, Cell]:
         """
         Получение случайной соседней клетки.
 
         Получает случайную клетку, соседнюю с той на которой стоит
         пользователь, получаемая клетка не должна быть посещённой (visited).
 
+        Args:
+            random_generator: Optional[random.Random] (генератор случайных
+            чисел, по умолчанию модуль random)
+
         Returns:
             Union[False, Cell]:
                 bool[False] - соседних, не посещённых клеток нет.
@@ -175,7 +200,9 @@ class Maze(AbstractMaze):
             neighbors.append(left)
 
         # Возвращаем случайную соседнюю клетку, если такой клетки нет, то False
-        return random.choice(neighbors) if neighbors else False
+        if not neighbors:
+            return False
+        return (random_generator or random).choice(neighbors)
 
     def get_neighbors(self) -> dict:
         """
@@ -199,6 +226,21 @@ class Maze(AbstractMaze):
             'bottom': bottom,
         }
 
+    def get_wall_mask(self, x: int, y: int) -> int:
+        """
+        Возвращает стены клетки в виде 4-битной маски (см. WALL_BITS).
+
+        Маска хранится в объекте клетки и читается без проверки координат.
+
+        Args:
+            x: int (координата X существующей клетки).
+            y: int (координата Y существующей клетки).
+
+        Returns:
+            int (маска из битов WALL_*).
+        """
+        return self._maze[x + y * self.maze_size].wall_mask
+
     def remove_walls(self, next_cell: Cell) -> None:
         """
         Удаляет стены у текущей и следующей клетки.
@@ -231,6 +273,20 @@ class Maze(AbstractMaze):
             current_cell.remove_walls('bottom')
             next_cell.remove_walls('top')
 
+    def mark_visited(self, cell: Cell) -> None:
+        """
+        Помечает клетку посещённой при генерации лабиринта.
+
+        Уменьшает счётчик не посещённых клеток, благодаря чему
+        check_exist_not_visited_cell работает за O(1).
+
+        Args:
+            cell: Cell (посещаемая клетка).
+        """
+        if not cell.visited:
+            cell.visited = True
+            self._not_visited_count -= 1
+
     def check_exist_not_visited_cell(self) -> bool:
         """
         Проверяет есть ли в лабиринте не посещённые клетки.
@@ -240,23 +296,20 @@ class Maze(AbstractMaze):
                 True - Есть.
                 False - Нет.
         """
-        for cell in self._maze:
-            if not cell.visited:
-                return True
-        return False
+        return self._not_visited_count > 0
 
     def copy(self) -> AbstractMaze:
         """
         Копирует лабиринт.
 
-        Возвращает точную копию лабиринта. Является прототипом
+        Возвращает копию лабиринта с копированием при записи (MazeOverlay):
+        стены и эффекты остаются общими, а положение пользователя и
+        посещённые им клетки хранятся в копии. Является прототипом
 
         Returns:
             AbstractMaze: новый лабиринт
         """
-        new_obj = self.__class__(**self.__dict__)
-        new_obj.__dict__.update(self.__dict__)
-        return new_obj
+        return MazeOverlay(self)
 
     @property
     def current_cell(self):
@@ -275,55 +328,108 @@ class MazeGame(AbstractMazeGame):
     """
     Класс реализующий игру лабиринт.
 
-    Генерирует лабиринт (Maze) и создаёт пути.
-    Генерация лабиринта происходит по алгоритму обхода в ширину.
+    Генерирует лабиринт (Maze) и создаёт пути выбранным алгоритмом
+    генерации (game.generators).
+
+    Все случайные решения принимаются собственным генератором случайных
+    чисел (random.Random), поэтому лабиринт с эффектами можно повторно
+    получить по зерну (get_maze_seed).
 
     Fields:
         maze_size: int (размер лабиринта по X и Y)
-        __maze: Maze (объект класса Maze)
+        seed: Optional[int] (зерно, переданное при создании. Если None, при
+            каждой генерации выбирается новое случайное зерно)
+        generator: str (имя алгоритма генерации)
+        __maze: AbstractMaze (объект лабиринта, по умолчанию Maze)
+        _rng: Optional[random.Random] (генератор случайных чисел игры,
+            None - ещё не создан, см. _random)
+        _generated_seed: Optional[int] (зерно последней генерации)
+        _effects_params: list (параметры вызовов arrange_effects после
+            генерации)
     """
 
-    def __init__(self, maze_size: int = 5):
+    def __init__(self,
+                 maze_size: int = 5,
+                 maze_class: Type[AbstractMaze] = Maze,
+                 maze: Optional[AbstractMaze] = None,
+                 seed: Optional[int] = None,
+                 generator: str = DEFAULT_GENERATOR,
+                 ):
         """
         Args:
             maze_size: int (размер лабиринта по X и Y)
-        """
+            maze_class: Type[AbstractMaze] (класс лабиринта, например
+            CompactMaze для больших лабиринтов)
+            maze: Optional[AbstractMaze] (готовый лабиринт, например копия
+            лабиринта комнаты для участника. Если передан, новый лабиринт не
+            создаётся)
+            seed: Optional[int] (зерно генерации лабиринта и расстановки
+            эффектов)
+            generator: str (имя алгоритма генерации, ключ
+            game.generators.GENERATORS)
+        """
+        self.seed = seed
+        self.generator = generator
+        self._generator = get_generator(generator)
+        # Генератор случайных чисел создаётся при первой генерации или
+        # расстановке эффектов: обёртки лабиринтов участников его не
+        # используют, а random.Random занимает около 2.5 КБ.
+        self._rng: Optional[random.Random] = None
+        self._generated_seed = None
+        self._effects_params = []
+        if maze is not None:
+            self.maze_size = maze.maze_size
+            self.__maze = maze
+            return
         self.maze_size = maze_size
-        # Получаем объект Maze и генерируем лабиринт
-        self.__maze = Maze(maze_size)
+        # Получаем объект лабиринта и генерируем лабиринт
+        self.__maze = maze_class(maze_size)
         self.__maze.generate()
 
+    @property
+    def _random(self) -> random.Random:
+        """
+        Генератор случайных чисел игры (создаётся при первом обращении).
+        """
+        if self._rng is None:
+            self._rng = random.Random(self.seed)
+        return self._rng
+
     def generate_maze(self) -> None:
         """
         Создаёт игровой лабиринт.
 
         Изменяет стандартный лабиринт генерируемый классом Maze так, что из
-        клетки можно попасть в любую другую клетку. Для этого используется
-        алгоритм обхода в ширину.
+        клетки можно попасть в любую другую клетку. Алгоритм генерации
+        задаётся параметром generator (game.generators), по умолчанию - обход
+        в глубину (recursive backtracker).
+
+        Перед генерацией генератор случайных чисел получает зерно seed (или
+        новое случайное зерно, если seed не задан), поэтому одинаковые
+        размер, алгоритм и зерно дают одинаковый лабиринт для любого класса
+        лабиринта.
         """
         maze = self.__maze
-        # Стек посещённых клеток. Нужен для ситуации если нет соседних клеток,
-        # но ещё не все клетки посещены, тогда мы будем брать поочерёдно
-        # каждый элемент стека и искать его соседей до тех пор, пока не найдём
-        # или не переберём весь лабиринт.
-        _last_cell = []
-        while self.__maze.check_exist_not_visited_cell():
-            next_cell = maze.check_neighbors()
-            if next_cell:
-                # Если у текущей клетки есть не посещённая соседняя, переходим
-                # в неё, помечаем как посещённую. Также добавляем текущую
-                # клетку в стек посещённых клеток.
-                next_cell.visited = True
-                _last_cell.append(maze.current_cell)
-                maze.remove_walls(next_cell)
-                maze.current_cell = next_cell
-            elif _last_cell:
-                # Если у текущей клетки нет не посещённых соседних, то
-                # откатываемся на предыдущую вершину. Действие повторяется до
-                # тех пор, пока не будет найдена клетка у которой есть
-                # не посещённые соседние клетки.
-                cell = _last_cell.pop()
-                maze.current_cell = cell
+        self._effects_params = []
+        if not maze.check_exist_not_visited_cell():
+            # Лабиринт уже сгенерирован: повторная генерация его не меняет,
+            # и зерно его не описывает.
+            self._generated_seed = None
+            return
+        if self.seed is None:
+            self._generated_seed = random.randrange(SEED_LIMIT)
+        else:
+            self._generated_seed = self.seed
+        if self._rng is None:
+            self._rng = random.Random(self._generated_seed)
+        else:
+            self._rng.seed(self._generated_seed)
+        entry_cell = maze.current_cell
+        self._generator.generate(maze, self._random)
+        # Стены изменились: кэшированные расстояния больше не верны.
+        invalidate_distances(maze)
+        # Игрок начинает игру с точки входа.
+        maze.current_cell = entry_cell
 
     def arrange_effects(self,
                         amount: int,
@@ -331,46 +437,282 @@ class MazeGame(AbstractMazeGame):
                         effect_types: list[
                             Optional[Type[AbstractEffectType]]] = None,
                         win: bool = True,
+                        effect_weights: Optional[EffectWeights] = None,
                         ) -> None:
         """
         Проставляет указанное количество эффектов на случайные клетки.
 
+        Эффекты не ставятся ближе двух клеток от текущего положения
+        пользователя. Подходящие клетки (или пары клетка-эффект, если на
+        клетке может быть несколько эффектов) выбираются за один проход
+        выборкой без возвращения, поэтому время работы пропорционально
+        количеству эффектов, а не размеру лабиринта.
+
+        Если расставить столько эффектов невозможно (в том числе если
+        amount отрицательно или под фильтр effect_types не подходит ни один
+        эффект), вызывает ValueError.
+
         Args:
             amount: int (количество эффектов)
             repeat: bool (может ли быть несколько эффектов на одной клетке)
             effect_types: list[Optional[AbstractEffectType]] (использовать
             только эффекты из указанных категорий)
             win: bool (добавить эффект победы в лабиринте)
-        """
-        current_cell = self.__maze.current_cell
-        all_cells = self.__maze.maze.copy()
+            effect_weights: Optional[EffectWeights] (веса эффектов: имя
+            пресета сложности или словарь эффект -> вес, см.
+            game.effect_distribution. None - все эффекты равновероятны)
+        """
+        if amount < 0:
+            raise ValueError(
+                f'Количество эффектов не может быть отрицательным: {amount}')
+        if effect_weights is not None:
+            self._arrange_weighted_effects(amount, repeat, effect_types,
+                                           effect_weights)
+            if win:
+                self._arrange_win_effect(self._get_safe_zone())
+            # Эффекты изменились: клетка выхода в кэше больше не верна.
+            invalidate_effects(self.__maze)
+            # Зерном (MazeSeed) описывается только расстановка с пресетом
+            # сложности без фильтра по типам.
+            self._effects_params.append(
+                (amount, repeat, win, effect_weights)
+                if isinstance(effect_weights, str)
+                and effect_weights in DIFFICULTY_NAMES
+                and not effect_types else None)
+            return
+        cells = self.__maze.maze
         if effect_types:
             effects = FactoryEffects.get_effects_by_type(effect_types)
         else:
             effects = FactoryEffects.get_effects()
-        i = 0
-        while i < amount:
-            cell = random.choice(all_cells)
-            if abs(current_cell.x - cell.x) > 2 or abs(
-                    current_cell.y - cell.y) > 2:
-                effect = random.choice(effects)
-                if effect in cell.effects:
-                    continue
-                cell.effects.append(effect)
-                if not repeat:
-                    all_cells.remove(cell)
-                i += 1
+        if amount and not effects:
+            raise ValueError(
+                f'Невозможно расставить {amount} эффектов: нет эффектов '
+                f'указанных типов'
+            )
+        safe_zone = self._get_safe_zone()
+        safe_zone_size = ((safe_zone[1] - safe_zone[0] + 1)
+                          * (safe_zone[3] - safe_zone[2] + 1))
+        eligible_cells = len(cells) - safe_zone_size
+        # При repeat выбираем пары (клетка, эффект): одна клетка может
+        # получить несколько разных эффектов, но не один эффект дважды.
+        options = len(effects) if repeat else 1
+        if amount > eligible_cells * options:
+            raise ValueError(
+                f'Невозможно расставить {amount} эффектов: подходящих '
+                f'клеток {eligible_cells}, эффектов {len(effects)}'
+            )
+
+        def is_excluded(choice: int) -> bool:
+            cell_index, effect_index = divmod(choice, options)
+            if self._in_zone(cell_index, safe_zone):
+                return True
+            if repeat:
+                return effects[effect_index] in cells[cell_index].effects
+            return False
+
+        choices = self._sample_without_replacement(
+            len(cells) * options, amount, is_excluded,
+            safe_zone_size * options,
+        )
+        if len(choices) < amount:
+            raise ValueError(
+                f'Невозможно расставить {amount} эффектов: на подходящих '
+                f'клетках уже стоят эти эффекты'
+            )
+        for choice in choices:
+            cell_index, effect_index = divmod(choice, options)
+            if repeat:
+                effect = effects[effect_index]
             else:
-                all_cells.remove(cell)
+                effect = self._random.choice(effects)
+            cells[cell_index].effects.append(effect)
+
         if win:
-            all_cells = self.__maze.maze.copy()
-            while all_cells:
-                cell = random.choice(all_cells)
-                if abs(current_cell.x - cell.x) > 2 and abs(
-                        current_cell.y - cell.y) > 2 and not cell.effects:
-                    cell.effects.append(FactoryEffects.get_win_effect())
-                    break
-                all_cells.remove(cell)
+            self._arrange_win_effect(safe_zone)
+        # Эффекты изменились: клетка выхода в кэше больше не верна.
+        invalidate_effects(self.__maze)
+        # Расстановку с фильтром по типам нельзя описать зерном (MazeSeed).
+        self._effects_params.append(
+            None if effect_types else (amount, repeat, win, None))
+
+    def _arrange_weighted_effects(self,
+                                  amount: int,
+                                  repeat: bool,
+                                  effect_types: Optional[list[
+                                      Type[AbstractEffectType]]],
+                                  effect_weights: EffectWeights,
+                                  ) -> None:
+        """
+        Проставляет эффекты, выбранные с учётом весов.
+
+        Все эффекты выбираются одной пачкой по таблице псевдонимов
+        (game.effect_distribution). Без repeat каждый эффект получает свою
+        клетку. С repeat для каждого эффекта выбираются клетки, на которых
+        его ещё нет, поэтому одна клетка может получить несколько разных
+        эффектов; эффект, выбранный чаще, чем есть подходящих клеток,
+        уступает лишние места другим эффектам.
+
+        Клетки выбираются до изменения лабиринта: если расставить эффекты
+        невозможно, ValueError вызывается до того, как поставлен первый.
+        """
+        cells = self.__maze.maze
+        distribution = get_effect_distribution(effect_weights, effect_types)
+        effects = distribution.effects
+        safe_zone = self._get_safe_zone()
+        safe_zone_size = ((safe_zone[1] - safe_zone[0] + 1)
+                          * (safe_zone[3] - safe_zone[2] + 1))
+        eligible_cells = len(cells) - safe_zone_size
+        options = len(effects) if repeat else 1
+        if amount > eligible_cells * options:
+            raise ValueError(
+                f'Невозможно расставить {amount} эффектов: подходящих '
+                f'клеток {eligible_cells}, эффектов {len(effects)}'
+            )
+        sampled = distribution.sample_many(amount, self._random)
+        if not repeat:
+            choices = self._sample_without_replacement(
+                len(cells), amount,
+                lambda index: self._in_zone(index, safe_zone),
+                safe_zone_size,
+            )
+            if len(choices) < amount:
+                raise ValueError(
+                    f'Невозможно расставить {amount} эффектов: подходящих '
+                    f'клеток {len(choices)}'
+                )
+            for cell_index, effect in zip(choices, sampled):
+                cells[cell_index].effects.append(effect)
+            return
+        counts = dict.fromkeys(effects, 0)
+        for effect in sampled:
+            counts[effect] += 1
+        # Количество каждого эффекта случайно и может превысить количество
+        # подходящих клеток: лишние эффекты выбираются заново среди
+        # эффектов, для которых клетки ещё остались. Место есть, так как
+        # amount <= eligible_cells * options.
+        overflow = 0
+        for effect, count in counts.items():
+            if count > eligible_cells:
+                overflow += count - eligible_cells
+                counts[effect] = eligible_cells
+        while overflow:
+            effect = distribution.sample(self._random)
+            if counts[effect] < eligible_cells:
+                counts[effect] += 1
+                overflow -= 1
+        placements = []
+        for effect, count in counts.items():
+            if not count:
+                continue
+
+            def is_excluded(index: int) -> bool:
+                return (self._in_zone(index, safe_zone)
+                        or effect in cells[index].effects)
+
+            choices = self._sample_without_replacement(
+                len(cells), count, is_excluded, safe_zone_size)
+            if len(choices) < count:
+                raise ValueError(
+                    f'Невозможно расставить {count} эффектов '
+                    f'{type(effect).__name__}: на подходящих клетках уже '
+                    f'стоит этот эффект'
+                )
+            placements.append((effect, choices))
+        for effect, choices in placements:
+            for cell_index in choices:
+                cells[cell_index].effects.append(effect)
+
+    def _get_safe_zone(self) -> tuple[int, int, int, int]:
+        """
+        Возвращает квадрат вокруг пользователя, в котором нет эффектов.
+
+        Квадрат - клетки на расстоянии не больше двух по X и по Y от текущей
+        клетки (маска расстояния от точки входа).
+
+        Returns:
+            tuple[int, int, int, int]: границы квадрата (x_min, x_max, y_min,
+            y_max) включительно.
+        """
+        current_cell = self.__maze.current_cell
+        last = self.maze_size - 1
+        return (max(current_cell.x - 2, 0), min(current_cell.x + 2, last),
+                max(current_cell.y - 2, 0), min(current_cell.y + 2, last))
+
+    def _in_zone(self, index: int, zone: tuple[int, int, int, int]) -> bool:
+        y, x = divmod(index, self.maze_size)
+        return zone[0] <= x <= zone[1] and zone[2] <= y <= zone[3]
+
+    def _sample_without_replacement(self,
+                                    population: int,
+                                    amount: int,
+                                    is_excluded,
+                                    expected_excluded: int,
+                                    ) -> list[int]:
+        """
+        Выбирает amount различных чисел из range(population), пропуская
+        исключённые.
+
+        Берёт случайную выборку с запасом на ожидаемое количество
+        исключённых и отбрасывает их. Если запаса не хватило (исключённых
+        больше ожидаемого), выбирает из всей популяции.
+
+        Args:
+            population: int (размер популяции)
+            amount: int (количество чисел)
+            is_excluded: Callable[[int], bool] (исключено ли число)
+            expected_excluded: int (ожидаемое количество исключённых)
+
+        Returns:
+            list[int]: выбранные числа в случайном порядке (меньше amount,
+            если подходящих чисел не хватает).
+        """
+        if amount <= 0:
+            return []
+        # Запас на исключения, не учтённые в expected_excluded (например,
+        # уже стоящие эффекты).
+        sample_size = min(population, amount + expected_excluded + 16)
+        for size in (sample_size, population):
+            chosen = []
+            for choice in self._random.sample(range(population), size):
+                if not is_excluded(choice):
+                    chosen.append(choice)
+                    if len(chosen) == amount:
+                        return chosen
+            if size == population:
+                return chosen
+        return []
+
+    def _arrange_win_effect(self, safe_zone: tuple[int, int, int, int]
+                            ) -> None:
+        """
+        Ставит эффект победы на случайную клетку без эффектов, удалённую от
+        пользователя больше чем на две клетки и по X, и по Y.
+
+        Если такой клетки нет, эффект победы не ставится.
+        """
+        cells = self.__maze.maze
+        x_options = [x for x in range(self.maze_size)
+                     if not safe_zone[0] <= x <= safe_zone[1]]
+        y_options = [y for y in range(self.maze_size)
+                     if not safe_zone[2] <= y <= safe_zone[3]]
+        if not x_options or not y_options:
+            return
+        # Клеток с эффектами обычно мало, поэтому сначала пробуем случайные
+        # клетки и только потом перебираем все подходящие.
+        for _ in range(32):
+            cell = cells[self._random.choice(x_options)
+                         + self._random.choice(y_options) * self.maze_size]
+            if not cell.effects:
+                cell.effects.append(FactoryEffects.get_win_effect())
+                return
+        candidates = [x + y * self.maze_size
+                      for y in y_options for x in x_options]
+        self._random.shuffle(candidates)
+        for index in candidates:
+            if not cells[index].effects:
+                cells[index].effects.append(FactoryEffects.get_win_effect())
+                return
 
     def check_move_forward(self) -> Union[bool, BaseCell]:
         """
@@ -438,17 +780,18 @@ class MazeGame(AbstractMazeGame):
             bool:
                 False - двигаться нельзя
         """
-        cell = self.__maze.get_neighbors()[direction]
-        if not self.__maze.current_cell.walls.get(direction, True):
-            if direction == 'top' and not cell.walls.get('bottom', True):
-                return cell
-            if direction == 'right' and not cell.walls.get('left', True):
-                return cell
-            if direction == 'bottom' and not cell.walls.get('top', True):
-                return cell
-            if direction == 'left' and not cell.walls.get('right', True):
-                return cell
-        return False
+        maze = self.__maze
+        current_cell = maze.current_cell
+        dx, dy, wall, opposite_wall = _DIRECTIONS[direction]
+        x, y = current_cell.x + dx, current_cell.y + dy
+        if not (0 <= x < maze.maze_size and 0 <= y < maze.maze_size):
+            return False
+        # Стены читаются масками, без словарей стен и объектов соседей.
+        if maze.get_wall_mask(current_cell.x, current_cell.y) & wall:
+            return False
+        if maze.get_wall_mask(x, y) & opposite_wall:
+            return False
+        return maze.check_cell(x, y)
 
     def move_forward(self) -> Union[bool, BaseCell]:
         """
@@ -517,13 +860,81 @@ class MazeGame(AbstractMazeGame):
             bool:
                 False - движения не произошло
         """
-        if self._check_move(direction):
+        forward_cell = self._check_move(direction)
+        if forward_cell:
             self.__maze.current_cell.user_visited = True
-            forward_cell = self.__maze.get_neighbors()[direction]
             self.__maze.current_cell = forward_cell
             return forward_cell
         return False
 
+    def get_distance_to_exit(self) -> Optional[int]:
+        """
+        Возвращает количество ходов от текущей клетки до выхода.
+
+        Поле расстояний от выхода строится один раз на лабиринт комнаты
+        (game.pathfinding), дальше запрос выполняется за O(1).
+
+        Returns:
+            int: количество ходов.
+            None: выхода (эффекта победы) нет или он недостижим.
+        """
+        field = get_exit_field(self.__maze)
+        if field is None:
+            return None
+        current_cell = self.__maze.current_cell
+        distance = field.distance(current_cell.x
+                                  + current_cell.y * self.maze_size)
+        return None if distance == UNREACHABLE else distance
+
+    def get_path_to_exit(self) -> list[BaseCell]:
+        """
+        Возвращает кратчайший путь от текущей клетки до выхода.
+
+        Returns:
+            list[BaseCell]: клетки пути без текущей клетки, пустой список -
+            выхода нет или он недостижим.
+        """
+        field = get_exit_field(self.__maze)
+        if field is None:
+            return []
+        current_cell = self.__maze.current_cell
+        path = field.path(current_cell.x + current_cell.y * self.maze_size)
+        cells = self.__maze.maze
+        return [cells[index] for index in path[1:]]
+
+    def get_best_game_time(self) -> Optional[float]:
+        """
+        Возвращает наименьшее возможное время прохождения лабиринта от
+        точки входа до выхода с учётом эффектов клеток (в ходах, см.
+        game.pathfinding.CELL_TIME).
+
+        Returns:
+            float: время прохождения.
+            None: выхода (эффекта победы) нет или он недостижим.
+        """
+        return get_best_time(self.__maze)
+
+    def get_maze_seed(self) -> Optional[MazeSeed]:
+        """
+        Возвращает зерно, по которому можно повторно получить лабиринт.
+
+        Returns:
+            MazeSeed: зерно лабиринта.
+            None: лабиринт не генерировался этим объектом, эффекты
+            расставлялись несколько раз, с фильтром по типам или с весами
+            не из пресета сложности.
+        """
+        if self._generated_seed is None or len(self._effects_params) > 1:
+            return None
+        if not self._effects_params:
+            return MazeSeed(self.maze_size, self._generated_seed,
+                            generator=self.generator)
+        if self._effects_params[0] is None:
+            return None
+        amount, repeat, win, difficulty = self._effects_params[0]
+        return MazeSeed(self.maze_size, self._generated_seed, amount,
+                        repeat, win, self.generator, difficulty)
+
     def copy_maze(self) -> AbstractMaze:
         """
         Копирует лабиринт.
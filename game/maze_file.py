@@ -0,0 +1,536 @@
+"""
+Лабиринты в файлах: потоковая генерация и постраничное чтение.
+
+Файл лабиринта имеет тот же формат, что и упакованный лабиринт
+(game.serialization.pack_maze): заголовок, 4-битные маски стен по две
+клетки на байт, таблица эффектов. Поэтому небольшой файл можно загрузить
+целиком через unpack_maze.
+
+Очень большие лабиринты ("марафон", например 10000x10000) в память не
+загружаются:
+1) generate_maze_file строит лабиринт алгоритмом Эллера по строкам и сразу
+   пишет каждую строку в файл. Память генерации пропорциональна одной
+   строке.
+2) PagedMaze читает стены из файла страницами по несколько строк и держит
+   в памяти только последние использованные страницы - строки рядом с
+   игроками.
+3) MappedMaze отображает файл в память (mmap) и читает маски стен прямо из
+   отображения. Страницы файла хранит операционная система, одна копия на
+   все комнаты и процессы, открывшие файл.
+"""
+import mmap
+import random
+import struct
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Optional, Union
+
+from game.abstract.abstract_maze import BaseCell, AbstractMaze, WALL_BITS
+from game.compact_maze import _PendingEffects
+from game.generators import EllerGenerator
+from game.maze_seed import SEED_LIMIT
+from game.overlay_maze import MazeOverlay
+
+MAZE_SIGNATURE = b'IFMZ'
+MAZE_FORMAT_VERSION = 1
+# Сигнатура, версия, размер лабиринта, индекс текущей клетки.
+MAZE_HEADER = struct.Struct('<4sBII')
+# Пустая таблица эффектов: 0 имён и 0 записей (см. game.serialization).
+EMPTY_EFFECT_TABLE = bytes(5)
+# Количество строк в странице и страниц в кэше PagedMaze.
+PAGE_ROWS = 16
+CACHE_PAGES = 8
+
+# Таблицы для bytes.translate: младшие и старшие 4 бита байта и сдвиг
+# маски в старшие 4 бита.
+_LOW_NIBBLE = bytes(value & 0x0F for value in range(256))
+_HIGH_NIBBLE = bytes(value >> 4 for value in range(256))
+_TO_HIGH_NIBBLE = bytes((value << 4) & 0xFF for value in range(256))
+
+
+def _pack_nibbles(masks: bytes) -> bytes:
+    """
+    Упаковывает чётное количество масок стен по две в байт.
+    """
+    low = int.from_bytes(masks[0::2], 'little')
+    high = int.from_bytes(masks[1::2].translate(_TO_HIGH_NIBBLE), 'little')
+    return (low | high).to_bytes(len(masks) // 2, 'little')
+
+
+def _unpack_nibbles(packed: bytes) -> bytearray:
+    """
+    Распаковывает маски стен, по две в байте.
+    """
+    masks = bytearray(len(packed) * 2)
+    masks[0::2] = packed.translate(_LOW_NIBBLE)
+    masks[1::2] = packed.translate(_HIGH_NIBBLE)
+    return masks
+
+
+class MazeFileWriter:
+    """
+    Записывает лабиринт в файл по строкам.
+
+    Хранит только неполный байт на стыке строк, поэтому память не зависит
+    от размера лабиринта.
+
+    Fields:
+        path: str (путь к файлу)
+        maze_size: int (размер лабиринта)
+        rows: int (количество записанных строк)
+        _carry: Optional[int] (маска последней клетки без пары в байте)
+    """
+
+    def __init__(self,
+                 path: str,
+                 maze_size: int,
+                 current_index: Optional[int] = None,
+                 ):
+        """
+        Args:
+            path: str (путь к файлу)
+            maze_size: int (размер лабиринта)
+            current_index: Optional[int] (индекс текущей клетки, по
+            умолчанию стандартная точка входа)
+        """
+        self.path = path
+        self.maze_size = maze_size
+        self.rows = 0
+        self._carry = None
+        if current_index is None:
+            current_index = maze_size // 2
+        self._file = open(path, 'wb')
+        self._file.write(MAZE_HEADER.pack(MAZE_SIGNATURE, MAZE_FORMAT_VERSION,
+                                          maze_size, current_index))
+
+    def write_row(self, masks: bytes) -> None:
+        """
+        Записывает маски стен следующей строки.
+
+        Args:
+            masks: bytes (маска стен на каждую клетку строки)
+        """
+        if len(masks) != self.maze_size:
+            raise ValueError('Длина строки не совпадает с размером лабиринта')
+        if self.rows == self.maze_size:
+            raise ValueError('Все строки лабиринта уже записаны')
+        if self._carry is not None:
+            masks = bytes([self._carry]) + masks
+        paired = len(masks) & ~1
+        self._file.write(_pack_nibbles(masks[:paired]))
+        self._carry = masks[paired] if paired < len(masks) else None
+        self.rows += 1
+
+    def close(self, effect_table: bytes = EMPTY_EFFECT_TABLE) -> None:
+        """
+        Дописывает таблицу эффектов и закрывает файл.
+
+        Args:
+            effect_table: bytes (упакованная таблица эффектов)
+        """
+        if self.rows != self.maze_size:
+            self._file.close()
+            raise ValueError(f'Записано строк {self.rows} из '
+                             f'{self.maze_size}')
+        if self._carry is not None:
+            self._file.write(bytes([self._carry]))
+            self._carry = None
+        self._file.write(effect_table)
+        self._file.close()
+
+    def __enter__(self) -> 'MazeFileWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+
+def generate_maze_file(path: str,
+                       maze_size: int,
+                       seed: Optional[int] = None,
+                       ) -> int:
+    """
+    Генерирует лабиринт алгоритмом Эллера и пишет его в файл по строкам.
+
+    Лабиринт совпадает с MazeGame(maze_size, seed=seed, generator='eller').
+
+    Args:
+        path: str (путь к файлу)
+        maze_size: int (размер лабиринта)
+        seed: Optional[int] (зерно, по умолчанию случайное)
+
+    Returns:
+        int: зерно лабиринта.
+    """
+    if seed is None:
+        seed = random.randrange(SEED_LIMIT)
+    random_generator = random.Random(seed)
+    with MazeFileWriter(path, maze_size) as writer:
+        for row in EllerGenerator().iter_rows(maze_size, random_generator):
+            writer.write_row(row)
+    return seed
+
+
+class FileCell(BaseCell):
+    """
+    Клетка лабиринта в файле (PagedMaze).
+
+    Стены читаются из страницы файла по индексу клетки. Стены нельзя
+    изменить: лабиринт в файле уже сгенерирован.
+
+    Fields:
+        x: int (координата X).
+        y: int (координата Y).
+    """
+    __slots__ = ('_maze', '_index', 'x', 'y')
+
+    def __init__(self, maze: 'PagedMaze', index: int):
+        self._maze = maze
+        self._index = index
+        self.y, self.x = divmod(index, maze.maze_size)
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def wall_mask(self) -> int:
+        return self._maze._get_mask(self._index)
+
+    @property
+    def walls(self) -> dict:
+        mask = self._maze._get_mask(self._index)
+        return {wall: bool(mask & bit) for wall, bit in WALL_BITS.items()}
+
+    def remove_walls(self, *args) -> None:
+        raise TypeError('Стены лабиринта в файле нельзя изменить')
+
+    @property
+    def visited(self) -> bool:
+        return True
+
+    @visited.setter
+    def visited(self, value: bool):
+        pass
+
+    @property
+    def user_visited(self) -> bool:
+        return self._index in self._maze._user_visited
+
+    @user_visited.setter
+    def user_visited(self, value: bool):
+        if value:
+            self._maze._user_visited.add(self._index)
+        else:
+            self._maze._user_visited.discard(self._index)
+
+    @property
+    def effects(self) -> list:
+        effects = self._maze._effects.get(self._index)
+        if effects is None:
+            return _PendingEffects(self._maze, self._index)
+        return effects
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, FileCell):
+            return (self._maze is other._maze
+                    and self._index == other._index)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self._maze), self._index))
+
+    def __repr__(self) -> str:
+        return f'({self.x};{self.y})'
+
+
+class FileCellSequence(Sequence):
+    """
+    Последовательность клеток лабиринта в файле.
+
+    Создаёт клетки (FileCell) по требованию, не храня их.
+    """
+
+    def __init__(self, maze: 'PagedMaze'):
+        self._maze = maze
+
+    def __len__(self) -> int:
+        return self._maze.maze_size * self._maze.maze_size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Клетки с таким индексом нет в лабиринте')
+        return FileCell(self._maze, index)
+
+
+class PagedMaze(AbstractMaze):
+    """
+    Лабиринт, стены которого читаются из файла по страницам.
+
+    Страница - page_rows соседних строк. В памяти хранятся cache_pages
+    последних использованных страниц (вытесняется самая давно
+    использованная), поэтому память зависит от размера страницы, а не
+    лабиринта. Эффекты и клетки, посещённые игроком, хранятся в памяти в
+    разреженном виде.
+
+    Лабиринт уже сгенерирован: все клетки считаются посещёнными при
+    генерации, стены изменить нельзя. Участники комнаты получают свои слои
+    через copy (MazeOverlay).
+
+    Fields:
+        path: str (путь к файлу лабиринта)
+        maze_size: int (размер лабиринта по X и Y)
+        page_rows: int (количество строк в странице)
+        cache_pages: int (количество страниц в памяти)
+        _pages: OrderedDict (номер страницы -> маски стен клеток страницы)
+        _effects: dict (индекс клетки -> список эффектов)
+        _user_visited: set (индексы клеток, посещённых игроком)
+        _current_index: int (индекс клетки, в которой находится
+            пользователь)
+    """
+
+    def __init__(self,
+                 path: str,
+                 page_rows: int = PAGE_ROWS,
+                 cache_pages: int = CACHE_PAGES,
+                 ):
+        """
+        Args:
+            path: str (путь к файлу лабиринта)
+            page_rows: int (количество строк в странице)
+            cache_pages: int (количество страниц в памяти)
+        """
+        self.path = path
+        self.page_rows = page_rows
+        self.cache_pages = cache_pages
+        self._file = open(path, 'rb')
+        signature, version, self.maze_size, self._current_index = \
+            MAZE_HEADER.unpack(self._file.read(MAZE_HEADER.size))
+        if signature != MAZE_SIGNATURE or version != MAZE_FORMAT_VERSION:
+            self._file.close()
+            raise ValueError('Файл не является лабиринтом')
+        self._page_cells = page_rows * self.maze_size
+        self._pages = OrderedDict()
+        self._user_visited = set()
+        self._effects = {}
+        self._load_effects()
+
+    def _load_effects(self) -> None:
+        # Таблица эффектов разбирается в game.serialization, который сам
+        # импортирует этот модуль.
+        from game.serialization import _unpack_effects
+
+        cells = self.maze_size * self.maze_size
+        self._file.seek(MAZE_HEADER.size + (cells + 1) // 2)
+        entries, _ = _unpack_effects(self._file.read(), 0)
+        for index, effect in entries:
+            self._effects.setdefault(index, []).append(effect)
+
+    def _read_page(self, page: int) -> bytearray:
+        """
+        Читает маски стен клеток страницы из файла.
+        """
+        start = page * self._page_cells
+        end = min(start + self._page_cells, self.maze_size * self.maze_size)
+        self._file.seek(MAZE_HEADER.size + (start >> 1))
+        packed = self._file.read(((end + 1) >> 1) - (start >> 1))
+        masks = _unpack_nibbles(packed)
+        # Страница может начинаться со старших 4 бит байта.
+        offset = start & 1
+        return masks[offset:offset + end - start]
+
+    def _get_mask(self, index: int) -> int:
+        """
+        Возвращает маску стен клетки по индексу, при необходимости читая
+        страницу.
+        """
+        page = index // self._page_cells
+        masks = self._pages.get(page)
+        if masks is None:
+            masks = self._read_page(page)
+            self._pages[page] = masks
+            if len(self._pages) > self.cache_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page)
+        return masks[index - page * self._page_cells]
+
+    def get_wall_mask(self, x: int, y: int) -> int:
+        """
+        Возвращает стены клетки в виде 4-битной маски (см. WALL_BITS).
+
+        Маска читается из страницы файла без создания FileCell.
+
+        Args:
+            x: int (координата X существующей клетки).
+            y: int (координата Y существующей клетки).
+
+        Returns:
+            int (маска из битов WALL_*).
+        """
+        return self._get_mask(x + y * self.maze_size)
+
+    def generate(self) -> None:
+        """
+        Возвращает пользователя в точку входа.
+
+        Сам лабиринт уже сгенерирован в файле (generate_maze_file).
+        """
+        self._current_index = self.maze_size // 2
+        self._user_visited = set()
+
+    def get_standard_entry_point(self) -> FileCell:
+        """
+        Получает изначальное положение пользователя в лабиринте.
+
+        Изначальное положение: центр лабиринта по X и 0 по Y.
+
+        Returns:
+            FileCell: точка в которой по умолчанию находится пользователь.
+        """
+        return FileCell(self, self.maze_size // 2)
+
+    def check_cell(self, x: int, y: int) -> Union[bool, FileCell]:
+        """
+        Проверяет существует ли клетка в лабиринте.
+
+        Args:
+            x: int (координата X проверяемой клетки).
+            y: int (координата Y проверяемой клетки).
+
+        Returns:
+            Union[False, FileCell]:
+                bool[False] - клетки с такими координатами нет в лабиринте.
+                FileCell - найденная клетка.
+        """
+        if 0 <= x < self.maze_size and 0 <= y < self.maze_size:
+            return FileCell(self, x + y * self.maze_size)
+        return False
+
+    def get_neighbors(self) -> dict:
+        """
+        Возвращает словарь с соседними клетками.
+
+        Если клетки не существует, она будет False.
+
+        Returns:
+            dict: (словарь с клетками).
+        """
+        y, x = divmod(self._current_index, self.maze_size)
+        return {
+            'top': self.check_cell(x, y - 1),
+            'right': self.check_cell(x + 1, y),
+            'bottom': self.check_cell(x, y + 1),
+            'left': self.check_cell(x - 1, y),
+        }
+
+    def check_neighbors(self,
+                        random_generator: Optional[random.Random] = None,
+                        ) -> Union[bool, FileCell]:
+        """
+        Не посещённых при генерации клеток нет.
+
+        Returns:
+            bool[False]: соседних, не посещённых клеток нет.
+        """
+        return False
+
+    def remove_walls(self, next_cell: FileCell) -> None:
+        raise TypeError('Стены лабиринта в файле нельзя изменить')
+
+    def mark_visited(self, cell: FileCell) -> None:
+        """
+        Все клетки уже посещены при генерации.
+        """
+        pass
+
+    def check_exist_not_visited_cell(self) -> bool:
+        return False
+
+    def copy(self) -> AbstractMaze:
+        """
+        Копирует лабиринт.
+
+        Возвращает копию с копированием при записи (MazeOverlay), файл и
+        эффекты остаются общими.
+
+        Returns:
+            AbstractMaze: новый лабиринт
+        """
+        return MazeOverlay(self)
+
+    def close(self) -> None:
+        """
+        Закрывает файл лабиринта.
+        """
+        self._file.close()
+        self._pages.clear()
+
+    @property
+    def current_cell(self) -> FileCell:
+        return FileCell(self, self._current_index)
+
+    @current_cell.setter
+    def current_cell(self, cell: BaseCell):
+        self._current_index = cell.x + cell.y * self.maze_size
+
+    @property
+    def maze(self) -> FileCellSequence:
+        return FileCellSequence(self)
+
+
+class MappedMaze(PagedMaze):
+    """
+    Лабиринт в файле, отображённом в память (mmap).
+
+    Маски стен читаются из отображения по индексу клетки, без чтения
+    страниц и кэша. Открытие не зависит от размера лабиринта, а память
+    страниц файла общая для всех отображений этого файла.
+
+    Fields:
+        _buffer: mmap.mmap (отображение файла только для чтения)
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: str (путь к файлу лабиринта)
+        """
+        super().__init__(path)
+        self._buffer = mmap.mmap(self._file.fileno(), 0,
+                                 access=mmap.ACCESS_READ)
+
+    def _get_mask(self, index: int) -> int:
+        value = self._buffer[MAZE_HEADER.size + (index >> 1)]
+        return value >> 4 if index & 1 else value & 0x0F
+
+    def close(self) -> None:
+        """
+        Закрывает отображение и файл лабиринта.
+        """
+        self._buffer.close()
+        super().close()
+
+
+def open_maze_file(path: str, mapped: bool = True) -> PagedMaze:
+    """
+    Открывает лабиринт в файле.
+
+    Args:
+        path: str (путь к файлу лабиринта)
+        mapped: bool (True - отображение в память (MappedMaze), False -
+        чтение страницами (PagedMaze))
+
+    Returns:
+        PagedMaze: лабиринт.
+    """
+    if mapped:
+        return MappedMaze(path)
+    return PagedMaze(path)
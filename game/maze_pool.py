@@ -0,0 +1,233 @@
+import threading
+import time
+from collections import deque
+from typing import Optional, Type, Union
+
+from game.abstract.abstract_maze import AbstractMaze
+from game.maze import MazeGame, Maze
+from game.maze_seed import DEFAULT_GENERATOR
+
+# Количество последних замеров времени генерации для перцентилей.
+LATENCY_WINDOW = 1000
+
+
+class MazePool:
+    """
+    Пул заранее сгенерированных лабиринтов.
+
+    Для каждой пары (размер лабиринта, количество эффектов) держит до
+    capacity готовых лабиринтов с расставленными эффектами. Пул пополняется
+    фоновым потоком, поэтому обработчик начала игры только забирает готовый
+    лабиринт, а не генерирует его.
+
+    Fields:
+        capacity: int (количество готовых лабиринтов на каждую пару)
+        maze_class: Type[AbstractMaze] (класс лабиринта)
+        generator: str (имя алгоритма генерации)
+        effect_weights: Union[str, dict, None] (веса эффектов, см.
+            MazeGame.arrange_effects)
+        hits: int (сколько раз лабиринт был взят из пула)
+        misses: int (сколько раз пул был пуст)
+        refills: int (сколько лабиринтов сгенерировано фоновым потоком)
+        _ready: dict ((размер, количество эффектов) -> deque готовых
+            лабиринтов)
+        _condition: threading.Condition (будит фоновый поток)
+        _thread: Optional[threading.Thread] (фоновый поток)
+    """
+
+    def __init__(self,
+                 capacity: int = 4,
+                 maze_class: Type[AbstractMaze] = Maze,
+                 generator: str = DEFAULT_GENERATOR,
+                 effect_weights: Union[str, dict, None] = None,
+                 ):
+        """
+        Args:
+            capacity: int (количество готовых лабиринтов на каждую пару)
+            maze_class: Type[AbstractMaze] (класс лабиринта)
+            generator: str (имя алгоритма генерации, см. game.generators)
+            effect_weights: Union[str, dict, None] (пресет сложности или
+            веса эффектов, см. game.effect_distribution)
+        """
+        self.capacity = capacity
+        self.maze_class = maze_class
+        self.generator = generator
+        self.effect_weights = effect_weights
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self._ready = {}
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._generated = 0
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def reserve(self, maze_size: int, effects: int) -> None:
+        """
+        Добавляет пару (размер, количество эффектов), для которой пул держит
+        готовые лабиринты.
+
+        Args:
+            maze_size: int (размер лабиринта)
+            effects: int (количество эффектов)
+        """
+        with self._condition:
+            self._ready.setdefault((maze_size, effects), deque())
+            self._condition.notify()
+
+    def generate(self, maze_size: int, effects: int) -> MazeGame:
+        """
+        Генерирует лабиринт с эффектами в текущем потоке.
+
+        Используется фоновым потоком и при промахе пула.
+
+        Args:
+            maze_size: int (размер лабиринта)
+            effects: int (количество эффектов)
+
+        Returns:
+            MazeGame: готовый лабиринт.
+        """
+        start = time.perf_counter()
+        maze_game = MazeGame(maze_size, maze_class=self.maze_class,
+                             generator=self.generator)
+        maze_game.generate_maze()
+        maze_game.arrange_effects(effects,
+                                  effect_weights=self.effect_weights)
+        latency = time.perf_counter() - start
+        with self._condition:
+            self._generated += 1
+            self._latencies.append(latency)
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+        return maze_game
+
+    def pop(self, maze_size: int, effects: int) -> Optional[MazeGame]:
+        """
+        Забирает готовый лабиринт из пула.
+
+        Пара (размер, количество эффектов) резервируется, если её ещё не
+        было, и фоновый поток пополняет пул.
+
+        Args:
+            maze_size: int (размер лабиринта)
+            effects: int (количество эффектов)
+
+        Returns:
+            MazeGame: готовый лабиринт.
+            None: пул пуст (лабиринт нужно сгенерировать через generate).
+        """
+        with self._condition:
+            ready = self._ready.setdefault((maze_size, effects), deque())
+            self._condition.notify()
+            if ready:
+                self.hits += 1
+                return ready.popleft()
+            self.misses += 1
+            return None
+
+    def get(self, maze_size: int, effects: int) -> MazeGame:
+        """
+        Забирает готовый лабиринт из пула, при промахе генерирует его в
+        текущем потоке.
+
+        Args:
+            maze_size: int (размер лабиринта)
+            effects: int (количество эффектов)
+
+        Returns:
+            MazeGame: готовый лабиринт.
+        """
+        return (self.pop(maze_size, effects)
+                or self.generate(maze_size, effects))
+
+    def ready_count(self, maze_size: int, effects: int) -> int:
+        """
+        Возвращает количество готовых лабиринтов пары.
+        """
+        with self._condition:
+            return len(self._ready.get((maze_size, effects), ()))
+
+    def _get_missing_key(self) -> Optional[tuple[int, int]]:
+        for key, ready in self._ready.items():
+            if len(ready) < self.capacity:
+                return key
+        return None
+
+    def _run(self) -> None:
+        """
+        Цикл фонового потока: генерирует лабиринты, пока в пуле есть
+        свободные места, иначе ждёт.
+        """
+        while True:
+            with self._condition:
+                key = self._get_missing_key()
+                while self._running and key is None:
+                    self._condition.wait()
+                    key = self._get_missing_key()
+                if not self._running:
+                    return
+            maze_game = self.generate(*key)
+            with self._condition:
+                self._ready[key].append(maze_game)
+                self.refills += 1
+
+    def start(self) -> None:
+        """
+        Запускает фоновый поток пополнения пула.
+        """
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='maze-pool',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Останавливает фоновый поток после генерации текущего лабиринта.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> dict:
+        """
+        Возвращает метрики пула.
+
+        Returns:
+            dict: количество готовых лабиринтов, попаданий и промахов,
+            доля попаданий, количество лабиринтов, сгенерированных фоновым
+            потоком, время генерации одного лабиринта в секундах.
+        """
+        with self._condition:
+            latencies = sorted(self._latencies)
+            ready = sum(len(ready) for ready in self._ready.values())
+            generated = self._generated
+
+        def percentile(value: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1,
+                                 int(len(latencies) * value))]
+
+        requests = self.hits + self.misses
+        return {
+            'ready': ready,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'refills': self.refills,
+            'refill_latency_avg': (self._latency_total / generated
+                                   if generated else 0.0),
+            'refill_latency_p50': percentile(0.5),
+            'refill_latency_p95': percentile(0.95),
+            'refill_latency_max': self._latency_max,
+        }
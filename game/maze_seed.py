@@ -0,0 +1,118 @@
+"""
+Зерно лабиринта: всё, что нужно для повторной генерации лабиринта.
+
+Лабиринт, сгенерированный MazeGame с зерном, полностью определяется
+размером, зерном и параметрами расстановки эффектов. Вместо сетки можно
+хранить или передавать только их (около 20 байт).
+
+Формат (little-endian): сигнатура b'IFMS', версия (1 байт), размер
+лабиринта (4 байта), зерно (8 байт), количество эффектов (4 байта),
+repeat (1 байт), win (1 байт), номер алгоритма генерации в
+GENERATOR_NAMES (1 байт), номер пресета сложности в DIFFICULTY_NAMES со
+сдвигом на 1 (1 байт, 0 - эффекты равновероятны). В версии 1 номера
+алгоритма нет, такие зёрна описывают лабиринты обхода в глубину. В
+версии 2 нет пресета сложности.
+"""
+import struct
+from typing import NamedTuple, Optional
+
+SEED_SIGNATURE = b'IFMS'
+SEED_FORMAT_VERSION = 3
+# Зерно - беззнаковое 64-битное число.
+SEED_LIMIT = 2 ** 64
+# Алгоритмы генерации (game.generators). Номер алгоритма в зерне - индекс
+# в кортеже, поэтому новые алгоритмы добавляются только в конец.
+GENERATOR_NAMES = ('backtracker', 'kruskal', 'eller', 'wilson',
+                   'binary_tree', 'sidewinder')
+DEFAULT_GENERATOR = GENERATOR_NAMES[0]
+# Пресеты сложности (game.effect_distribution.DIFFICULTY_PRESETS), которые
+# можно описать зерном. Как и алгоритмы, добавляются только в конец.
+DIFFICULTY_NAMES = ('easy', 'normal', 'hard')
+
+_SEED_V1 = struct.Struct('<4sBIQIBB')
+_SEED_V2 = struct.Struct('<4sBIQIBBB')
+_SEED = struct.Struct('<4sBIQIBBBB')
+
+
+class MazeSeed(NamedTuple):
+    """
+    Параметры повторной генерации лабиринта.
+
+    Fields:
+        maze_size: int (размер лабиринта по X и Y)
+        seed: int (зерно генератора случайных чисел)
+        effects: Optional[int] (количество эффектов, None - эффекты не
+            расставлялись)
+        repeat: bool (параметр repeat расстановки эффектов)
+        win: bool (параметр win расстановки эффектов)
+        generator: str (имя алгоритма генерации)
+        difficulty: Optional[str] (пресет сложности расстановки эффектов,
+            None - эффекты равновероятны)
+    """
+    maze_size: int
+    seed: int
+    effects: Optional[int] = None
+    repeat: bool = True
+    win: bool = True
+    generator: str = DEFAULT_GENERATOR
+    difficulty: Optional[str] = None
+
+
+def pack_maze_seed(maze_seed: MazeSeed) -> bytes:
+    """
+    Упаковывает зерно лабиринта в байты.
+
+    Args:
+        maze_seed: MazeSeed (зерно лабиринта)
+
+    Returns:
+        bytes: упакованное зерно.
+    """
+    # Количество эффектов и пресет хранятся со сдвигом на 1: 0 - эффектов
+    # (весов) нет.
+    effects = 0 if maze_seed.effects is None else maze_seed.effects + 1
+    difficulty = (0 if maze_seed.difficulty is None
+                  else DIFFICULTY_NAMES.index(maze_seed.difficulty) + 1)
+    return _SEED.pack(SEED_SIGNATURE, SEED_FORMAT_VERSION,
+                      maze_seed.maze_size, maze_seed.seed, effects,
+                      maze_seed.repeat, maze_seed.win,
+                      GENERATOR_NAMES.index(maze_seed.generator),
+                      difficulty)
+
+
+def is_maze_seed(data: bytes) -> bool:
+    """
+    Проверяет, являются ли данные упакованным зерном лабиринта.
+    """
+    return data[:len(SEED_SIGNATURE)] == SEED_SIGNATURE
+
+
+def unpack_maze_seed(data: bytes) -> MazeSeed:
+    """
+    Распаковывает зерно лабиринта.
+
+    Args:
+        data: bytes (упакованное зерно)
+
+    Returns:
+        MazeSeed: зерно лабиринта.
+    """
+    difficulty = 0
+    if len(data) == _SEED_V1.size:
+        signature, version, maze_size, seed, effects, repeat, win = \
+            _SEED_V1.unpack(data)
+        generator = 0
+        expected_version = 1
+    elif len(data) == _SEED_V2.size:
+        signature, version, maze_size, seed, effects, repeat, win, \
+            generator = _SEED_V2.unpack(data)
+        expected_version = 2
+    else:
+        signature, version, maze_size, seed, effects, repeat, win, \
+            generator, difficulty = _SEED.unpack(data)
+        expected_version = SEED_FORMAT_VERSION
+    if signature != SEED_SIGNATURE or version != expected_version:
+        raise ValueError('Данные не являются зерном лабиринта')
+    return MazeSeed(maze_size, seed, effects - 1 if effects else None,
+                    bool(repeat), bool(win), GENERATOR_NAMES[generator],
+                    DIFFICULTY_NAMES[difficulty - 1] if difficulty else None)
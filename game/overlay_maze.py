@@ -0,0 +1,328 @@
+import random
+from collections.abc import Sequence
+from typing import Union, Optional
+
+from game.abstract.abstract_maze import BaseCell, AbstractMaze
+
+
+class OverlayCell(BaseCell):
+    """
+    Клетка лабиринта участника (MazeOverlay).
+
+    Стены и флаг visited читаются из общей клетки комнаты, а user_visited и
+    эффекты учитывают личное состояние участника.
+
+    Fields:
+        _overlay: MazeOverlay (лабиринт участника).
+        _cell: BaseCell (общая клетка комнаты).
+    """
+    __slots__ = ('_overlay', '_cell')
+
+    def __init__(self, overlay: 'MazeOverlay', cell: BaseCell):
+        self._overlay = overlay
+        self._cell = cell
+
+    @property
+    def x(self) -> int:
+        return self._cell.x
+
+    @property
+    def y(self) -> int:
+        return self._cell.y
+
+    @property
+    def index(self) -> int:
+        return self._cell.x + self._cell.y * self._overlay.maze_size
+
+    @property
+    def walls(self) -> dict:
+        return self._cell.walls
+
+    @property
+    def wall_mask(self) -> int:
+        return self._cell.wall_mask
+
+    def remove_walls(self, *args) -> None:
+        """
+        Удаляет стены у общей клетки (используется при генерации).
+        """
+        self._cell.remove_walls(*args)
+
+    @property
+    def visited(self) -> bool:
+        return self._cell.visited
+
+    @visited.setter
+    def visited(self, value: bool):
+        self._cell.visited = value
+
+    @property
+    def user_visited(self) -> bool:
+        return self.index in self._overlay._user_visited
+
+    @user_visited.setter
+    def user_visited(self, value: bool):
+        if value:
+            self._overlay._user_visited.add(self.index)
+        else:
+            self._overlay._user_visited.discard(self.index)
+
+    @property
+    def effects(self) -> list:
+        """
+        Эффекты клетки без эффектов, уже использованных участником.
+
+        Если участник не использовал эффекты клетки, возвращается общий
+        список эффектов комнаты.
+        """
+        consumed = self._overlay._consumed_effects.get(self.index)
+        if not consumed:
+            return self._cell.effects
+        return [effect for effect in self._cell.effects
+                if effect not in consumed]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, OverlayCell):
+            return (self._overlay is other._overlay
+                    and self.index == other.index)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self._overlay), self.index))
+
+    def __repr__(self) -> str:
+        return f'({self.x};{self.y})'
+
+
+class OverlayCellSequence(Sequence):
+    """
+    Последовательность клеток лабиринта участника.
+
+    Оборачивает клетки общего лабиринта по требованию.
+    """
+
+    def __init__(self, overlay: 'MazeOverlay'):
+        self._overlay = overlay
+        self._cells = overlay.base.maze
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [OverlayCell(self._overlay, cell)
+                    for cell in self._cells[index]]
+        return OverlayCell(self._overlay, self._cells[index])
+
+    def copy(self) -> list[OverlayCell]:
+        """
+        Возвращает список всех клеток.
+        """
+        return list(self)
+
+
+class MazeOverlay(AbstractMaze):
+    """
+    Лабиринт участника с копированием при записи (copy-on-write).
+
+    Топология лабиринта (стены) и эффекты хранятся один раз в общем
+    лабиринте комнаты (base). Участник хранит только своё положение,
+    посещённые клетки и использованные эффекты, поэтому память на участника
+    пропорциональна числу посещённых им клеток, а не размеру лабиринта.
+
+    Fields:
+        base: AbstractMaze (общий лабиринт комнаты).
+        maze_size: int (размер лабиринта по X и Y).
+        _current_index: int (индекс клетки, в которой находится участник).
+        _user_visited: set (индексы клеток, посещённых участником).
+        _consumed_effects: dict (использованные эффекты:
+            индекс клетки -> множество эффектов).
+    """
+
+    def __init__(self, base: AbstractMaze, *args, **kwargs):
+        # Накладываем слой только на общий лабиринт, а не на другой слой.
+        if isinstance(base, MazeOverlay):
+            base = base.base
+        self.base = base
+        self.maze_size = base.maze_size
+        current_cell = base.current_cell
+        self._current_index = current_cell.x + current_cell.y * self.maze_size
+        self._user_visited = set()
+        self._consumed_effects = {}
+
+    def _wrap(self, cell: Union[bool, BaseCell]) -> Union[bool, OverlayCell]:
+        return OverlayCell(self, cell) if cell else False
+
+    def generate(self) -> None:
+        """
+        Генерирует общий лабиринт и сбрасывает состояние участника.
+        """
+        self.base.generate()
+        entry_point = self.base.get_standard_entry_point()
+        self._current_index = entry_point.x + entry_point.y * self.maze_size
+        self._user_visited = set()
+        self._consumed_effects = {}
+
+    def get_standard_entry_point(self) -> OverlayCell:
+        """
+        Получает изначальное положение участника в лабиринте.
+
+        Returns:
+            OverlayCell: точка в которой по умолчанию находится участник.
+        """
+        return self._wrap(self.base.get_standard_entry_point())
+
+    def check_cell(self, x: int, y: int) -> Union[bool, OverlayCell]:
+        """
+        Проверяет существует ли клетка в лабиринте.
+
+        Args:
+            x: int (координата X проверяемой клетки).
+            y: int (координата Y проверяемой клетки).
+
+        Returns:
+            Union[False, OverlayCell]:
+                bool[False] - клетки с такими координатами нет в лабиринте.
+                OverlayCell - найденная клетка.
+        """
+        return self._wrap(self.base.check_cell(x, y))
+
+    def get_neighbors(self) -> dict:
+        """
+        Возвращает словарь с соседними клетками.
+
+        Если клетки не существует, она будет False.
+
+        Returns:
+            dict: (словарь с клетками).
+        """
+        y, x = divmod(self._current_index, self.maze_size)
+        return {
+            'top': self.check_cell(x, y - 1),
+            'right': self.check_cell(x + 1, y),
+            'left': self.check_cell(x - 1, y),
+            'bottom': self.check_cell(x, y + 1),
+        }
+
+    def get_wall_mask(self, x: int, y: int) -> int:
+        """
+        Возвращает стены клетки в виде 4-битной маски (см. WALL_BITS).
+
+        Стены оверлей не меняет, поэтому маска берётся из базового
+        лабиринта.
+
+        Args:
+            x: int (координата X существующей клетки).
+            y: int (координата Y существующей клетки).
+
+        Returns:
+            int (маска из битов WALL_*).
+        """
+        return self.base.get_wall_mask(x, y)
+
+    def check_neighbors(self,
+                        random_generator: Optional[random.Random] = None,
+                        ) -> Union[bool, OverlayCell]:
+        """
+        Получение случайной соседней не посещённой клетки.
+
+        Args:
+            random_generator: Optional[random.Random] (генератор случайных
+            чисел, по умолчанию модуль random)
+
+        Returns:
+            Union[False, OverlayCell]:
+                bool[False] - соседних, не посещённых клеток нет.
+                OverlayCell - случайная соседняя клетка.
+        """
+        all_neighbors = self.get_neighbors()
+        neighbors = [all_neighbors[direction]
+                     for direction in ('top', 'right', 'bottom', 'left')
+                     if all_neighbors[direction]
+                     and not all_neighbors[direction].visited]
+        if not neighbors:
+            return False
+        return (random_generator or random).choice(neighbors)
+
+    def remove_walls(self, next_cell: OverlayCell) -> None:
+        """
+        Удаляет стены у текущей и следующей клетки общего лабиринта.
+
+        Args:
+            next_cell: OverlayCell (клетка в которую мы переходим).
+        """
+        current_cell = self.current_cell
+        dx = current_cell.x - next_cell.x
+        dy = current_cell.y - next_cell.y
+        if dx == 1:
+            current_cell.remove_walls('left')
+            next_cell.remove_walls('right')
+        if dx == -1:
+            current_cell.remove_walls('right')
+            next_cell.remove_walls('left')
+        if dy == 1:
+            current_cell.remove_walls('top')
+            next_cell.remove_walls('bottom')
+        if dy == -1:
+            current_cell.remove_walls('bottom')
+            next_cell.remove_walls('top')
+
+    def mark_visited(self, cell: OverlayCell) -> None:
+        """
+        Помечает клетку общего лабиринта посещённой при генерации.
+
+        Args:
+            cell: OverlayCell (посещаемая клетка).
+        """
+        self.base.mark_visited(cell._cell)
+
+    def check_exist_not_visited_cell(self) -> bool:
+        """
+        Проверяет есть ли в общем лабиринте не посещённые клетки.
+        """
+        return self.base.check_exist_not_visited_cell()
+
+    def consume_effect(self, cell: BaseCell, effect) -> None:
+        """
+        Отмечает эффект клетки использованным участником.
+
+        Эффект пропадает только из лабиринта участника, общий лабиринт
+        комнаты не меняется.
+
+        Args:
+            cell: BaseCell (клетка с эффектом).
+            effect: AbstractEffect (использованный эффект).
+        """
+        index = cell.x + cell.y * self.maze_size
+        self._consumed_effects.setdefault(index, set()).add(effect)
+
+    def copy(self) -> 'MazeOverlay':
+        """
+        Копирует лабиринт участника.
+
+        Общий лабиринт не копируется, копируется только личное состояние.
+
+        Returns:
+            MazeOverlay: новый лабиринт участника.
+        """
+        new_obj = self.__class__(self.base)
+        new_obj._current_index = self._current_index
+        new_obj._user_visited = set(self._user_visited)
+        new_obj._consumed_effects = {
+            index: set(effects)
+            for index, effects in self._consumed_effects.items()
+        }
+        return new_obj
+
+    @property
+    def current_cell(self) -> OverlayCell:
+        y, x = divmod(self._current_index, self.maze_size)
+        return self.check_cell(x, y)
+
+    @current_cell.setter
+    def current_cell(self, cell: BaseCell):
+        self._current_index = cell.x + cell.y * self.maze_size
+
+    @property
+    def maze(self) -> OverlayCellSequence:
+        return OverlayCellSequence(self)
@@ -0,0 +1,608 @@
+"""
+Поиск путей и поле расстояний в лабиринте.
+
+Стены лабиринта не меняются после generate_maze, поэтому расстояния от
+клетки до всех остальных считаются один раз обходом в ширину (BFS) за
+O(количество клеток) и кэшируются для лабиринта. После этого:
+1) расстояние от любой клетки до источника - O(1);
+2) путь от клетки до источника восстанавливается за O(длина пути) по
+   убыванию расстояния, без хранения родителей.
+
+Поле строится от клетки выхода (эффект победы), поэтому "сколько ходов
+осталось до выхода" и подсказка следующего хода для любого участника
+комнаты не требуют нового обхода. Клетка выхода тоже кэшируется, пока
+эффекты лабиринта не расставят заново.
+
+Время прохождения с учётом эффектов считается алгоритмом Дейкстры (A*,
+если известна конечная клетка) по массиву смежности (CSR) с индексной
+двоичной кучей: вход в клетку стоит CELL_TIME, умноженное на коэффициенты
+эффектов клетки, увеличивающих время её прохождения.
+"""
+import weakref
+from array import array
+from collections import OrderedDict
+from typing import Optional
+
+from game.abstract.abstract_maze import (AbstractMaze, WALL_TOP, WALL_RIGHT,
+                                         WALL_BOTTOM, WALL_LEFT)
+from game.compact_maze import CompactMaze
+from game.effect_type import (WinEffectType,
+                              IncreasesEffectTypeCellCompletionTime)
+from game.maze_file import PagedMaze
+from game.overlay_maze import MazeOverlay
+
+# Расстояние до клетки, в которую нельзя попасть из источника.
+UNREACHABLE = -1
+# Количество полей расстояний (разных источников) в кэше одного лабиринта.
+FIELDS_PER_MAZE = 4
+
+# Время прохождения клетки без эффектов (в ходах).
+CELL_TIME = 1.0
+# Время до клетки, в которую нельзя попасть из источника.
+INFINITE_TIME = float('inf')
+
+# Общий лабиринт -> OrderedDict (источник -> DistanceField).
+_fields = weakref.WeakKeyDictionary()
+# Общий лабиринт -> Adjacency.
+_adjacency = weakref.WeakKeyDictionary()
+# Общий лабиринт -> индекс клетки выхода (None - выхода нет).
+_win_indices = weakref.WeakKeyDictionary()
+# Общий лабиринт -> лучшее время от точки входа до выхода.
+_best_times = weakref.WeakKeyDictionary()
+
+
+def get_base_maze(maze: AbstractMaze) -> AbstractMaze:
+    """
+    Возвращает общий лабиринт комнаты для лабиринта участника.
+    """
+    if isinstance(maze, MazeOverlay):
+        return maze.base
+    return maze
+
+
+def get_wall_masks(maze: AbstractMaze) -> bytes:
+    """
+    Возвращает маски стен всех клеток лабиринта (см. WALL_BITS).
+
+    Args:
+        maze: AbstractMaze (лабиринт)
+
+    Returns:
+        bytes: маска стен на каждую клетку.
+    """
+    maze = get_base_maze(maze)
+    if isinstance(maze, CompactMaze):
+        return bytes(maze._walls)
+    if isinstance(maze, PagedMaze):
+        pages = (maze.maze_size + maze.page_rows - 1) // maze.page_rows
+        return b''.join(maze._read_page(page) for page in range(pages))
+    return bytes(cell.wall_mask for cell in maze.maze)
+
+
+def find_win_index(maze: AbstractMaze) -> Optional[int]:
+    """
+    Ищет клетку с эффектом победы (выход из лабиринта).
+
+    Args:
+        maze: AbstractMaze (лабиринт)
+
+    Returns:
+        int: индекс клетки выхода.
+        None: эффекта победы в лабиринте нет.
+    """
+    maze = get_base_maze(maze)
+    if isinstance(maze, (CompactMaze, PagedMaze)):
+        # Эффекты хранятся разреженно, клетки без эффектов не перебираем.
+        for index in sorted(maze._effects):
+            if any(effect.effect_type is WinEffectType
+                   for effect in maze._effects[index]):
+                return index
+        return None
+    for index, cell in enumerate(maze.maze):
+        if any(effect.effect_type is WinEffectType
+               for effect in cell.effects):
+            return index
+    return None
+
+
+class DistanceField:
+    """
+    Расстояния (количество ходов) от клетки-источника до всех клеток.
+
+    Fields:
+        maze_size: int (размер лабиринта)
+        source: int (индекс клетки-источника)
+        distances: array (расстояние до каждой клетки, UNREACHABLE -
+            клетка недостижима)
+        _masks: bytes (маски стен клеток)
+    """
+
+    def __init__(self, masks: bytes, maze_size: int, source: int):
+        """
+        Строит поле обходом в ширину.
+
+        Args:
+            masks: bytes (маски стен клеток)
+            maze_size: int (размер лабиринта)
+            source: int (индекс клетки-источника)
+        """
+        self.maze_size = maze_size
+        self.source = source
+        self._masks = masks
+        size = maze_size
+        distances = array('i', [UNREACHABLE]) * (size * size)
+        distances[source] = 0
+        queue = array('i', [source])
+        # Очередь только растёт: цикл for проходит и по добавленным
+        # клеткам. Граничные стены есть всегда, поэтому выйти за пределы
+        # лабиринта нельзя.
+        for index in queue:
+            distance = distances[index] + 1
+            mask = masks[index]
+            if not mask & WALL_TOP and distances[index - size] < 0:
+                distances[index - size] = distance
+                queue.append(index - size)
+            if not mask & WALL_RIGHT and distances[index + 1] < 0:
+                distances[index + 1] = distance
+                queue.append(index + 1)
+            if not mask & WALL_BOTTOM and distances[index + size] < 0:
+                distances[index + size] = distance
+                queue.append(index + size)
+            if not mask & WALL_LEFT and distances[index - 1] < 0:
+                distances[index - 1] = distance
+                queue.append(index - 1)
+        self.distances = distances
+
+    def distance(self, index: int) -> int:
+        """
+        Возвращает расстояние от клетки до источника.
+
+        Args:
+            index: int (индекс клетки)
+
+        Returns:
+            int: количество ходов или UNREACHABLE.
+        """
+        return self.distances[index]
+
+    def next_step(self, index: int) -> Optional[int]:
+        """
+        Возвращает соседнюю клетку на кратчайшем пути к источнику.
+
+        Args:
+            index: int (индекс клетки)
+
+        Returns:
+            int: индекс следующей клетки.
+            None: клетка - источник или недостижима.
+        """
+        distance = self.distances[index]
+        if distance <= 0:
+            return None
+        size = self.maze_size
+        mask = self._masks[index]
+        for wall, neighbor in ((WALL_TOP, index - size),
+                               (WALL_RIGHT, index + 1),
+                               (WALL_BOTTOM, index + size),
+                               (WALL_LEFT, index - 1)):
+            if not mask & wall and self.distances[neighbor] == distance - 1:
+                return neighbor
+        return None
+
+    def path(self, index: int) -> list[int]:
+        """
+        Восстанавливает кратчайший путь от клетки до источника.
+
+        Args:
+            index: int (индекс начальной клетки)
+
+        Returns:
+            list[int]: индексы клеток пути от начальной клетки до источника
+            включительно, пустой список - клетка недостижима.
+        """
+        if self.distances[index] < 0:
+            return []
+        path = [index]
+        while index != self.source:
+            index = self.next_step(index)
+            path.append(index)
+        return path
+
+    def farthest(self) -> tuple[int, int]:
+        """
+        Возвращает самую удалённую от источника клетку.
+
+        Returns:
+            tuple[int, int]: индекс клетки и расстояние до неё.
+        """
+        distance = max(self.distances)
+        return self.distances.index(distance), distance
+
+
+def get_distance_field(maze: AbstractMaze, source: int) -> DistanceField:
+    """
+    Возвращает поле расстояний от клетки, строя его при первом запросе.
+
+    Поля кэшируются для общего лабиринта комнаты, поэтому участники
+    комнаты используют одно поле.
+
+    Args:
+        maze: AbstractMaze (лабиринт)
+        source: int (индекс клетки-источника)
+
+    Returns:
+        DistanceField: поле расстояний.
+    """
+    maze = get_base_maze(maze)
+    fields = _fields.get(maze)
+    if fields is None:
+        fields = _fields[maze] = OrderedDict()
+    field = fields.get(source)
+    if field is not None:
+        fields.move_to_end(source)
+        return field
+    field = DistanceField(get_wall_masks(maze), maze.maze_size, source)
+    fields[source] = field
+    if len(fields) > FIELDS_PER_MAZE:
+        fields.popitem(last=False)
+    return field
+
+
+def invalidate(maze: AbstractMaze) -> None:
+    """
+    Удаляет поля расстояний, массив смежности и клетку выхода лабиринта из
+    кэша (после изменения стен).
+    """
+    maze = get_base_maze(maze)
+    _fields.pop(maze, None)
+    _adjacency.pop(maze, None)
+    _win_indices.pop(maze, None)
+    _best_times.pop(maze, None)
+
+
+def invalidate_effects(maze: AbstractMaze) -> None:
+    """
+    Удаляет клетку выхода и лучшее время прохождения лабиринта из кэша
+    (после расстановки эффектов).
+
+    Поля расстояний зависят только от стен и остаются в кэше.
+    """
+    maze = get_base_maze(maze)
+    _win_indices.pop(maze, None)
+    _best_times.pop(maze, None)
+
+
+def get_win_index(maze: AbstractMaze) -> Optional[int]:
+    """
+    Возвращает индекс клетки выхода, ища её при первом запросе.
+
+    Клетка кэшируется для общего лабиринта комнаты до invalidate_effects.
+
+    Returns:
+        int: индекс клетки выхода.
+        None: эффекта победы в лабиринте нет.
+    """
+    maze = get_base_maze(maze)
+    try:
+        return _win_indices[maze]
+    except KeyError:
+        win_index = _win_indices[maze] = find_win_index(maze)
+        return win_index
+
+
+def get_exit_field(maze: AbstractMaze) -> Optional[DistanceField]:
+    """
+    Возвращает поле расстояний от выхода из лабиринта.
+
+    Returns:
+        DistanceField: поле расстояний.
+        None: выхода (эффекта победы) в лабиринте нет.
+    """
+    win_index = get_win_index(maze)
+    if win_index is None:
+        return None
+    return get_distance_field(maze, win_index)
+
+
+class Adjacency:
+    """
+    Массив смежности лабиринта в формате CSR.
+
+    Соседи клетки index, между которыми нет стены, - это
+    targets[offsets[index]:offsets[index + 1]]. Два плоских массива вместо
+    списка списков: нет объекта на клетку и нет проверки стен при поиске.
+
+    Fields:
+        offsets: array (начало соседей каждой клетки в targets, на одну
+            запись больше количества клеток)
+        targets: array (индексы соседних клеток)
+    """
+
+    def __init__(self, masks: bytes, maze_size: int):
+        """
+        Args:
+            masks: bytes (маски стен клеток)
+            maze_size: int (размер лабиринта)
+        """
+        size = maze_size
+        offsets = array('i', [0]) * (len(masks) + 1)
+        targets = array('i')
+        for index, mask in enumerate(masks):
+            if not mask & WALL_TOP:
+                targets.append(index - size)
+            if not mask & WALL_RIGHT:
+                targets.append(index + 1)
+            if not mask & WALL_BOTTOM:
+                targets.append(index + size)
+            if not mask & WALL_LEFT:
+                targets.append(index - 1)
+            offsets[index + 1] = len(targets)
+        self.offsets = offsets
+        self.targets = targets
+
+
+def get_adjacency(maze: AbstractMaze) -> Adjacency:
+    """
+    Возвращает массив смежности лабиринта, строя его при первом запросе.
+    """
+    maze = get_base_maze(maze)
+    adjacency = _adjacency.get(maze)
+    if adjacency is None:
+        adjacency = Adjacency(get_wall_masks(maze), maze.maze_size)
+        _adjacency[maze] = adjacency
+    return adjacency
+
+
+def get_cell_costs(maze: AbstractMaze) -> array:
+    """
+    Возвращает время входа в каждую клетку с учётом эффектов.
+
+    Время входа - CELL_TIME, умноженное на коэффициенты эффектов клетки,
+    увеличивающих время её прохождения.
+
+    Args:
+        maze: AbstractMaze (лабиринт)
+
+    Returns:
+        array: время входа в каждую клетку.
+    """
+    maze = get_base_maze(maze)
+    cells = maze.maze_size * maze.maze_size
+    costs = array('d', [CELL_TIME]) * cells
+    if isinstance(maze, (CompactMaze, PagedMaze)):
+        effects = maze._effects.items()
+    else:
+        effects = ((index, cell.effects)
+                   for index, cell in enumerate(maze.maze) if cell.effects)
+    for index, cell_effects in effects:
+        for effect in cell_effects:
+            if effect.effect_type is IncreasesEffectTypeCellCompletionTime:
+                costs[index] *= effect.coefficient
+    return costs
+
+
+class IndexedHeap:
+    """
+    Индексная двоичная куча (очередь с приоритетом) клеток.
+
+    Хранит позицию каждой клетки в куче, поэтому уменьшение приоритета
+    клетки, уже находящейся в куче, выполняется за O(log n) без
+    дублирования записей.
+
+    Fields:
+        _heap: list (индексы клеток в порядке кучи)
+        _keys: list (приоритет каждой клетки)
+        _positions: list (позиция клетки в _heap, -1 - клетки в куче нет)
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: int (количество клеток)
+        """
+        # Списки быстрее массивов array: элементы не упаковываются при
+        # каждом обращении.
+        self._heap = []
+        self._keys = [0.0] * capacity
+        self._positions = [-1] * capacity
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, item: int, key: float) -> None:
+        """
+        Добавляет клетку или уменьшает её приоритет.
+
+        Args:
+            item: int (индекс клетки)
+            key: float (приоритет, меньше - раньше)
+        """
+        position = self._positions[item]
+        if position < 0:
+            position = len(self._heap)
+            self._heap.append(item)
+        elif key >= self._keys[item]:
+            return
+        self._keys[item] = key
+        self._sift_up(position)
+
+    def pop(self) -> int:
+        """
+        Извлекает клетку с наименьшим приоритетом.
+
+        Returns:
+            int: индекс клетки.
+        """
+        heap = self._heap
+        item = heap[0]
+        last = heap.pop()
+        self._positions[item] = -1
+        if heap:
+            heap[0] = last
+            self._positions[last] = 0
+            self._sift_down(0)
+        return item
+
+    def _sift_up(self, position: int) -> None:
+        heap, keys, positions = self._heap, self._keys, self._positions
+        item = heap[position]
+        key = keys[item]
+        while position:
+            parent_position = (position - 1) >> 1
+            parent = heap[parent_position]
+            if keys[parent] <= key:
+                break
+            heap[position] = parent
+            positions[parent] = position
+            position = parent_position
+        heap[position] = item
+        positions[item] = position
+
+    def _sift_down(self, position: int) -> None:
+        heap, keys, positions = self._heap, self._keys, self._positions
+        size = len(heap)
+        item = heap[position]
+        key = keys[item]
+        while True:
+            child_position = 2 * position + 1
+            if child_position >= size:
+                break
+            child = heap[child_position]
+            right_position = child_position + 1
+            if right_position < size and \
+                    keys[heap[right_position]] < keys[child]:
+                child_position = right_position
+                child = heap[right_position]
+            if keys[child] >= key:
+                break
+            heap[position] = child
+            positions[child] = position
+            position = child_position
+        heap[position] = item
+        positions[item] = position
+
+
+class TimeField:
+    """
+    Наименьшее время прохождения от клетки-источника.
+
+    Fields:
+        source: int (индекс клетки-источника)
+        times: array (наименьшее время до клетки, INFINITE_TIME - клетка
+            недостижима или не рассмотрена поиском A*)
+        parents: array (предыдущая клетка на лучшем пути, -1 - нет)
+    """
+
+    def __init__(self, source: int, times: array, parents: array):
+        self.source = source
+        self.times = times
+        self.parents = parents
+
+    def time(self, index: int) -> float:
+        return self.times[index]
+
+    def path(self, index: int) -> list[int]:
+        """
+        Восстанавливает лучший путь от источника до клетки.
+
+        Returns:
+            list[int]: индексы клеток пути от источника до клетки
+            включительно, пустой список - клетка недостижима.
+        """
+        if self.times[index] == INFINITE_TIME:
+            return []
+        path = [index]
+        while index != self.source:
+            index = self.parents[index]
+            path.append(index)
+        path.reverse()
+        return path
+
+
+def find_fastest_paths(maze: AbstractMaze,
+                       source: int,
+                       target: Optional[int] = None,
+                       ) -> TimeField:
+    """
+    Ищет пути с наименьшим временем прохождения от клетки-источника.
+
+    Без target - алгоритм Дейкстры до всех клеток. С target - A* с
+    манхэттенским расстоянием, умноженным на наименьшее время входа в
+    клетку, поиск останавливается на target.
+
+    Args:
+        maze: AbstractMaze (лабиринт)
+        source: int (индекс клетки-источника)
+        target: Optional[int] (индекс конечной клетки)
+
+    Returns:
+        TimeField: время и лучшие пути от источника.
+    """
+    adjacency = get_adjacency(maze)
+    offsets, targets = adjacency.offsets, adjacency.targets
+    costs = get_cell_costs(maze)
+    size = get_base_maze(maze).maze_size
+    cells = len(costs)
+    costs = costs.tolist()
+    times = [INFINITE_TIME] * cells
+    parents = [-1] * cells
+    times[source] = 0.0
+    if target is None:
+        target_y = target_x = scale = 0
+    else:
+        target_y, target_x = divmod(target, size)
+        scale = min(costs)
+    heap = IndexedHeap(cells)
+    heap.push(source, 0.0)
+    while heap:
+        index = heap.pop()
+        if index == target:
+            break
+        time = times[index]
+        for position in range(offsets[index], offsets[index + 1]):
+            neighbor = targets[position]
+            new_time = time + costs[neighbor]
+            if new_time < times[neighbor]:
+                times[neighbor] = new_time
+                parents[neighbor] = index
+                if scale:
+                    y, x = divmod(neighbor, size)
+                    new_time += scale * (abs(x - target_x)
+                                         + abs(y - target_y))
+                heap.push(neighbor, new_time)
+    return TimeField(source, array('d', times), array('i', parents))
+
+
+def get_best_time(maze: AbstractMaze,
+                  source: Optional[int] = None,
+                  ) -> Optional[float]:
+    """
+    Возвращает наименьшее возможное время прохождения лабиринта.
+
+    Время от стандартной точки входа кэшируется для общего лабиринта
+    комнаты до invalidate_effects.
+
+    Args:
+        maze: AbstractMaze (лабиринт)
+        source: Optional[int] (индекс начальной клетки, по умолчанию
+        стандартная точка входа)
+
+    Returns:
+        float: время от начальной клетки до выхода.
+        None: выхода нет или он недостижим.
+    """
+    if source is None:
+        base = get_base_maze(maze)
+        try:
+            return _best_times[base]
+        except KeyError:
+            pass
+        entry_point = maze.get_standard_entry_point()
+        best_time = _best_times[base] = get_best_time(
+            maze, entry_point.x + entry_point.y * maze.maze_size)
+        return best_time
+    win_index = get_win_index(maze)
+    if win_index is None:
+        return None
+    time = find_fastest_paths(maze, source, win_index).time(win_index)
+    return None if time == INFINITE_TIME else time
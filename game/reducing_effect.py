@@ -1,5 +1,6 @@
-from base_reducing_effect import (BaseReducingImpactCompletionTimeEffect,
-                                  BaseObstaclesReducingTimeRemainingEffect)
+from game.base_reducing_effect import (
+    BaseReducingImpactCompletionTimeEffect,
+    BaseObstaclesReducingTimeRemainingEffect)
 
 
 class BucketOfColdWater(BaseObstaclesReducingTimeRemainingEffect):
@@ -9,6 +10,7 @@ class BucketOfColdWater(BaseObstaclesReducingTimeRemainingEffect):
 
     Ведро с водой.
     """
+    name = 'Ведро с водой'
     coefficient = 1.1
 
 
@@ -19,6 +21,7 @@ class BottleCocaCola(BaseObstaclesReducingTimeRemainingEffect):
 
     Бутылка колы.
     """
+    name = 'Бутылка колы'
     coefficient = 1.5
 
 
@@ -29,6 +32,7 @@ class FrequentRest(BaseObstaclesReducingTimeRemainingEffect):
 
     Частый отдых.
     """
+    name = 'Частый отдых'
     coefficient = 2
 
 
@@ -38,6 +42,7 @@ class EnergyDrink(BaseReducingImpactCompletionTimeEffect):
 
     Энергетик.
     """
+    name = 'Энергетик'
     coefficient = 1.1
 
 
@@ -47,6 +52,7 @@ class StaminaEnhancerPills(BaseReducingImpactCompletionTimeEffect):
 
     Таблетки для повышения выносливости.
     """
+    name = 'Таблетки для повышения выносливости'
     coefficient = 1.75
 
 
@@ -56,4 +62,5 @@ class ReducingBodyDensity(BaseReducingImpactCompletionTimeEffect):
 
     Уменьшение плотности тела.
     """
+    name = 'Уменьшение плотности тела'
     coefficient = 2.2
@@ -0,0 +1,372 @@
+"""
+Компактное двоичное представление лабиринтов для хранения.
+
+Формат лабиринта (все числа little-endian):
+1) Заголовок: сигнатура b'IFMZ', версия (1 байт), размер лабиринта (4
+   байта), индекс текущей клетки (4 байта).
+2) Стены: 4-битные маски клеток, по две клетки на байт (младшие 4 бита -
+   клетка с чётным индексом).
+3) Таблица эффектов: количество имён эффектов (1 байт), имена классов
+   эффектов (длина 1 байт + utf-8), количество записей (4 байта), записи
+   (индекс клетки 4 байта + номер имени 1 байт).
+
+Лабиринт 1000x1000 занимает около 500 КБ вместо сотен мегабайт объектов
+Cell. Лабиринт, сгенерированный по зерну, можно хранить ещё компактнее -
+одним зерном (game.maze_seed), а лабиринт в файле (game.maze_file) -
+ссылкой на файл, см. load_maze.
+"""
+import struct
+from array import array
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from game.abstract.abstract_effect import AbstractEffect
+from game.abstract.abstract_maze import AbstractMaze, BaseCell
+from game.compact_maze import CompactMaze
+from game.effects import FactoryEffects
+from game.inventory import Inventory, pack_inventory, unpack_inventory
+from game.maze import MazeGame
+from game.maze_file import (MAZE_SIGNATURE, MAZE_FORMAT_VERSION, MAZE_HEADER,
+                            PagedMaze, MappedMaze, open_maze_file)
+from game.maze_seed import MazeSeed, is_maze_seed, unpack_maze_seed
+from game.overlay_maze import MazeOverlay
+
+# Ссылка на лабиринт в файле (PagedMaze): сигнатура, версия, отображение в
+# память (1 байт, MappedMaze), индекс текущей клетки, длина пути (2 байта),
+# путь в utf-8, таблица эффектов.
+MAZE_FILE_SIGNATURE = b'IFMF'
+# Количество лабиринтов, сгенерированных по зерну, в кэше regenerate_maze.
+SEED_CACHE_SIZE = 64
+
+_FILE_HEADER = struct.Struct('<4sBBIH')
+_STATE_HEADER = struct.Struct('<III')
+_COUNT = struct.Struct('<I')
+_EFFECT_ENTRY = struct.Struct('<IB')
+
+
+def _pack_effects(entries: Iterable[tuple[int, AbstractEffect]]) -> bytes:
+    """
+    Упаковывает таблицу эффектов.
+
+    Args:
+        entries: Iterable[tuple[int, AbstractEffect]] (пары индекс клетки -
+        эффект)
+
+    Returns:
+        bytes: таблица эффектов.
+    """
+    names = {}
+    packed_entries = []
+    for index, effect in entries:
+        name = type(effect).__name__
+        number = names.setdefault(name, len(names))
+        packed_entries.append(_EFFECT_ENTRY.pack(index, number))
+    parts = [bytes([len(names)])]
+    for name in names:
+        encoded_name = name.encode()
+        parts.append(bytes([len(encoded_name)]))
+        parts.append(encoded_name)
+    parts.append(_COUNT.pack(len(packed_entries)))
+    parts.extend(packed_entries)
+    return b''.join(parts)
+
+
+def _unpack_effects(data: bytes, offset: int
+                    ) -> tuple[list[tuple[int, AbstractEffect]], int]:
+    """
+    Распаковывает таблицу эффектов.
+
+    Args:
+        data: bytes (данные)
+        offset: int (смещение начала таблицы)
+
+    Returns:
+        tuple: список пар индекс клетки - эффект и смещение конца таблицы.
+    """
+    names_count = data[offset]
+    offset += 1
+    effects = []
+    for _ in range(names_count):
+        length = data[offset]
+        name = data[offset + 1:offset + 1 + length].decode()
+        offset += 1 + length
+        effect = FactoryEffects.get_effect_by_name(name)
+        if effect is None:
+            raise ValueError(f'Неизвестный эффект: {name}')
+        effects.append(effect)
+    (count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    entries = [(index, effects[number]) for index, number in
+               _EFFECT_ENTRY.iter_unpack(
+                   data[offset:offset + count * _EFFECT_ENTRY.size])]
+    return entries, offset + count * _EFFECT_ENTRY.size
+
+
+def pack_walls(masks: bytes) -> bytes:
+    """
+    Упаковывает маски стен по две клетки в байт.
+
+    Args:
+        masks: bytes (маска стен на каждую клетку)
+
+    Returns:
+        bytes: упакованные маски.
+    """
+    even = masks[0::2]
+    odd = masks[1::2]
+    if len(odd) < len(even):
+        odd += b'\x00'
+    return bytes(low | high << 4 for low, high in zip(even, odd))
+
+
+def unpack_walls(packed: bytes, cells: int) -> bytearray:
+    """
+    Распаковывает маски стен.
+
+    Args:
+        packed: bytes (упакованные маски)
+        cells: int (количество клеток)
+
+    Returns:
+        bytearray: маска стен на каждую клетку.
+    """
+    masks = bytearray(len(packed) * 2)
+    masks[0::2] = bytes(value & 0x0F for value in packed)
+    masks[1::2] = bytes(value >> 4 for value in packed)
+    del masks[cells:]
+    return masks
+
+
+def pack_maze(maze: AbstractMaze) -> bytes:
+    """
+    Упаковывает сгенерированный лабиринт в байты.
+
+    Сохраняются стены, эффекты и текущая клетка. Флаги посещения игроком
+    не сохраняются, они хранятся в состоянии участника
+    (pack_participant_state).
+
+    Args:
+        maze: AbstractMaze (лабиринт)
+
+    Returns:
+        bytes: упакованный лабиринт.
+    """
+    if isinstance(maze, MazeOverlay):
+        maze = maze.base
+    if isinstance(maze, PagedMaze):
+        return _pack_maze_file_reference(maze)
+    if isinstance(maze, CompactMaze):
+        masks = bytes(maze._walls)
+        effects = [(index, effect)
+                   for index, cell_effects in sorted(maze._effects.items())
+                   for effect in cell_effects]
+    else:
+        cells = maze.maze
+        masks = bytes(cell.wall_mask for cell in cells)
+        effects = [(index, effect) for index, cell in enumerate(cells)
+                   for effect in cell.effects]
+    current_cell = maze.current_cell
+    header = MAZE_HEADER.pack(
+        MAZE_SIGNATURE, MAZE_FORMAT_VERSION, maze.maze_size,
+        current_cell.x + current_cell.y * maze.maze_size,
+    )
+    return header + pack_walls(masks) + _pack_effects(effects)
+
+
+def write_maze_file(path: str, maze: AbstractMaze) -> None:
+    """
+    Записывает лабиринт в файл лабиринта (game.maze_file).
+
+    Файл можно открыть без загрузки в память (open_maze_file) и
+    использовать в нескольких комнатах и процессах.
+
+    Args:
+        path: str (путь к файлу)
+        maze: AbstractMaze (сгенерированный лабиринт)
+    """
+    if isinstance(maze, MazeOverlay):
+        maze = maze.base
+    if isinstance(maze, PagedMaze):
+        raise ValueError('Лабиринт уже хранится в файле')
+    with open(path, 'wb') as file:
+        file.write(pack_maze(maze))
+
+
+def _pack_maze_file_reference(maze: PagedMaze) -> bytes:
+    """
+    Упаковывает лабиринт в файле как ссылку на файл.
+
+    Стены остаются в файле, сохраняются путь, текущая клетка и эффекты.
+    """
+    path = maze.path.encode()
+    effects = [(index, effect)
+               for index, cell_effects in sorted(maze._effects.items())
+               for effect in cell_effects]
+    header = _FILE_HEADER.pack(MAZE_FILE_SIGNATURE, MAZE_FORMAT_VERSION,
+                               isinstance(maze, MappedMaze),
+                               maze._current_index, len(path))
+    return header + path + _pack_effects(effects)
+
+
+def _unpack_maze_file_reference(data: bytes) -> PagedMaze:
+    signature, version, mapped, current_index, path_length = \
+        _FILE_HEADER.unpack_from(data)
+    if signature != MAZE_FILE_SIGNATURE or version != MAZE_FORMAT_VERSION:
+        raise ValueError('Данные не являются ссылкой на лабиринт')
+    offset = _FILE_HEADER.size
+    maze = open_maze_file(data[offset:offset + path_length].decode(),
+                          bool(mapped))
+    maze._current_index = current_index
+    # Эффекты из файла уже входят в сохранённую таблицу.
+    maze._effects = {}
+    entries, _ = _unpack_effects(data, offset + path_length)
+    for index, effect in entries:
+        maze._effects.setdefault(index, []).append(effect)
+    return maze
+
+
+def unpack_maze(data: bytes) -> CompactMaze:
+    """
+    Распаковывает лабиринт из байтов.
+
+    Лабиринт восстанавливается в компактном виде (CompactMaze), все его
+    клетки считаются посещёнными при генерации.
+
+    Args:
+        data: bytes (упакованный лабиринт)
+
+    Returns:
+        CompactMaze: восстановленный лабиринт.
+    """
+    signature, version, maze_size, current_index = \
+        MAZE_HEADER.unpack_from(data)
+    if signature != MAZE_SIGNATURE or version != MAZE_FORMAT_VERSION:
+        raise ValueError('Данные не являются лабиринтом')
+    cells = maze_size * maze_size
+    offset = MAZE_HEADER.size
+    walls_size = (cells + 1) // 2
+    maze = CompactMaze(maze_size)
+    maze.generate()
+    maze._walls = unpack_walls(data[offset:offset + walls_size], cells)
+    maze._visited = bytearray([0xFF]) * len(maze._visited)
+    maze._not_visited_count = 0
+    maze._current_index = current_index
+    entries, _ = _unpack_effects(data, offset + walls_size)
+    for index, effect in entries:
+        maze._effects.setdefault(index, []).append(effect)
+    return maze
+
+
+def pack_participant_state(maze: MazeOverlay,
+                           previous_cells: Iterable[BaseCell] = (),
+                           inventory: Optional[Inventory] = None,
+                           ) -> bytes:
+    """
+    Упаковывает личное состояние участника.
+
+    Сохраняются текущая клетка, посещённые клетки, использованные эффекты,
+    список предыдущих клеток и инвентарь (game.inventory).
+
+    Args:
+        maze: MazeOverlay (лабиринт участника)
+        previous_cells: Iterable[BaseCell] (предыдущие клетки участника)
+        inventory: Optional[Inventory] (инвентарь участника)
+
+    Returns:
+        bytes: упакованное состояние.
+    """
+    size = maze.maze_size
+    visited = array('I', sorted(maze._user_visited))
+    previous = array('I', [cell.x + cell.y * size for cell in previous_cells])
+    consumed = [(index, effect)
+                for index, effects in maze._consumed_effects.items()
+                for effect in effects]
+    header = _STATE_HEADER.pack(maze._current_index, len(visited),
+                                len(previous))
+    return (header + visited.tobytes() + previous.tobytes()
+            + _pack_effects(consumed)
+            + pack_inventory(inventory or Inventory()))
+
+
+def unpack_participant_state(data: bytes, base: AbstractMaze
+                             ) -> tuple[MazeOverlay, list[BaseCell],
+                                        Inventory]:
+    """
+    Распаковывает личное состояние участника поверх лабиринта комнаты.
+
+    Args:
+        data: bytes (упакованное состояние)
+        base: AbstractMaze (лабиринт комнаты)
+
+    Returns:
+        tuple: лабиринт участника, список предыдущих клеток и инвентарь
+        (пустой для состояний, сохранённых до появления инвентаря).
+    """
+    current_index, visited_count, previous_count = \
+        _STATE_HEADER.unpack_from(data)
+    offset = _STATE_HEADER.size
+    visited = array('I')
+    visited.frombytes(data[offset:offset + visited_count * visited.itemsize])
+    offset += visited_count * visited.itemsize
+    previous = array('I')
+    previous.frombytes(
+        data[offset:offset + previous_count * previous.itemsize])
+    offset += previous_count * previous.itemsize
+    consumed, offset = _unpack_effects(data, offset)
+    inventory, _ = unpack_inventory(data, offset)
+
+    maze = MazeOverlay(base)
+    maze._current_index = current_index
+    maze._user_visited = set(visited)
+    for index, effect in consumed:
+        maze._consumed_effects.setdefault(index, set()).add(effect)
+    cells = maze.maze
+    return maze, [cells[index] for index in previous], inventory
+
+
+@lru_cache(maxsize=SEED_CACHE_SIZE)
+def _generate_packed_maze(maze_seed: MazeSeed) -> bytes:
+    maze_game = MazeGame(maze_seed.maze_size, maze_class=CompactMaze,
+                         seed=maze_seed.seed,
+                         generator=maze_seed.generator)
+    maze_game.generate_maze()
+    if maze_seed.effects is not None:
+        maze_game.arrange_effects(maze_seed.effects, repeat=maze_seed.repeat,
+                                  win=maze_seed.win,
+                                  effect_weights=maze_seed.difficulty)
+    return pack_maze(maze_game.get_maze())
+
+
+def regenerate_maze(maze_seed: MazeSeed) -> CompactMaze:
+    """
+    Генерирует лабиринт по зерну.
+
+    Для часто используемых зёрен кэшируется упакованный лабиринт, поэтому
+    повторный вызов только распаковывает его, без генерации. Каждый вызов
+    возвращает новый объект лабиринта.
+
+    Args:
+        maze_seed: MazeSeed (зерно лабиринта)
+
+    Returns:
+        CompactMaze: сгенерированный лабиринт.
+    """
+    return unpack_maze(_generate_packed_maze(maze_seed))
+
+
+def load_maze(data: bytes) -> AbstractMaze:
+    """
+    Восстанавливает лабиринт из зерна (pack_maze_seed), из упакованной
+    сетки или из ссылки на файл лабиринта (pack_maze).
+
+    Args:
+        data: bytes (упакованный лабиринт или зерно)
+
+    Returns:
+        AbstractMaze: лабиринт.
+    """
+    if is_maze_seed(data):
+        return regenerate_maze(unpack_maze_seed(data))
+    if data[:len(MAZE_FILE_SIGNATURE)] == MAZE_FILE_SIGNATURE:
+        return _unpack_maze_file_reference(data)
+    return unpack_maze(data)
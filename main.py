@@ -1,9 +1,29 @@
+import asyncio
+
 import telebot
-from config import TOKEN
+from telebot.async_telebot import AsyncTeleBot
+
+from config import (TOKEN, GAME_UI_MODE, OUTBOUND_GLOBAL_RATE,
+                    OUTBOUND_CHAT_RATE, OUTBOUND_CHAT_BURST,
+                    ROOM_STORAGE_PATH, SHARDS, MAZE_SIZE, MAZE_EFFECTS,
+                    MAZE_POOL_CAPACITY, MAZE_GENERATOR, GAME_DURATION,
+                    GAME_CELL_PENALTY, START_INVENTORY, MAZE_DIFFICULTY,
+                    METRICS_PORT, METRICS_DUMP_PATH, METRICS_DUMP_INTERVAL)
 from database.rooms import RoomAggregator
-from game.abstract.abstract_maze import BaseCell
+from database.storage import SQLiteRoomStorage
 from game.effect_type import WinEffectType, \
     IncreasesEffectTypeCellCompletionTime, ReduceTimeRemainingEffectType
+from game.inventory import Inventory
+from game.maze import MazeGame
+from game.maze_pool import MazePool
+from runtime.dispatcher import OutboundDispatcher, PRIORITY_NOTIFICATION
+from runtime.game_clock import GameClock
+from runtime.keyboards import (get_keyboard_moves, get_inline_keyboard_moves,
+                               MOVE_CALLBACK_PREFIX)
+from runtime.message_store import MessageStore, MessageCleaner
+from runtime.metrics import Metrics, get_metrics_port
+from runtime.sharding import run_front
+from runtime.timers import TimerScheduler
 from message import (WELCOME_NEXT_1_TEXT, WELCOME_MESSAGE,
                      WELCOME_NEXT_RULE_TEXT, WELCOME_NEXT_RULE_2_TEXT,
                      WELCOME_START_GAME_TEXT, WELCOME_NEXT_RULE_3_TEXT,
@@ -16,12 +36,103 @@ from message import (WELCOME_NEXT_1_TEXT, WELCOME_MESSAGE,
                      LOGIN_ERROR_IN_ROOM_NUMBER_TEXT, BUTTON_BACK_TEXT,
                      IN_MENU_TEXT, BUTTON_START_GAME_TEXT, START_GAME_TEXT,
                      BUTTON_FORWARD, BUTTON_RIGHT, BUTTON_BACK, BUTTON_LEFT,
-                     CANT_MOVE_TEXT, ALREADY_EXISTED_TEXT, NEW_WAY_TEXT)
-
-bot = telebot.TeleBot(TOKEN)
+                     CANT_MOVE_TEXT, ALREADY_EXISTED_TEXT, NEW_WAY_TEXT,
+                     MOVE_NUMBER_TEXT, TIME_LEFT_TEXT, TIME_OVER_TEXT,
+                     GAME_FINISHED_TEXT, GAME_FINISHED_BEST_TEXT,
+                     ITEM_USED_TEXT)
+
+bot = AsyncTeleBot(TOKEN)
+
+# Метрики: задержки обработчиков и методов игры и комнат, метрики очередей.
+# Выключенные метрики стоят одну проверку флага на вызов.
+METRICS = Metrics(enabled=bool(METRICS_PORT or METRICS_DUMP_PATH))
+METRICS.instrument(MazeGame, ('generate_maze', 'arrange_effects', '_move',
+                              '_check_move'))
+METRICS.instrument(RoomAggregator, ('create_room', 'join_room_participant',
+                                    'leave_room_participant',
+                                    'get_room_by_participant',
+                                    'get_maze_by_participant_id',
+                                    'set_room_maze', 'save_participant'))
 
 ROOM_AGGREGATOR = RoomAggregator()
-messages = {}
+ROOM_STORAGE = None
+# Готовые лабиринты для начала игры, пополняются фоновым потоком.
+MAZE_POOL = MazePool(capacity=MAZE_POOL_CAPACITY, generator=MAZE_GENERATOR,
+                     effect_weights=MAZE_DIFFICULTY)
+MAZE_POOL.reserve(MAZE_SIZE, MAZE_EFFECTS)
+# Все исходящие сообщения проходят через очередь с лимитами Bot API.
+# Общий лимит действует на весь бот, поэтому при шардировании каждый
+# процесс-шард получает его долю.
+DISPATCHER = OutboundDispatcher(bot,
+                                global_rate=OUTBOUND_GLOBAL_RATE
+                                / max(SHARDS, 1),
+                                chat_rate=OUTBOUND_CHAT_RATE,
+                                chat_burst=OUTBOUND_CHAT_BURST)
+# Игровые часы: один планировщик таймеров на все комнаты завершает игры,
+# у которых закончилось время.
+TIMERS = TimerScheduler()
+GAME_CLOCK = GameClock(ROOM_AGGREGATOR, TIMERS,
+                       duration=GAME_DURATION,
+                       cell_seconds=GAME_CELL_PENALTY,
+                       on_expire=lambda chat_id: game_time_over(chat_id))
+# Игровые сообщения чатов, удаляемые на следующем ходу.
+MESSAGE_STORE = MessageStore()
+MESSAGE_CLEANER = MessageCleaner(DISPATCHER)
+METRICS.add_collector('dispatcher', DISPATCHER.stats)
+METRICS.add_collector('maze_pool', MAZE_POOL.stats)
+METRICS.add_collector('game', lambda: {
+    'active_timers': len(TIMERS),
+    'participants': len(ROOM_AGGREGATOR.get_participant_ids()),
+})
+# Режим edit: номер хода и сообщение со статусом игры для каждого чата.
+status_messages = {}
+# Обработчики следующего сообщения чата (замена
+# register_next_step_handler_by_chat_id синхронного TeleBot).
+next_step_handlers = {}
+# В режиме шардирования номер комнаты ждёт фронт-процесс
+# (runtime.sharding): сообщение с номером может уйти в другой шард, поэтому
+# шард не регистрирует этот шаг у себя.
+ROOM_NUMBER_STEP_ON_FRONT = False
+
+
+def setup_storage(path):
+    # Комнаты и игры переживают перезапуск бота.
+    global ROOM_STORAGE
+    if not path:
+        return
+    ROOM_STORAGE = SQLiteRoomStorage(path)
+    ROOM_AGGREGATOR.set_storage(ROOM_STORAGE)
+    ROOM_AGGREGATOR.load_rooms()
+
+
+def start_storage_flush():
+    # Изменения, не набравшие пачку, записываются не позже flush_interval
+    # секунд, даже если ходов больше нет.
+    if ROOM_STORAGE:
+        ROOM_STORAGE.start_flush()
+
+
+def close_storage():
+    if ROOM_STORAGE:
+        ROOM_STORAGE.close()
+
+
+def register_next_step_handler(chat_id, handler):
+    next_step_handlers[chat_id] = handler
+
+
+def register_room_number_step(chat_id):
+    if not ROOM_NUMBER_STEP_ON_FRONT:
+        register_next_step_handler(chat_id, join_to_room)
+
+
+@bot.message_handler(
+    func=lambda message: message.chat.id in next_step_handlers)
+async def next_step(message):
+    # Регистрируется первым, поэтому, как и в синхронном TeleBot, ожидаемый
+    # шаг обрабатывается раньше остальных обработчиков.
+    handler = next_step_handlers.pop(message.chat.id)
+    await handler(message)
 
 
 def get_keyboard_back():
@@ -32,7 +143,7 @@ def get_keyboard_back():
 
 
 @bot.message_handler(commands=['start'])
-def welcome(message):
+async def welcome(message):
     chat_id = message.chat.id
     keyboard = telebot.types.InlineKeyboardMarkup()
     button_welcome_next_1 = telebot.types.InlineKeyboardButton(
@@ -41,13 +152,13 @@ def welcome(message):
         'welcome_next_1'
     )
     keyboard.add(button_welcome_next_1)
-    bot.send_message(chat_id,
-                     WELCOME_MESSAGE,
-                     reply_markup=keyboard)
+    await DISPATCHER.send_message(chat_id,
+                                  WELCOME_MESSAGE,
+                                  reply_markup=keyboard)
 
 
 @bot.callback_query_handler(func=lambda call: call.data == 'welcome_next_1')
-def welcome_next_1(call):
+async def welcome_next_1(call):
     message = call.message
     chat_id = message.chat.id
     keyboard = telebot.types.InlineKeyboardMarkup()
@@ -57,12 +168,14 @@ def welcome_next_1(call):
         'welcome_next_rule'
     )
     keyboard.add(button_welcome_next_rules)
-    bot.edit_message_text(WELCOME_NEXT_1_TEXT, chat_id=chat_id,
-                          message_id=message.message_id, reply_markup=keyboard)
+    await DISPATCHER.edit_message_text(WELCOME_NEXT_1_TEXT,
+                                       chat_id=chat_id,
+                                       message_id=message.message_id,
+                                       reply_markup=keyboard)
 
 
 @bot.callback_query_handler(func=lambda call: call.data == 'welcome_next_rule')
-def welcome_next_rules(call):
+async def welcome_next_rules(call):
     message = call.message
     chat_id = message.chat.id
     keyboard = telebot.types.InlineKeyboardMarkup()
@@ -72,13 +185,15 @@ def welcome_next_rules(call):
         'welcome_next_rule_2'
     )
     keyboard.add(button_welcome_next_rules)
-    bot.edit_message_text(WELCOME_NEXT_RULE_TEXT, chat_id=chat_id,
-                          message_id=message.message_id, reply_markup=keyboard)
+    await DISPATCHER.edit_message_text(WELCOME_NEXT_RULE_TEXT,
+                                       chat_id=chat_id,
+                                       message_id=message.message_id,
+                                       reply_markup=keyboard)
 
 
 @bot.callback_query_handler(
     func=lambda call: call.data == 'welcome_next_rule_2')
-def welcome_next_rules(call):
+async def welcome_next_rules(call):
     message = call.message
     chat_id = message.chat.id
     keyboard = telebot.types.InlineKeyboardMarkup()
@@ -88,13 +203,15 @@ def welcome_next_rules(call):
         'welcome_next_rule_3'
     )
     keyboard.add(button_welcome_next_rules)
-    bot.edit_message_text(WELCOME_NEXT_RULE_2_TEXT, chat_id=chat_id,
-                          message_id=message.message_id, reply_markup=keyboard)
+    await DISPATCHER.edit_message_text(WELCOME_NEXT_RULE_2_TEXT,
+                                       chat_id=chat_id,
+                                       message_id=message.message_id,
+                                       reply_markup=keyboard)
 
 
 @bot.callback_query_handler(
     func=lambda call: call.data == 'welcome_next_rule_3')
-def welcome_next_rules(call):
+async def welcome_next_rules(call):
     message = call.message
     chat_id = message.chat.id
     keyboard = telebot.types.InlineKeyboardMarkup()
@@ -103,24 +220,27 @@ def welcome_next_rules(call):
         callback_data='welcome_start_game'
     )
     keyboard.add(button_welcome_next_rules)
-    bot.edit_message_text(WELCOME_NEXT_RULE_3_TEXT, chat_id=chat_id,
-                          message_id=message.message_id, reply_markup=keyboard)
+    await DISPATCHER.edit_message_text(WELCOME_NEXT_RULE_3_TEXT,
+                                       chat_id=chat_id,
+                                       message_id=message.message_id,
+                                       reply_markup=keyboard)
 
 
 @bot.callback_query_handler(
     func=lambda call: call.data == 'welcome_start_game')
-def welcome_start_game(call):
+async def welcome_start_game(call):
     message = call.message
     chat_id = message.chat.id
-    bot.edit_message_text(WELCOME_START_GAME_TEXT, chat_id=chat_id,
-                          message_id=message.message_id)
-    menu(message)
+    await DISPATCHER.edit_message_text(WELCOME_START_GAME_TEXT,
+                                       chat_id=chat_id,
+                                       message_id=message.message_id)
+    await menu(message)
 
 
-def menu(message):
+async def menu(message):
     keyboard = get_keyboard_in_menu()
-    bot.send_message(message.chat.id, CHOOSE_ACTION_TEXT,
-                     reply_markup=keyboard)
+    await DISPATCHER.send_message(message.chat.id, CHOOSE_ACTION_TEXT,
+                                  reply_markup=keyboard)
 
 
 def get_keyboard_in_menu():
@@ -134,10 +254,12 @@ def get_keyboard_in_menu():
 
 @bot.message_handler(
     func=lambda message: message.text == CREATE_ROOM_TEXT)
-def create_room(message):
+@METRICS.timed('create_room')
+async def create_room(message):
     chat_id = message.chat.id
     if ROOM_AGGREGATOR.get_room_by_participant(chat_id):
-        bot.send_message(message.chat.id, PARTICIPANT_ALREADY_IN_ROOM)
+        await DISPATCHER.send_message(message.chat.id,
+                                      PARTICIPANT_ALREADY_IN_ROOM)
         return
     room_number = ROOM_AGGREGATOR.create_room()
 
@@ -150,11 +272,13 @@ def create_room(message):
                                              chat_id,
                                              name,
                                              surname):
-        bot.send_message(chat_id,
-                         ROOM_SUCCESS_CREATE_TEXT.format(room_number),
-                         reply_markup=keyboard)
+        await DISPATCHER.send_message(
+            chat_id,
+            ROOM_SUCCESS_CREATE_TEXT.format(room_number),
+            reply_markup=keyboard,
+        )
     else:
-        bot.send_message(chat_id, ROOM_ERROR_CREATE_TEXT)
+        await DISPATCHER.send_message(chat_id, ROOM_ERROR_CREATE_TEXT)
 
 
 def get_keyboard_in_room():
@@ -168,42 +292,47 @@ def get_keyboard_in_room():
 
 @bot.message_handler(
     func=lambda message: message.text == LEAVE_ROOM_TEXT)
-def leave_room(message):
+@METRICS.timed('leave_room')
+async def leave_room(message):
     chat_id = message.chat.id
     room_number = ROOM_AGGREGATOR.get_room_by_participant(chat_id)
     keyboard = get_keyboard_in_menu()
     if not room_number:
-        bot.send_message(message.chat.id,
-                         PARTICIPANT_NOT_IN_ROOM,
-                         reply_markup=keyboard)
+        await DISPATCHER.send_message(message.chat.id,
+                                      PARTICIPANT_NOT_IN_ROOM,
+                                      reply_markup=keyboard)
         return
+    GAME_CLOCK.stop(chat_id)
     if ROOM_AGGREGATOR.leave_room_participant(room_number, chat_id):
-        bot.send_message(message.chat.id,
-                         ROOM_SUCCESS_LEAVE_TEXT,
-                         reply_markup=keyboard)
+        await DISPATCHER.send_message(message.chat.id,
+                                      ROOM_SUCCESS_LEAVE_TEXT,
+                                      reply_markup=keyboard)
     else:
-        bot.send_message(message.chat.id, ROOM_ERROR_LEAVE_TEXT)
+        await DISPATCHER.send_message(message.chat.id, ROOM_ERROR_LEAVE_TEXT)
 
 
 @bot.message_handler(
     func=lambda message: message.text == JOIN_TO_ROOM_TEXT)
-def join_to_room_text(message):
+async def join_to_room_text(message):
     chat_id = message.chat.id
     if ROOM_AGGREGATOR.get_room_by_participant(chat_id):
-        bot.send_message(message.chat.id, PARTICIPANT_ALREADY_IN_ROOM)
+        await DISPATCHER.send_message(message.chat.id,
+                                      PARTICIPANT_ALREADY_IN_ROOM)
         return
     keyboard = get_keyboard_back()
-    bot.send_message(chat_id, ENTER_ROOM_NUMBER_TEXT, reply_markup=keyboard)
-    bot.register_next_step_handler_by_chat_id(chat_id, join_to_room)
+    await DISPATCHER.send_message(chat_id, ENTER_ROOM_NUMBER_TEXT,
+                                  reply_markup=keyboard)
+    register_room_number_step(chat_id)
 
 
-def join_to_room(message):
+@METRICS.timed('join_to_room')
+async def join_to_room(message):
     chat_id = message.chat.id
     if message.text == BUTTON_BACK_TEXT:
         keyboard = get_keyboard_in_menu()
-        bot.send_message(message.chat.id,
-                         IN_MENU_TEXT,
-                         reply_markup=keyboard)
+        await DISPATCHER.send_message(message.chat.id,
+                                      IN_MENU_TEXT,
+                                      reply_markup=keyboard)
         return
     room_number = message.text
     name = message.chat.first_name
@@ -213,122 +342,273 @@ def join_to_room(message):
                                              name,
                                              surname):
         keyboard = get_keyboard_in_room()
-        bot.send_message(message.chat.id,
-                         LOGIN_SUCCESS_IN_ROOM_NUMBER_TEXT,
-                         reply_markup=keyboard)
+        if name != surname:
+            text = f'Новый участник комнаты: {name} {surname}'
+        else:
+            text = f'Новый участник комнаты: {name}'
         participants = ROOM_AGGREGATOR.get_participants(room_number)
-        for participant in participants:
-            if participant != chat_id:
-                if name != surname:
-                    bot.send_message(participant,
-                                     f'Новый участник комнаты: '
-                                     f'{name} '
-                                     f'{surname}')
-                else:
-                    bot.send_message(participant,
-                                     f'Новый участник комнаты: '
-                                     f'{name}')
+        # Ответ участнику и уведомления остальным уходят параллельно,
+        # уведомления - в менее приоритетной очереди.
+        await asyncio.gather(
+            DISPATCHER.send_message(message.chat.id,
+                                    LOGIN_SUCCESS_IN_ROOM_NUMBER_TEXT,
+                                    reply_markup=keyboard),
+            *(DISPATCHER.send_message(participant, text,
+                                      priority=PRIORITY_NOTIFICATION)
+              for participant in participants if participant != chat_id),
+        )
         return
     keyboard = get_keyboard_back()
-    bot.send_message(message.chat.id,
-                     LOGIN_ERROR_IN_ROOM_NUMBER_TEXT,
-                     reply_markup=keyboard)
-    bot.register_next_step_handler_by_chat_id(chat_id, join_to_room)
+    await DISPATCHER.send_message(message.chat.id,
+                                  LOGIN_ERROR_IN_ROOM_NUMBER_TEXT,
+                                  reply_markup=keyboard)
+    register_room_number_step(chat_id)
 
 
 @bot.message_handler(
     func=lambda message: message.text == BUTTON_START_GAME_TEXT)
-def start_game(message):
+@METRICS.timed('start_game')
+async def start_game(message):
     chat_id = message.chat.id
-    messages[chat_id] = []
-    maze = ROOM_AGGREGATOR.get_maze_by_participant_id(chat_id)
-    maze.generate_maze()
-    maze.arrange_effects(15)
-    bot.send_message(chat_id, START_GAME_TEXT)
-    game(message)
+    room_number = ROOM_AGGREGATOR.get_room_by_participant(chat_id)
+    if not room_number:
+        await DISPATCHER.send_message(chat_id, PARTICIPANT_NOT_IN_ROOM)
+        return
+    MESSAGE_STORE.reset(chat_id)
+    room = ROOM_AGGREGATOR.get_room(room_number)
+    if room.is_game_running(except_participant_id=chat_id):
+        # У других участников уже идёт игра: их лабиринты не трогаем,
+        # участник начинает заново в текущем лабиринте комнаты.
+        ROOM_AGGREGATOR.reset_participant_maze(chat_id)
+    else:
+        # Готовый лабиринт берётся из пула. При промахе генерация занимает
+        # процессор, поэтому выполняется в отдельном потоке и не
+        # задерживает обработку сообщений других чатов.
+        maze = MAZE_POOL.pop(MAZE_SIZE, MAZE_EFFECTS)
+        if maze is None:
+            maze = await asyncio.to_thread(MAZE_POOL.generate, MAZE_SIZE,
+                                           MAZE_EFFECTS)
+        ROOM_AGGREGATOR.set_room_maze(room_number, maze)
+    ROOM_AGGREGATOR.set_inventory_participant(
+        chat_id, Inventory.from_names(START_INVENTORY))
+    GAME_CLOCK.start(chat_id)
+    ROOM_AGGREGATOR.save_participant(chat_id)
+    if GAME_UI_MODE == 'edit':
+        await start_game_status(chat_id)
+        return
+    await DISPATCHER.send_message(chat_id, START_GAME_TEXT)
+    await game(message)
 
 
-def game(message):
+@METRICS.timed('game')
+async def game(message):
     chat_id = message.chat.id
-    messages[chat_id].append(message)
     maze = ROOM_AGGREGATOR.get_maze_by_participant_id(chat_id)
     maze = maze.get_maze()
     text = message.text
 
-    for i in range(len(messages[chat_id])):
-        msg = messages[chat_id][0]
-        bot.delete_message(msg.chat.id, msg.message_id)
-        messages[chat_id].remove(msg)
+    # Сообщения прошлого хода (включая ход игрока) удаляются после ответа.
+    stale_messages = MESSAGE_STORE.pop_all(chat_id)
+    stale_messages.append(message.message_id)
 
     if text in (BUTTON_FORWARD, BUTTON_RIGHT, BUTTON_BACK,
                 BUTTON_LEFT):
-        cell = _make_move(message)
+        cell, effects, items = _make_move(chat_id, text)
         if not cell:
-            send_message(chat_id, CANT_MOVE_TEXT.format(text.lower()))
+            await send_message(chat_id, CANT_MOVE_TEXT.format(text.lower()))
         else:
-            _cell_effect(chat_id, cell)
-    keyboard = telebot.types.ReplyKeyboardMarkup(resize_keyboard=True)
-    if not maze.current_cell.walls['top']:
-        button_forward = telebot.types.KeyboardButton(text=BUTTON_FORWARD)
-        keyboard.add(button_forward)
-
-    buttons_left_right = []
-    if not maze.current_cell.walls['left']:
-        buttons_left_right.append(
-            telebot.types.KeyboardButton(text=BUTTON_LEFT))
-
-    if not maze.current_cell.walls['right']:
-        buttons_left_right.append(
-            telebot.types.KeyboardButton(text=BUTTON_RIGHT))
+            await _cell_effect(chat_id, effects, items)
+    if chat_id not in TIMERS:
+        # Лабиринт пройден, часы остановлены: больше ходов не ждём.
+        await DISPATCHER.send_message(chat_id, _game_finished_text(chat_id),
+                                      reply_markup=get_keyboard_in_room())
+        MESSAGE_CLEANER.schedule(chat_id, stale_messages)
+        return
+    keyboard = get_keyboard_moves(maze.current_cell)
 
-    if buttons_left_right:
-        keyboard.add(*buttons_left_right)
+    if maze.current_cell.user_visited:
+        text = ALREADY_EXISTED_TEXT
+    else:
+        text = NEW_WAY_TEXT
+    text += '\n' + _time_left_text(chat_id)
+    await send_message(chat_id, text, reply_markup=keyboard)
+    register_next_step_handler(chat_id, game)
+    MESSAGE_CLEANER.schedule(chat_id, stale_messages)
+
+
+async def start_game_status(chat_id):
+    # Режим edit: сообщение со статусом игры отправляется один раз и дальше
+    # только редактируется.
+    maze = ROOM_AGGREGATOR.get_maze_by_participant_id(chat_id).get_maze()
+    status_message = await DISPATCHER.send_message(
+        chat_id,
+        START_GAME_TEXT,
+        reply_markup=get_inline_keyboard_moves(maze.current_cell),
+    )
+    status_messages[chat_id] = [status_message.message_id, 0]
 
-    if not maze.current_cell.walls['bottom']:
-        button_back = telebot.types.KeyboardButton(text=BUTTON_BACK)
-        keyboard.add(button_back)
 
+@bot.callback_query_handler(
+    func=lambda call: call.data.startswith(MOVE_CALLBACK_PREFIX))
+async def game_status(call):
+    # Ход в режиме edit стоит один вызов editMessageText. Нажатие кнопки не
+    # подтверждается через answerCallbackQuery, чтобы не тратить второй
+    # запрос к Bot API.
+    chat_id = call.message.chat.id
+    status = status_messages.get(chat_id)
+    if not status or not ROOM_AGGREGATOR.get_room_by_participant(chat_id):
+        return
+    maze = ROOM_AGGREGATOR.get_maze_by_participant_id(chat_id).get_maze()
+    way = call.data[len(MOVE_CALLBACK_PREFIX):]
+    # Номер хода делает текст уникальным, иначе Telegram отклоняет
+    # редактирование без изменений.
+    status[1] += 1
+    lines = [MOVE_NUMBER_TEXT.format(status[1])]
+    cell, effects, items = _make_move(chat_id, way)
+    if not cell:
+        lines.append(CANT_MOVE_TEXT.format(way.lower()))
+    else:
+        lines.extend(_cell_effect_texts(effects, items))
+    if chat_id not in TIMERS:
+        # Лабиринт пройден: статус больше не редактируется.
+        del status_messages[chat_id]
+        lines.append(_game_finished_text(chat_id))
+        await DISPATCHER.edit_message_text('\n'.join(lines),
+                                           chat_id=chat_id,
+                                           message_id=status[0],
+                                           coalesce_key=('status', chat_id))
+        return
     if maze.current_cell.user_visited:
-        send_message(chat_id, ALREADY_EXISTED_TEXT, reply_markup=keyboard)
+        lines.append(ALREADY_EXISTED_TEXT)
     else:
-        send_message(chat_id, NEW_WAY_TEXT, reply_markup=keyboard)
-    bot.register_next_step_handler_by_chat_id(chat_id, game)
+        lines.append(NEW_WAY_TEXT)
+    lines.append(_time_left_text(chat_id))
+    await DISPATCHER.edit_message_text(
+        '\n'.join(lines),
+        chat_id=chat_id,
+        message_id=status[0],
+        reply_markup=get_inline_keyboard_moves(maze.current_cell),
+        # Если предыдущее редактирование ещё не отправлено, оно заменяется
+        # этим: важен только последний статус.
+        coalesce_key=('status', chat_id),
+    )
 
 
-def _make_move(message):
-    chat_id = message.chat.id
-    way = message.text
+def _make_move(chat_id, way):
+    # Возвращает клетку хода (False - хода не было), эффекты клетки и
+    # предметы инвентаря, израсходованные против них.
     maze = ROOM_AGGREGATOR.get_maze_by_participant_id(chat_id)
     if way not in (BUTTON_FORWARD, BUTTON_RIGHT, BUTTON_BACK, BUTTON_LEFT):
-        return False
+        return False, [], []
     if way == BUTTON_FORWARD:
-        return maze.move_forward()
-    if way == BUTTON_RIGHT:
-        return maze.move_right()
-    if way == BUTTON_BACK:
-        return maze.move_bottom()
-    if way == BUTTON_LEFT:
-        return maze.move_left()
+        cell = maze.move_forward()
+    elif way == BUTTON_RIGHT:
+        cell = maze.move_right()
+    elif way == BUTTON_BACK:
+        cell = maze.move_bottom()
+    else:
+        cell = maze.move_left()
+    effects = []
+    items = []
+    if cell:
+        # Эффекты действуют при первом входе в клетку: часы отмечают их
+        # использованными, поэтому список берётся до хода.
+        effects = list(cell.effects)
+        # Время прохождения клетки и эффекты переносят срок окончания игры.
+        items = GAME_CLOCK.move(chat_id, cell) or []
+        # Хранилище копит ходы и записывает их пачками.
+        ROOM_AGGREGATOR.save_participant(chat_id)
+    return cell, effects, items
+
+
+def _time_left_text(chat_id):
+    return TIME_LEFT_TEXT.format(GAME_CLOCK.get_remaining(chat_id) or 0)
+
+
+def _game_finished_text(chat_id):
+    # Игровое время сравнивается с лучшим возможным временем прохождения
+    # лабиринта комнаты (оно считается один раз на лабиринт).
+    game_time = ROOM_AGGREGATOR.get_game_time_participant(chat_id) or 0
+    maze = ROOM_AGGREGATOR.get_maze_by_participant_id(chat_id)
+    best_time = maze.get_best_game_time() if maze else None
+    if best_time is None:
+        return GAME_FINISHED_TEXT.format(game_time)
+    return GAME_FINISHED_BEST_TEXT.format(game_time, best_time)
+
+
+async def game_time_over(chat_id):
+    # Вызывается планировщиком таймеров, когда у участника закончилось
+    # время: ходы больше не принимаются.
+    if next_step_handlers.get(chat_id) is game:
+        del next_step_handlers[chat_id]
+    status = status_messages.pop(chat_id, None)
+    if status:
+        await DISPATCHER.edit_message_text(TIME_OVER_TEXT,
+                                           chat_id=chat_id,
+                                           message_id=status[0],
+                                           coalesce_key=('status', chat_id))
+        return
+    await DISPATCHER.send_message(chat_id, TIME_OVER_TEXT,
+                                  reply_markup=get_keyboard_in_room())
 
 
-def _cell_effect(chat_id: int, cell: BaseCell):
-    for effect in cell.effects:
+def _cell_effect_texts(effects, items=()):
+    texts = []
+    for effect in effects:
         if effect.effect_type == WinEffectType:
-            send_message(chat_id, 'Лабиринт закончен, вы победили!')
+            texts.append('Лабиринт закончен, вы победили!')
         elif effect.effect_type == IncreasesEffectTypeCellCompletionTime:
-            send_message(chat_id, 'Время прохождения клетки увеличено!')
+            texts.append('Время прохождения клетки увеличено!')
         elif effect.effect_type == ReduceTimeRemainingEffectType:
-            send_message(chat_id, 'Оставшееся время уменьшено!')
+            texts.append('Оставшееся время уменьшено!')
+    for item in items:
+        texts.append(ITEM_USED_TEXT.format(item.name))
+    return texts
+
+
+async def _cell_effect(chat_id: int, effects, items=()):
+    for text in _cell_effect_texts(effects, items):
+        await send_message(chat_id, text)
 
 
-def send_message(chat_id, text, reply_markup=None):
+async def send_message(chat_id, text, reply_markup=None):
     if reply_markup:
-        message = bot.send_message(chat_id, text, reply_markup=reply_markup)
+        message = await DISPATCHER.send_message(chat_id, text,
+                                                reply_markup=reply_markup)
     else:
-        message = bot.send_message(chat_id, text)
-    messages[chat_id].append(message)
+        message = await DISPATCHER.send_message(chat_id, text)
+    MESSAGE_STORE.add(chat_id, message.message_id)
+
+
+async def run_bot():
+    # Таймеры игр, шедших до перезапуска, ставятся уже в цикле событий.
+    GAME_CLOCK.restore()
+    start_storage_flush()
+    await start_metrics()
+    await bot.infinity_polling()
+
+
+async def start_metrics(shard=None):
+    # Сервер и сброс метрик работают в цикле событий бота. У шардов свои
+    # порт и файл (runtime.metrics.get_metrics_port).
+    if METRICS_PORT:
+        await METRICS.serve(port=get_metrics_port(METRICS_PORT, shard))
+    if METRICS_DUMP_PATH:
+        path = METRICS_DUMP_PATH
+        if shard is not None:
+            path = f'{path}.shard{shard}'
+        METRICS.start_dump(path, METRICS_DUMP_INTERVAL)
 
 
 if __name__ == '__main__':
     print('Бот запущен!')
-    bot.infinity_polling()
+    if SHARDS > 1:
+        # Фронт-процесс принимает обновления и раздаёт их процессам-шардам.
+        run_front(SHARDS)
+    else:
+        setup_storage(ROOM_STORAGE_PATH)
+        MAZE_POOL.start()
+        try:
+            asyncio.run(run_bot())
+        finally:
+            close_storage()
@@ -75,3 +75,10 @@ BUTTON_LEFT = 'Налево'
 CANT_MOVE_TEXT = '⚠️ Вы не можете двигаться {}!'
 ALREADY_EXISTED_TEXT = '🤔 Кажется я тут уже был...'
 NEW_WAY_TEXT = 'Новый ход...'
+MOVE_NUMBER_TEXT = 'Ход {}'
+TIME_LEFT_TEXT = '⏳ Осталось времени: {:.0f} сек.'
+TIME_OVER_TEXT = '⌛ Время вышло, лабиринт не пройден!'
+GAME_FINISHED_TEXT = '🏁 Игра окончена, игровое время: {:.1f}'
+GAME_FINISHED_BEST_TEXT = ('🏁 Игра окончена, игровое время: {:.1f} '
+                           '(лучшее возможное: {:.1f})')
+ITEM_USED_TEXT = '🎒 Использован предмет: {}'
@@ -0,0 +1,411 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Callable, Hashable, Optional, Union
+
+from telebot.asyncio_helper import ApiTelegramException
+
+# Очереди (приоритеты) исходящих запросов: чем меньше число, тем раньше
+# отправляется запрос.
+PRIORITY_GAME = 0  # ответы на действия игрока (ходы, меню)
+PRIORITY_NOTIFICATION = 1  # уведомления других участников
+PRIORITY_CLEANUP = 2  # удаление устаревших сообщений
+
+# Количество последних замеров задержки отправки для перцентилей.
+LATENCY_WINDOW = 1024
+# Через сколько отправок удалять простаивающие лимиты чатов.
+PRUNE_INTERVAL = 1024
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты запросов (token bucket).
+
+    Fields:
+        rate: float (пополнение токенов в секунду)
+        capacity: float (максимальное количество токенов, размер всплеска)
+        tokens: float (доступные токены)
+        updated_at: float (время последнего пересчёта токенов)
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated_at:
+            self.tokens = min(self.capacity,
+                              self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def consume(self, now: float) -> float:
+        """
+        Забирает токен, если он есть.
+
+        Args:
+            now: float (текущее время time.monotonic)
+
+        Returns:
+            float: 0, если токен получен, иначе время ожидания следующего
+            токена в секундах.
+        """
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def pause(self, now: float, seconds: float) -> None:
+        """
+        Запрещает отправку на указанное время (ответ 429 retry_after).
+        """
+        self._refill(now)
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class OutboundRequest:
+    """
+    Исходящий запрос к Bot API, ожидающий отправки.
+
+    Fields:
+        chat_id: Union[int, str] (чат получателя)
+        priority: int (очередь запроса)
+        call: Callable (функция, создающая корутину запроса)
+        coalesce_key: Optional[Hashable] (ключ схлопывания)
+        futures: list (ожидающие результат запроса)
+        created_at: float (время постановки в очередь)
+        cancelled: bool (запрос заменён более новым)
+    """
+    __slots__ = ('chat_id', 'priority', 'seq', 'call', 'coalesce_key',
+                 'futures', 'created_at', 'cancelled')
+
+    def __init__(self, chat_id, priority, seq, call, coalesce_key, future):
+        self.chat_id = chat_id
+        self.priority = priority
+        self.seq = seq
+        self.call = call
+        self.coalesce_key = coalesce_key
+        self.futures = [future]
+        self.created_at = time.monotonic()
+        self.cancelled = False
+
+
+class OutboundDispatcher:
+    """
+    Единая точка отправки запросов в Bot API.
+
+    1) Ограничивает частоту отправки общим лимитом и лимитом на чат
+       (token bucket), поэтому всплески не приводят к ответам 429.
+    2) Отправляет запросы по приоритетам: ходы игры раньше уведомлений.
+    3) Схлопывает избыточные запросы: если в очереди уже есть запрос с тем
+       же coalesce_key, он заменяется новым (например, несколько
+       редактирований одного сообщения со статусом игры).
+    4) Повторяет запросы, получившие 429, после retry_after.
+    5) Собирает метрики: глубина очередей и задержка отправки.
+
+    Fields:
+        bot: AsyncTeleBot (бот)
+        global_rate: float (общий лимит запросов в секунду, 0 - без лимита)
+        chat_rate: float (лимит запросов в секунду на чат, 0 - без лимита)
+        chat_burst: float (допустимый всплеск запросов в чат)
+    """
+
+    def __init__(self, bot,
+                 global_rate: float = 30,
+                 chat_rate: float = 1,
+                 chat_burst: float = 4):
+        self.bot = bot
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self._global_bucket = (TokenBucket(global_rate, global_rate)
+                               if global_rate else None)
+        self._chat_buckets = {}
+        # Готовые к отправке запросы: (приоритет, порядковый номер, запрос).
+        self._ready = []
+        # Ожидающие лимита чата: (время готовности, номер, запрос).
+        self._delayed = []
+        self._pending_by_key = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self._in_flight = set()
+        # Метрики
+        self.sent = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.retried = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def submit(self, chat_id: Union[int, str], call: Callable,
+               priority: int = PRIORITY_GAME,
+               coalesce_key: Optional[Hashable] = None,
+               ) -> asyncio.Future:
+        """
+        Ставит запрос в очередь.
+
+        Args:
+            chat_id: Union[int, str] (чат получателя)
+            call: Callable (функция без аргументов, возвращающая корутину
+            запроса к Bot API)
+            priority: int (PRIORITY_GAME, PRIORITY_NOTIFICATION или
+            PRIORITY_CLEANUP)
+            coalesce_key: Optional[Hashable] (ключ схлопывания: новый запрос
+            заменяет ещё не отправленный запрос с тем же ключом)
+
+        Returns:
+            asyncio.Future: результат запроса.
+        """
+        future = asyncio.get_running_loop().create_future()
+        request = OutboundRequest(chat_id, priority, next(self._seq), call,
+                                  coalesce_key, future)
+        if coalesce_key is not None:
+            previous = self._pending_by_key.get(coalesce_key)
+            if previous is not None:
+                # Ожидающие старого запроса получат результат нового.
+                previous.cancelled = True
+                request.futures = previous.futures + request.futures
+                self.coalesced += 1
+            self._pending_by_key[coalesce_key] = request
+        heapq.heappush(self._ready, (priority, request.seq, request))
+        self._ensure_worker()
+        self._wakeup.set()
+        return future
+
+    async def send_message(self, chat_id: Union[int, str], text: str,
+                           priority: int = PRIORITY_GAME,
+                           coalesce_key: Optional[Hashable] = None,
+                           **kwargs):
+        """
+        Отправляет сообщение через очередь (аналог bot.send_message).
+        """
+        return await self.submit(
+            chat_id,
+            lambda: self.bot.send_message(chat_id, text, **kwargs),
+            priority=priority,
+            coalesce_key=coalesce_key,
+        )
+
+    async def edit_message_text(self, text: str,
+                                chat_id: Union[int, str],
+                                message_id: int,
+                                priority: int = PRIORITY_GAME,
+                                coalesce_key: Optional[Hashable] = None,
+                                **kwargs):
+        """
+        Редактирует сообщение через очередь (аналог bot.edit_message_text).
+        """
+        return await self.submit(
+            chat_id,
+            lambda: self.bot.edit_message_text(text, chat_id=chat_id,
+                                               message_id=message_id,
+                                               **kwargs),
+            priority=priority,
+            coalesce_key=coalesce_key,
+        )
+
+    async def delete_messages(self, chat_id: Union[int, str],
+                              message_ids: list[int],
+                              priority: int = PRIORITY_CLEANUP):
+        """
+        Удаляет сообщения через очередь (аналог bot.delete_messages).
+        """
+        return await self.submit(
+            chat_id,
+            lambda: self.bot.delete_messages(chat_id, message_ids),
+            priority=priority,
+        )
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    def _get_chat_bucket(self, chat_id) -> Optional[TokenBucket]:
+        if not self.chat_rate:
+            return None
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _promote_delayed(self, now: float) -> None:
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, request = heapq.heappop(self._delayed)
+            heapq.heappush(self._ready,
+                           (request.priority, request.seq, request))
+
+    async def _wait(self, timeout: Optional[float]) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._promote_delayed(now)
+            if not self._ready:
+                if not self._delayed:
+                    # Очередь пуста: воркер завершается и будет запущен
+                    # заново при следующем запросе.
+                    self._worker = None
+                    return
+                timeout = (self._delayed[0][0] - now
+                           if self._delayed else None)
+                await self._wait(timeout)
+                continue
+
+            _, _, request = heapq.heappop(self._ready)
+            if request.cancelled:
+                continue
+
+            chat_bucket = self._get_chat_bucket(request.chat_id)
+            wait = chat_bucket.consume(now) if chat_bucket else 0
+            if wait:
+                heapq.heappush(self._delayed,
+                               (now + wait, request.seq, request))
+                continue
+
+            if self._global_bucket:
+                wait = self._global_bucket.consume(now)
+                if wait:
+                    # Возвращаем токен чата и ждём общий лимит.
+                    if chat_bucket:
+                        chat_bucket.tokens += 1
+                    heapq.heappush(self._ready,
+                                   (request.priority, request.seq, request))
+                    await asyncio.sleep(wait)
+                    continue
+
+            if self._pending_by_key.get(request.coalesce_key) is request:
+                del self._pending_by_key[request.coalesce_key]
+            task = asyncio.create_task(self._send(request))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, request: OutboundRequest) -> None:
+        try:
+            result = await request.call()
+        except ApiTelegramException as error:
+            retry_after = self._get_retry_after(error)
+            if retry_after is None:
+                self._finish(request, error=error)
+                return
+            # Telegram попросил подождать: притормаживаем чат и весь поток.
+            now = time.monotonic()
+            self.retried += 1
+            chat_bucket = self._get_chat_bucket(request.chat_id)
+            if chat_bucket:
+                chat_bucket.pause(now, retry_after)
+            if self._global_bucket:
+                self._global_bucket.pause(now, retry_after)
+            heapq.heappush(self._delayed,
+                           (now + retry_after, request.seq, request))
+            self._wakeup.set()
+            self._ensure_worker()
+            return
+        except Exception as error:
+            self._finish(request, error=error)
+            return
+        self._finish(request, result=result)
+
+    @staticmethod
+    def _get_retry_after(error: ApiTelegramException) -> Optional[float]:
+        if error.error_code != 429:
+            return None
+        parameters = (error.result_json or {}).get('parameters') or {}
+        return float(parameters.get('retry_after', 1))
+
+    def _finish(self, request: OutboundRequest, result=None,
+                error: Optional[Exception] = None) -> None:
+        latency = time.monotonic() - request.created_at
+        self._latencies.append(latency)
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        if error is None:
+            self.sent += 1
+        else:
+            self.failed += 1
+        for future in request.futures:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+        if (self.sent + self.failed) % PRUNE_INTERVAL == 0:
+            self._prune_chat_buckets()
+
+    def _prune_chat_buckets(self) -> None:
+        # Заполненный лимит чата ничем не отличается от нового, его можно
+        # удалить и не держать в памяти для неактивных чатов.
+        now = time.monotonic()
+        for chat_id in [chat_id for chat_id, bucket in
+                        self._chat_buckets.items() if bucket.is_full(now)]:
+            del self._chat_buckets[chat_id]
+
+    async def drain(self) -> None:
+        """
+        Дожидается отправки всех запросов из очереди.
+        """
+        while self._worker is not None or self._in_flight:
+            tasks = [*self._in_flight]
+            if self._worker is not None:
+                tasks.append(self._worker)
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def queue_depth(self) -> dict:
+        """
+        Возвращает количество ожидающих запросов по очередям.
+        """
+        depth = {PRIORITY_GAME: 0, PRIORITY_NOTIFICATION: 0,
+                 PRIORITY_CLEANUP: 0}
+        for queue in (self._ready, self._delayed):
+            for _, _, request in queue:
+                if not request.cancelled:
+                    depth[request.priority] = depth.get(
+                        request.priority, 0) + 1
+        return depth
+
+    def stats(self) -> dict:
+        """
+        Возвращает метрики отправки.
+
+        Returns:
+            dict: глубина очередей, количество отправленных, схлопнутых,
+            повторённых и неудачных запросов, задержка отправки (от
+            постановки в очередь до ответа) в секундах.
+        """
+        latencies = sorted(self._latencies)
+
+        def percentile(value: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1,
+                                 int(len(latencies) * value))]
+
+        finished = self.sent + self.failed
+        return {
+            'queue_depth': self.queue_depth(),
+            'in_flight': len(self._in_flight),
+            'sent': self.sent,
+            'failed': self.failed,
+            'coalesced': self.coalesced,
+            'retried': self.retried,
+            'latency_avg': self.latency_total / finished if finished else 0.0,
+            'latency_p50': percentile(0.5),
+            'latency_p95': percentile(0.95),
+            'latency_max': self.latency_max,
+        }
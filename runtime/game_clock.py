@@ -0,0 +1,242 @@
+from typing import Callable, Optional, Union
+
+from database.abstract.abstract_room import AbstractRoomAggregator
+from game.abstract.abstract_maze import BaseCell
+from game.effect_type import (IncreasesEffectTypeCellCompletionTime,
+                              ReduceTimeRemainingEffectType, WinEffectType)
+from game.inventory import Inventory
+from game.overlay_maze import MazeOverlay
+from game.pathfinding import CELL_TIME
+from runtime.timers import TimerScheduler
+
+
+def get_move_cost(cell: BaseCell, inventory: Optional[Inventory] = None
+                  ) -> tuple[float, float, list]:
+    """
+    Возвращает стоимость входа в клетку.
+
+    Если передан инвентарь, против каждого эффекта клетки расходуется
+    подходящий предмет (Inventory.apply).
+
+    Args:
+        cell: BaseCell (клетка, в которую перешёл участник)
+        inventory: Optional[Inventory] (инвентарь участника)
+
+    Returns:
+        tuple[float, float, list]: время прохождения клетки (CELL_TIME,
+        умноженное на коэффициенты эффектов холода, топи и острых камней),
+        делитель оставшегося времени (произведение коэффициентов эффектов
+        жары, 1 - без изменений) и использованные предметы.
+    """
+    cell_time = CELL_TIME
+    divisor = 1.0
+    used_items = []
+    for effect in cell.effects:
+        if effect.effect_type is WinEffectType:
+            continue
+        if inventory:
+            coefficient, item = inventory.apply(effect)
+            if item is not None:
+                used_items.append(item)
+        else:
+            coefficient = effect.coefficient
+        if effect.effect_type is IncreasesEffectTypeCellCompletionTime:
+            cell_time *= coefficient
+        elif effect.effect_type is ReduceTimeRemainingEffectType:
+            divisor *= coefficient
+    return cell_time, divisor, used_items
+
+
+class GameClock:
+    """
+    Игровые часы участников.
+
+    Хранит время игры в данных участника комнаты:
+    1) start_time - время начала игры.
+    2) end_time - время, когда у участника закончится время. Пока игра идёт,
+       не None; после победы, окончания времени или выхода сбрасывается в
+       None.
+    3) game_time - игровое время: сумма времени прохождения клеток (в тех
+       же единицах, что и MazeGame.get_best_game_time).
+
+    На каждом ходу:
+    1) Против эффектов клетки расходуются предметы инвентаря участника
+       (game.inventory).
+    2) К игровому времени прибавляется время прохождения клетки.
+    3) Замедление сверх CELL_TIME отнимает у участника cell_seconds
+       секунд реального времени на единицу игрового времени.
+    4) Жара делит оставшееся реальное время на свой коэффициент.
+    5) Эффекты клетки отмечаются использованными в лабиринте участника
+       (MazeOverlay.consume_effect): они действуют только при первом
+       входе в клетку.
+
+    Окончание времени всех участников обслуживает один общий планировщик
+    (TimerScheduler): ход участника только переносит его таймер.
+
+    Fields:
+        aggregator: AbstractRoomAggregator (комнаты и участники)
+        scheduler: TimerScheduler (планировщик таймеров)
+        duration: float (время на прохождение лабиринта в секундах)
+        cell_seconds: float (секунды, которые отнимает единица замедления)
+        on_expire: Optional[Callable] (вызывается с идентификатором
+            участника, когда у него закончилось время; может вернуть
+            корутину)
+    """
+
+    def __init__(self,
+                 aggregator: AbstractRoomAggregator,
+                 scheduler: TimerScheduler,
+                 duration: float,
+                 cell_seconds: float = 0,
+                 on_expire: Optional[Callable] = None,
+                 ):
+        self.aggregator = aggregator
+        self.scheduler = scheduler
+        self.duration = duration
+        self.cell_seconds = cell_seconds
+        self.on_expire = on_expire
+
+    def start(self, participant_id: Union[int, str],
+              now: Optional[float] = None) -> bool:
+        """
+        Запускает часы участника.
+
+        Args:
+            participant_id: Union[int, str] (номер участника)
+            now: Optional[float] (текущее время, по умолчанию время
+            планировщика)
+
+        Returns:
+            bool:
+                True - часы запущены
+                False - участник не состоит в комнате
+        """
+        if now is None:
+            now = self.scheduler.clock()
+        aggregator = self.aggregator
+        if not aggregator.set_start_time_participant(participant_id, now):
+            return False
+        aggregator.set_end_time_participant(participant_id,
+                                            now + self.duration)
+        aggregator.set_game_time_participant(participant_id, 0.0)
+        self._schedule(participant_id, now + self.duration)
+        return True
+
+    def move(self, participant_id: Union[int, str], cell: BaseCell,
+             now: Optional[float] = None) -> Optional[list]:
+        """
+        Учитывает переход участника в клетку.
+
+        Если в клетке выход, часы участника останавливаются. Если после
+        хода время закончилось, участник получит on_expire из планировщика.
+
+        Args:
+            participant_id: Union[int, str] (номер участника)
+            cell: BaseCell (клетка, в которую перешёл участник)
+            now: Optional[float] (текущее время, по умолчанию время
+            планировщика)
+
+        Returns:
+            list: предметы, использованные на этом ходу.
+            None: часы участника не запущены.
+        """
+        end_time = self.aggregator.get_end_time_participant(participant_id)
+        if not end_time:
+            return None
+        if now is None:
+            now = self.scheduler.clock()
+        cell_time, divisor, used_items = get_move_cost(
+            cell, self.aggregator.get_inventory_participant(participant_id))
+        self._consume_effects(participant_id, cell)
+        game_time = self.aggregator.get_game_time_participant(
+            participant_id) or 0.0
+        self.aggregator.set_game_time_participant(participant_id,
+                                                  game_time + cell_time)
+        remaining = end_time - now
+        remaining -= (cell_time - CELL_TIME) * self.cell_seconds
+        remaining /= divisor
+        if any(effect.effect_type is WinEffectType
+               for effect in cell.effects):
+            self.stop(participant_id)
+            return used_items
+        end_time = now + remaining
+        self.aggregator.set_end_time_participant(participant_id, end_time)
+        self._schedule(participant_id, end_time)
+        return used_items
+
+    def _consume_effects(self, participant_id: Union[int, str],
+                         cell: BaseCell) -> None:
+        """
+        Отмечает применённые эффекты клетки использованными участником.
+
+        Эффект победы остаётся: он останавливает часы, а не меняет время.
+        """
+        maze_game = self.aggregator.get_maze_by_participant_id(
+            participant_id)
+        if not maze_game:
+            return
+        maze = maze_game.get_maze()
+        if not isinstance(maze, MazeOverlay):
+            return
+        for effect in cell.effects:
+            if effect.effect_type is not WinEffectType:
+                maze.consume_effect(cell, effect)
+
+    def get_remaining(self, participant_id: Union[int, str],
+                      now: Optional[float] = None) -> Optional[float]:
+        """
+        Возвращает оставшееся реальное время участника в секундах.
+
+        Returns:
+            float: оставшееся время.
+            None: часы участника не запущены.
+        """
+        end_time = self.aggregator.get_end_time_participant(participant_id)
+        if not end_time:
+            return None
+        if now is None:
+            now = self.scheduler.clock()
+        return max(end_time - now, 0.0)
+
+    def stop(self, participant_id: Union[int, str]) -> None:
+        """
+        Останавливает часы участника (победа или выход из комнаты).
+
+        Args:
+            participant_id: Union[int, str] (номер участника)
+        """
+        self.scheduler.cancel(participant_id)
+        self.aggregator.set_end_time_participant(participant_id, None)
+
+    def restore(self) -> int:
+        """
+        Ставит таймеры участников, чья игра шла до перезапуска бота.
+
+        Вызывать из цикла событий после загрузки комнат. Участники, у
+        которых время закончилось, пока бот не работал, получат on_expire
+        сразу.
+
+        Returns:
+            int: количество восстановленных таймеров.
+        """
+        restored = 0
+        for participant_id in self.aggregator.get_participant_ids():
+            end_time = self.aggregator.get_end_time_participant(
+                participant_id)
+            if end_time:
+                self._schedule(participant_id, end_time)
+                restored += 1
+        return restored
+
+    def _schedule(self, participant_id: Union[int, str],
+                  end_time: float) -> None:
+        self.scheduler.schedule(participant_id, end_time, self._expire)
+
+    def _expire(self, participant_id: Union[int, str]):
+        if not self.aggregator.get_end_time_participant(participant_id):
+            # Участник вышел из комнаты или победил.
+            return None
+        self.aggregator.set_end_time_participant(participant_id, None)
+        self.aggregator.save_participant(participant_id)
+        if self.on_expire is not None:
+            return self.on_expire(participant_id)
@@ -0,0 +1,103 @@
+import telebot
+
+from game.abstract.abstract_maze import (BaseCell, WALL_TOP, WALL_RIGHT,
+                                         WALL_BOTTOM, WALL_LEFT, ALL_WALLS)
+from message import BUTTON_FORWARD, BUTTON_RIGHT, BUTTON_BACK, BUTTON_LEFT
+
+# Префикс callback_data inline-кнопок хода (режим edit).
+MOVE_CALLBACK_PREFIX = 'move:'
+
+
+class CachedReplyKeyboardMarkup(telebot.types.ReplyKeyboardMarkup):
+    """
+    Reply-клавиатура, сериализуемая в JSON один раз.
+
+    Клавиатура не должна изменяться после первого вызова to_json.
+    """
+    _json = None
+
+    def to_json(self) -> str:
+        if self._json is None:
+            self._json = super().to_json()
+        return self._json
+
+
+class CachedInlineKeyboardMarkup(telebot.types.InlineKeyboardMarkup):
+    """
+    Inline-клавиатура, сериализуемая в JSON один раз.
+
+    Клавиатура не должна изменяться после первого вызова to_json.
+    """
+    _json = None
+
+    def to_json(self) -> str:
+        if self._json is None:
+            self._json = super().to_json()
+        return self._json
+
+
+def _build_rows(wall_mask: int, button) -> list[list]:
+    """
+    Раскладывает кнопки движения по рядам для клетки с указанными стенами.
+
+    Вперёд - первый ряд, налево и направо - второй, назад - третий.
+    Кнопки в сторону стены не добавляются.
+    """
+    rows = []
+    if not wall_mask & WALL_TOP:
+        rows.append([button(BUTTON_FORWARD)])
+    buttons_left_right = []
+    if not wall_mask & WALL_LEFT:
+        buttons_left_right.append(button(BUTTON_LEFT))
+    if not wall_mask & WALL_RIGHT:
+        buttons_left_right.append(button(BUTTON_RIGHT))
+    if buttons_left_right:
+        rows.append(buttons_left_right)
+    if not wall_mask & WALL_BOTTOM:
+        rows.append([button(BUTTON_BACK)])
+    return rows
+
+
+def _build_move_keyboard(wall_mask: int) -> CachedReplyKeyboardMarkup:
+    keyboard = CachedReplyKeyboardMarkup(resize_keyboard=True)
+    for row in _build_rows(
+            wall_mask,
+            lambda text: telebot.types.KeyboardButton(text=text)):
+        keyboard.add(*row)
+    keyboard.to_json()
+    return keyboard
+
+
+def _build_inline_move_keyboard(wall_mask: int) -> CachedInlineKeyboardMarkup:
+    keyboard = CachedInlineKeyboardMarkup()
+    for row in _build_rows(
+            wall_mask,
+            lambda text: telebot.types.InlineKeyboardButton(
+                text=text,
+                callback_data=MOVE_CALLBACK_PREFIX + text,
+            )):
+        keyboard.add(*row)
+    keyboard.to_json()
+    return keyboard
+
+
+# Клавиатура зависит только от стен клетки, поэтому все 16 вариантов
+# строятся и сериализуются один раз при запуске.
+MOVE_KEYBOARDS = tuple(_build_move_keyboard(wall_mask)
+                       for wall_mask in range(ALL_WALLS + 1))
+INLINE_MOVE_KEYBOARDS = tuple(_build_inline_move_keyboard(wall_mask)
+                              for wall_mask in range(ALL_WALLS + 1))
+
+
+def get_keyboard_moves(cell: BaseCell) -> CachedReplyKeyboardMarkup:
+    """
+    Возвращает готовую reply-клавиатуру движения для клетки.
+    """
+    return MOVE_KEYBOARDS[cell.wall_mask]
+
+
+def get_inline_keyboard_moves(cell: BaseCell) -> CachedInlineKeyboardMarkup:
+    """
+    Возвращает готовую inline-клавиатуру движения для клетки.
+    """
+    return INLINE_MOVE_KEYBOARDS[cell.wall_mask]
@@ -0,0 +1,131 @@
+import asyncio
+from collections import deque
+from typing import Iterable, Union
+
+from telebot.asyncio_helper import ApiTelegramException
+
+# Максимальное количество сообщений в одном вызове deleteMessages.
+DELETE_MESSAGES_LIMIT = 100
+
+
+class MessageStore:
+    """
+    Хранилище игровых сообщений чатов, которые нужно удалить на следующем
+    ходу.
+
+    Для каждого чата хранит очередь (deque) идентификаторов сообщений,
+    поэтому добавление и извлечение работают за O(1).
+
+    Fields:
+        _messages: dict (идентификатор чата -> deque идентификаторов
+            сообщений)
+    """
+
+    def __init__(self):
+        self._messages = {}
+
+    def reset(self, chat_id: Union[int, str]) -> None:
+        """
+        Очищает сообщения чата (например, при начале новой игры).
+
+        Args:
+            chat_id: Union[int, str] (идентификатор чата)
+        """
+        self._messages[chat_id] = deque()
+
+    def add(self, chat_id: Union[int, str], message_id: int) -> None:
+        """
+        Запоминает сообщение чата для последующего удаления.
+
+        Args:
+            chat_id: Union[int, str] (идентификатор чата)
+            message_id: int (идентификатор сообщения)
+        """
+        self._messages.setdefault(chat_id, deque()).append(message_id)
+
+    def pop_all(self, chat_id: Union[int, str]) -> list[int]:
+        """
+        Извлекает все сохранённые сообщения чата.
+
+        Args:
+            chat_id: Union[int, str] (идентификатор чата)
+
+        Returns:
+            list[int]: идентификаторы сообщений в порядке добавления.
+        """
+        stored = self._messages.get(chat_id)
+        if not stored:
+            return []
+        message_ids = list(stored)
+        stored.clear()
+        return message_ids
+
+
+class MessageCleaner:
+    """
+    Удаляет устаревшие сообщения в фоне, не задерживая ответ игроку.
+
+    Сообщения чата удаляются пачками через deleteMessages (до
+    DELETE_MESSAGES_LIMIT сообщений за вызов) вместо отдельного
+    deleteMessage на каждое сообщение. Запросы идут через очередь
+    исходящих запросов с низшим приоритетом: они учитываются в лимитах
+    Bot API и не задерживают ответы игрокам.
+
+    Fields:
+        dispatcher: OutboundDispatcher (очередь исходящих запросов)
+        _tasks: set (запущенные задачи удаления)
+    """
+
+    def __init__(self, dispatcher):
+        self.dispatcher = dispatcher
+        self._tasks = set()
+
+    def schedule(self, chat_id: Union[int, str],
+                 message_ids: Iterable[int]) -> None:
+        """
+        Запускает фоновое удаление сообщений чата.
+
+        Args:
+            chat_id: Union[int, str] (идентификатор чата)
+            message_ids: Iterable[int] (идентификаторы сообщений)
+        """
+        message_ids = list(message_ids)
+        if not message_ids:
+            return
+        task = asyncio.create_task(self.delete(chat_id, message_ids))
+        # Храним ссылку на задачу, иначе она может быть удалена сборщиком
+        # мусора до завершения.
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def drain(self) -> None:
+        """
+        Дожидается завершения всех запущенных удалений (например, перед
+        остановкой бота).
+        """
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def delete(self, chat_id: Union[int, str],
+                     message_ids: list[int]) -> None:
+        """
+        Удаляет сообщения чата пачками.
+
+        Args:
+            chat_id: Union[int, str] (идентификатор чата)
+            message_ids: list[int] (идентификаторы сообщений)
+        """
+        batches = [message_ids[i:i + DELETE_MESSAGES_LIMIT]
+                   for i in range(0, len(message_ids),
+                                  DELETE_MESSAGES_LIMIT)]
+        results = await asyncio.gather(
+            *(self.dispatcher.delete_messages(chat_id, batch)
+              for batch in batches),
+            return_exceptions=True,
+        )
+        for result in results:
+            # Сообщение могло быть уже удалено пользователем, это не ошибка
+            # игры. Остальные ошибки пробрасываем.
+            if isinstance(result, Exception) and \
+                    not isinstance(result, ApiTelegramException):
+                raise result
@@ -0,0 +1,379 @@
+"""
+Метрики бота: гистограммы задержек и счётчики в текстовом формате
+Prometheus.
+
+Обработчики бота оборачиваются декоратором Metrics.timed, методы классов
+(MazeGame, RoomAggregator) - Metrics.instrument. Пока метрики выключены
+(Metrics.enabled == False), обёртка только проверяет флаг и вызывает
+исходную функцию.
+
+Метрики доступны:
+1) По HTTP на локальном порту (Metrics.serve): GET /metrics.
+2) Периодическим сбросом в файл (Metrics.run_dump).
+"""
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+# Границы корзин гистограмм задержек в секундах.
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0,
+                   5.0)
+# Семейства гистограмм: обработчики бота и методы игровых классов.
+HANDLER_FAMILY = 'handler_seconds'
+CALL_FAMILY = 'call_seconds'
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """
+    Гистограмма с фиксированными границами корзин.
+
+    Fields:
+        buckets: tuple[float] (верхние границы корзин)
+        counts: list[int] (количество значений в каждой корзине, последняя
+            - больше всех границ)
+        total: float (сумма значений)
+        count: int (количество значений)
+    """
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def clear(self) -> None:
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def cumulative(self) -> list[int]:
+        """
+        Возвращает накопленные количества по корзинам (как bucket{le=...}
+        в Prometheus), последнее - для le="+Inf".
+        """
+        result = []
+        accumulated = 0
+        for count in self.counts:
+            accumulated += count
+            result.append(accumulated)
+        return result
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def _escape_label(value) -> str:
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label(value)}"'
+                          for key, value in labels.items()) + '}'
+
+
+class Metrics:
+    """
+    Реестр метрик.
+
+    Гистограммы и счётчики обновляются из цикла событий и из фоновых
+    потоков (генерация лабиринтов) без блокировок: при гонке может
+    потеряться одно значение, что для метрик допустимо.
+
+    Fields:
+        namespace: str (префикс имён метрик)
+        enabled: bool (собирать ли метрики)
+        buckets: tuple[float] (границы корзин новых гистограмм)
+        _histograms: dict (семейство -> имя -> Histogram)
+        _counters: dict (семейство -> имя -> значение)
+        _collectors: dict (префикс -> функция, возвращающая словарь
+            значений, например OutboundDispatcher.stats)
+        _dump_task: Optional[asyncio.Task] (задача периодического сброса)
+    """
+
+    def __init__(self, namespace: str = 'ifeelmaze', enabled: bool = False,
+                 buckets: tuple = LATENCY_BUCKETS):
+        self.namespace = namespace
+        self.enabled = enabled
+        self.buckets = buckets
+        self._histograms = {}
+        self._counters = {}
+        self._collectors = {}
+        self._dump_task = None
+
+    def histogram(self, family: str, name: str) -> Histogram:
+        """
+        Возвращает гистограмму (создаёт при первом обращении).
+
+        Args:
+            family: str (семейство, например handler_seconds)
+            name: str (имя в семействе, например create_room)
+
+        Returns:
+            Histogram: гистограмма.
+        """
+        histograms = self._histograms.setdefault(family, {})
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = Histogram(self.buckets)
+        return histogram
+
+    def observe(self, family: str, name: str, value: float) -> None:
+        if self.enabled:
+            self.histogram(family, name).observe(value)
+
+    def inc(self, family: str, name: str, value: float = 1) -> None:
+        """
+        Увеличивает счётчик.
+
+        Args:
+            family: str (семейство, например errors_total)
+            name: str (имя в семействе)
+            value: float (на сколько увеличить)
+        """
+        if self.enabled:
+            counters = self._counters.setdefault(family, {})
+            counters[name] = counters.get(name, 0) + value
+
+    def add_collector(self, prefix: str, collector: Callable[[], dict]
+                      ) -> None:
+        """
+        Добавляет источник значений, которые снимаются при выводе метрик.
+
+        Числовые значения выводятся как gauge <prefix>_<ключ>, вложенные
+        словари - как gauge с меткой key.
+
+        Args:
+            prefix: str (префикс имён, например dispatcher)
+            collector: Callable (функция без аргументов, возвращающая
+            словарь)
+        """
+        self._collectors[prefix] = collector
+
+    def timed(self, name: str, family: str = HANDLER_FAMILY) -> Callable:
+        """
+        Декоратор: замеряет время вызова функции (обычной или корутины).
+
+        Исключения считаются в счётчике errors_total и пробрасываются
+        дальше.
+
+        Args:
+            name: str (имя в семействе)
+            family: str (семейство гистограмм)
+
+        Returns:
+            Callable: декоратор.
+        """
+        def decorator(func: Callable) -> Callable:
+            # Гистограмма создаётся сразу: обёртке не нужен поиск по
+            # словарям, а вывод метрик содержит и ни разу не вызванные
+            # функции.
+            histogram = self.histogram(family, name)
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    start = time.perf_counter()
+                    try:
+                        return await func(*args, **kwargs)
+                    except BaseException:
+                        self.inc('errors_total', name)
+                        raise
+                    finally:
+                        histogram.observe(time.perf_counter() - start)
+            else:
+                @functools.wraps(func)
+                def wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return func(*args, **kwargs)
+                    start = time.perf_counter()
+                    try:
+                        return func(*args, **kwargs)
+                    except BaseException:
+                        self.inc('errors_total', name)
+                        raise
+                    finally:
+                        histogram.observe(time.perf_counter() - start)
+            wrapper.__wrapped_metrics__ = func
+            return wrapper
+        return decorator
+
+    def instrument(self, cls: type, method_names: Iterable[str],
+                   family: str = CALL_FAMILY) -> None:
+        """
+        Оборачивает методы класса декоратором timed с именами
+        <Класс>.<метод>.
+
+        Повторный вызов для уже обёрнутого метода ничего не делает.
+
+        Args:
+            cls: type (класс, например RoomAggregator)
+            method_names: Iterable[str] (имена методов)
+            family: str (семейство гистограмм)
+        """
+        for method_name in method_names:
+            method = cls.__dict__.get(method_name)
+            if method is None:
+                raise AttributeError(f'{cls.__name__} не определяет метод '
+                                     f'{method_name}')
+            if hasattr(method, '__wrapped_metrics__'):
+                continue
+            setattr(cls, method_name, self.timed(
+                f'{cls.__name__}.{method_name}', family)(method))
+
+    def render(self) -> str:
+        """
+        Возвращает метрики в текстовом формате Prometheus.
+        """
+        namespace = self.namespace
+        lines = []
+        for family, histograms in sorted(self._histograms.items()):
+            metric = f'{namespace}_{family}'
+            lines.append(f'# TYPE {metric} histogram')
+            for name, histogram in sorted(histograms.items()):
+                bounds = [repr(bound) for bound in histogram.buckets]
+                bounds.append('+Inf')
+                for bound, count in zip(bounds, histogram.cumulative()):
+                    labels = _format_labels({'name': name, 'le': bound})
+                    lines.append(f'{metric}_bucket{labels} {count}')
+                labels = _format_labels({'name': name})
+                lines.append(f'{metric}_sum{labels} '
+                             f'{_format_value(histogram.total)}')
+                lines.append(f'{metric}_count{labels} {histogram.count}')
+        for family, counters in sorted(self._counters.items()):
+            metric = f'{namespace}_{family}'
+            lines.append(f'# TYPE {metric} counter')
+            for name, value in sorted(counters.items()):
+                lines.append(f'{metric}{_format_labels({"name": name})} '
+                             f'{_format_value(value)}')
+        for prefix, collector in sorted(self._collectors.items()):
+            try:
+                values = collector()
+            except Exception:
+                logger.exception('Ошибка сбора метрик %s', prefix)
+                continue
+            for key, value in values.items():
+                metric = f'{namespace}_{prefix}_{key}'
+                if isinstance(value, dict):
+                    lines.append(f'# TYPE {metric} gauge')
+                    for label, item in value.items():
+                        labels = _format_labels({'key': label})
+                        lines.append(f'{metric}{labels} '
+                                     f'{_format_value(item)}')
+                elif isinstance(value, (int, float)):
+                    lines.append(f'# TYPE {metric} gauge')
+                    lines.append(f'{metric} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        """
+        Обнуляет гистограммы и счётчики (источники значений остаются).
+        """
+        for histograms in self._histograms.values():
+            for histogram in histograms.values():
+                histogram.clear()
+        self._counters = {}
+
+    def dump(self, path: str) -> None:
+        """
+        Записывает метрики в файл. Файл заменяется целиком, поэтому
+        читатель не увидит недописанные метрики.
+
+        Args:
+            path: str (путь к файлу)
+        """
+        temporary_path = f'{path}.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            file.write(self.render())
+        os.replace(temporary_path, path)
+
+    async def run_dump(self, path: str, interval: float) -> None:
+        """
+        Записывает метрики в файл каждые interval секунд, пока задачу не
+        отменят.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.dump(path)
+            except OSError:
+                logger.exception('Не удалось записать метрики в %s', path)
+
+    def start_dump(self, path: str, interval: float) -> asyncio.Task:
+        """
+        Запускает периодический сброс метрик в файл (из цикла событий).
+        """
+        if self._dump_task is None or self._dump_task.done():
+            self._dump_task = asyncio.create_task(
+                self.run_dump(path, interval))
+        return self._dump_task
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 9100
+                    ) -> asyncio.AbstractServer:
+        """
+        Запускает HTTP-сервер метрик: на любой GET-запрос отвечает текущими
+        метриками.
+
+        Args:
+            host: str (адрес, по умолчанию только локальный)
+            port: int (порт)
+
+        Returns:
+            asyncio.AbstractServer: запущенный сервер.
+        """
+        return await asyncio.start_server(self._handle_request, host, port)
+
+    async def _handle_request(self, reader: asyncio.StreamReader,
+                              writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            # Заголовки запроса не нужны, но их нужно дочитать.
+            while (await reader.readline()).strip():
+                pass
+            if request_line.startswith(b'GET '):
+                status = '200 OK'
+                body = self.render().encode()
+            else:
+                status = '405 Method Not Allowed'
+                body = b''
+            writer.write(
+                f'HTTP/1.1 {status}\r\n'
+                f'Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n'
+                f'Content-Length: {len(body)}\r\n'
+                f'Connection: close\r\n\r\n'.encode() + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def get_metrics_port(port: int, shard: Optional[int] = None) -> int:
+    """
+    Возвращает порт сервера метрик процесса: шарды (runtime.sharding)
+    слушают порты port + 1 + номер шарда, чтобы не конфликтовать.
+    """
+    if not port or shard is None:
+        return port
+    return port + 1 + shard
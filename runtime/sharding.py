@@ -0,0 +1,357 @@
+"""
+Шардирование комнат по процессам.
+
+Фронт-процесс получает обновления (getUpdates) и пересылает их через
+очереди multiprocessing процессам-шардам. Каждый шард - отдельный процесс
+с собственным ботом (main), агрегатором комнат и хранилищем, поэтому
+обработка обновлений использует столько ядер, сколько шардов.
+
+Маршрутизация:
+1) Комната принадлежит шарду int(номер комнаты) % количество шардов.
+   Шард создаёт комнаты только с такими номерами (RoomAggregator.set_shard).
+2) Участник, состоящий в комнате, направляется в шард своей комнаты.
+   Шарды сообщают фронту, состоят ли в комнате чаты обработанных
+   обновлений.
+3) Остальные чаты направляются в домашний шард: chat_id % количество
+   шардов.
+4) После нажатия "Войти в комнату" номер комнаты ждёт фронт: сообщение с
+   номером уходит в шард этой комнаты, и шард обрабатывает его как ввод
+   номера комнаты (main.join_to_room). Пока шард не сообщил, вошёл ли
+   участник в комнату, остальные обновления чата тоже идут в этот шард,
+   чтобы не обогнать вход в комнату.
+"""
+import asyncio
+import logging
+import multiprocessing
+import queue
+from typing import Optional, Union
+
+from telebot import asyncio_helper
+from telebot.types import Update
+
+from message import JOIN_TO_ROOM_TEXT, BUTTON_BACK_TEXT
+
+# События шардов для фронт-процесса: (тип, номер шарда, данные).
+# membership: данные - (идентификатор чата, состоит ли в комнате).
+EVENT_MEMBERSHIP = 'membership'
+# processed: данные - количество обработанных обновлений.
+EVENT_PROCESSED = 'processed'
+
+logger = logging.getLogger(__name__)
+
+
+def get_chat_id(update: dict) -> Optional[int]:
+    """
+    Возвращает идентификатор чата обновления без разбора в объекты telebot.
+
+    Args:
+        update: dict (JSON обновления)
+
+    Returns:
+        int: идентификатор чата.
+        None: у обновления нет чата.
+    """
+    message = update.get('message') or update.get('edited_message')
+    if message:
+        return message['chat']['id']
+    callback_query = update.get('callback_query')
+    if callback_query:
+        if callback_query.get('message'):
+            return callback_query['message']['chat']['id']
+        return callback_query['from']['id']
+    return None
+
+
+def get_text(update: dict) -> Optional[str]:
+    message = update.get('message')
+    if message:
+        return message.get('text')
+    return None
+
+
+def shard_storage_path(path: Optional[str], index: int) -> Optional[str]:
+    """
+    Возвращает путь к базе комнат шарда.
+    """
+    if not path:
+        return path
+    return f'{path}.shard{index}'
+
+
+class ShardRouter:
+    """
+    Выбирает шард для обновления.
+
+    Fields:
+        shards: int (количество шардов)
+        _participant_shards: dict (идентификатор чата -> шард комнаты, в
+            которой он состоит)
+        _waiting_room_number: set (чаты, от которых ждём номер комнаты)
+        _joining_shards: dict (идентификатор чата -> шард комнаты, в
+            который отправлен номер комнаты, пока шард не сообщил о входе)
+    """
+
+    def __init__(self, shards: int):
+        self.shards = shards
+        self._participant_shards = {}
+        self._waiting_room_number = set()
+        self._joining_shards = {}
+
+    def get_room_shard(self, room_number: Union[int, str]) -> int:
+        return int(room_number) % self.shards
+
+    def get_home_shard(self, chat_id: int) -> int:
+        return chat_id % self.shards
+
+    def route(self, update: dict) -> tuple[int, bool]:
+        """
+        Выбирает шард для обновления.
+
+        Args:
+            update: dict (JSON обновления)
+
+        Returns:
+            tuple[int, bool]: номер шарда и признак того, что сообщение -
+            ввод номера комнаты.
+        """
+        chat_id = get_chat_id(update)
+        if chat_id is None:
+            return 0, False
+        joining_shard = self._joining_shards.get(chat_id)
+        if joining_shard is not None:
+            # Шард комнаты ещё не сообщил о входе: обновление в домашнем
+            # шарде обогнало бы вход в комнату.
+            return joining_shard, False
+        text = get_text(update)
+        if chat_id in self._waiting_room_number and text is not None:
+            if text == BUTTON_BACK_TEXT:
+                self._waiting_room_number.discard(chat_id)
+            if text.isdigit():
+                # Ждём номер, пока шард не сообщит о входе в комнату: при
+                # ошибке участник вводит номер ещё раз.
+                shard = self.get_room_shard(text)
+                self._joining_shards[chat_id] = shard
+                return shard, True
+            return self.get_home_shard(chat_id), True
+        shard = self._participant_shards.get(chat_id)
+        if shard is not None:
+            return shard, False
+        if text == JOIN_TO_ROOM_TEXT:
+            self._waiting_room_number.add(chat_id)
+        return self.get_home_shard(chat_id), False
+
+    def route_batch(self, updates: list[dict]
+                    ) -> dict[int, list[tuple[dict, bool]]]:
+        """
+        Раскладывает пачку обновлений по шардам с сохранением порядка.
+
+        Returns:
+            dict: номер шарда -> список (обновление, ввод номера комнаты).
+        """
+        batches = {}
+        for update in updates:
+            shard, room_number_step = self.route(update)
+            batches.setdefault(shard, []).append((update, room_number_step))
+        return batches
+
+    def apply_event(self, kind: str, shard: int, payload) -> None:
+        """
+        Учитывает событие шарда.
+
+        Args:
+            kind: str (тип события)
+            shard: int (номер шарда)
+            payload: данные события
+        """
+        if kind != EVENT_MEMBERSHIP:
+            return
+        chat_id, in_room = payload
+        if self._joining_shards.get(chat_id) == shard:
+            del self._joining_shards[chat_id]
+        if in_room:
+            self._participant_shards[chat_id] = shard
+            self._waiting_room_number.discard(chat_id)
+        elif self._participant_shards.get(chat_id) == shard:
+            del self._participant_shards[chat_id]
+
+    def apply_events(self, events: multiprocessing.Queue) -> None:
+        """
+        Учитывает все события, уже пришедшие от шардов.
+        """
+        while True:
+            try:
+                kind, shard, payload = events.get_nowait()
+            except queue.Empty:
+                return
+            self.apply_event(kind, shard, payload)
+
+
+async def _process_batch(bot_main, batch: list[tuple[dict, bool]]) -> None:
+    updates = []
+    room_number_messages = []
+    for raw_update, room_number_step in batch:
+        update = Update.de_json(raw_update)
+        if room_number_step and update.message:
+            room_number_messages.append(update.message)
+        else:
+            updates.append(update)
+    await asyncio.gather(
+        bot_main.bot.process_new_updates(updates),
+        *(bot_main.join_to_room(message) for message in room_number_messages),
+    )
+
+
+async def serve_shard(index: int,
+                      count: int,
+                      updates: multiprocessing.Queue,
+                      events: multiprocessing.Queue,
+                      ) -> None:
+    """
+    Обрабатывает обновления, пересланные фронт-процессом, пока не придёт
+    None.
+
+    Args:
+        index: int (номер шарда)
+        count: int (количество шардов)
+        updates: multiprocessing.Queue (пачки обновлений от фронта)
+        events: multiprocessing.Queue (события для фронта)
+    """
+    # Бот импортируется в процессе шарда, после настройки окружения.
+    import main as bot_main
+    from config import ROOM_STORAGE_PATH
+
+    bot_main.ROOM_NUMBER_STEP_ON_FRONT = True
+    aggregator = bot_main.ROOM_AGGREGATOR
+    aggregator.set_shard(index, count)
+    bot_main.setup_storage(shard_storage_path(ROOM_STORAGE_PATH, index))
+    bot_main.MAZE_POOL.start()
+    bot_main.GAME_CLOCK.restore()
+    bot_main.start_storage_flush()
+    await bot_main.start_metrics(index)
+    # После перезапуска фронт узнаёт, в каких комнатах состоят участники.
+    for participant_id in aggregator.get_participant_ids():
+        events.put((EVENT_MEMBERSHIP, index, (participant_id, True)))
+
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            batch = await loop.run_in_executor(None, updates.get)
+            if batch is None:
+                break
+            try:
+                await _process_batch(bot_main, batch)
+            except Exception:
+                logger.exception('Ошибка обработки обновлений в шарде %s',
+                                 index)
+            chat_ids = {get_chat_id(update) for update, _ in batch}
+            chat_ids.discard(None)
+            for chat_id in chat_ids:
+                in_room = bool(aggregator.get_room_by_participant(chat_id))
+                events.put((EVENT_MEMBERSHIP, index, (chat_id, in_room)))
+            events.put((EVENT_PROCESSED, index, len(batch)))
+        await bot_main.TIMERS.drain()
+        # Удаления сообщений тоже идут через очередь исходящих запросов,
+        # поэтому очередь дожидается последней.
+        await bot_main.MESSAGE_CLEANER.drain()
+        await bot_main.DISPATCHER.drain()
+    finally:
+        bot_main.close_storage()
+
+
+def run_shard(index: int,
+              count: int,
+              updates: multiprocessing.Queue,
+              events: multiprocessing.Queue,
+              ) -> None:
+    """
+    Точка входа процесса-шарда.
+    """
+    asyncio.run(serve_shard(index, count, updates, events))
+
+
+def start_shards(count: int, target=run_shard
+                 ) -> tuple[list, list, multiprocessing.Queue]:
+    """
+    Запускает процессы-шарды.
+
+    Процессы запускаются через spawn: каждый шард заново импортирует бота
+    и не наследует состояние фронт-процесса.
+
+    Args:
+        count: int (количество шардов)
+        target: Callable (точка входа шарда с аргументами run_shard)
+
+    Returns:
+        tuple: процессы, очереди обновлений шардов и очередь событий.
+    """
+    context = multiprocessing.get_context('spawn')
+    events = context.Queue()
+    queues = [context.Queue() for _ in range(count)]
+    processes = [
+        context.Process(target=target, args=(index, count, updates, events),
+                        name=f'shard-{index}', daemon=True)
+        for index, updates in enumerate(queues)
+    ]
+    for process in processes:
+        process.start()
+    return processes, queues, events
+
+
+def stop_shards(processes: list, queues: list, timeout: float = 10) -> None:
+    """
+    Останавливает шарды, дожидаясь обработки уже пересланных обновлений.
+    """
+    for updates in queues:
+        updates.put(None)
+    for process in processes:
+        process.join(timeout)
+
+
+async def poll_front(token: str,
+                     router: ShardRouter,
+                     queues: list,
+                     events: multiprocessing.Queue,
+                     timeout: int = 20,
+                     ) -> None:
+    """
+    Получает обновления через long polling и пересылает их шардам.
+
+    Args:
+        token: str (токен бота)
+        router: ShardRouter (маршрутизатор)
+        queues: list (очереди обновлений шардов)
+        events: multiprocessing.Queue (события шардов)
+        timeout: int (таймаут long polling в секундах)
+    """
+    offset = None
+    while True:
+        try:
+            updates = await asyncio_helper.get_updates(
+                token, offset=offset, timeout=timeout,
+                request_timeout=timeout + 5)
+        except Exception:
+            logger.exception('Ошибка получения обновлений')
+            await asyncio.sleep(1)
+            continue
+        if not updates:
+            continue
+        router.apply_events(events)
+        for shard, batch in router.route_batch(updates).items():
+            queues[shard].put(batch)
+        offset = updates[-1]['update_id'] + 1
+
+
+def run_front(count: int) -> None:
+    """
+    Запускает фронт-процесс и count процессов-шардов.
+
+    Args:
+        count: int (количество шардов)
+    """
+    from config import TOKEN
+
+    processes, queues, events = start_shards(count)
+    try:
+        asyncio.run(poll_front(TOKEN, ShardRouter(count), queues, events))
+    finally:
+        stop_shards(processes, queues)
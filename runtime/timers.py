@@ -0,0 +1,217 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Отменённые записи остаются в куче до извлечения. Если их стало больше
+# половины (и не меньше COMPACT_MIN), куча перестраивается.
+COMPACT_MIN = 1024
+
+
+class TimerScheduler:
+    """
+    Общий планировщик таймеров всех комнат.
+
+    Таймеры хранятся в одной двоичной куче по времени срабатывания, их
+    обслуживает одна задача asyncio, которая спит до ближайшего срока.
+    Постановка, перенос и отмена таймера стоят O(log n) и O(1) и не создают
+    задач и потоков, поэтому десятки тысяч активных таймеров почти ничего не
+    стоят.
+
+    Перенос и отмена не ищут запись в куче: старая запись помечается
+    отменённой и пропускается при извлечении.
+
+    Fields:
+        clock: Callable (текущее время в секундах, по умолчанию time.time)
+        fired: int (количество сработавших таймеров)
+        _heap: list (записи [срок, номер, ключ, функция])
+        _timers: dict (ключ таймера -> активная запись)
+        _cancelled: int (отменённые записи, оставшиеся в куче)
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.fired = 0
+        self._heap = []
+        self._timers = {}
+        self._cancelled = 0
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self._tasks = set()
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def schedule(self, key: Hashable, deadline: float,
+                 callback: Callable[[Hashable], object]) -> None:
+        """
+        Ставит таймер или переносит уже поставленный таймер с тем же ключом.
+
+        Если вызван из цикла событий, при необходимости запускает задачу
+        обслуживания таймеров. Таймеры, поставленные вне цикла, начнут
+        срабатывать после постановки таймера из цикла.
+
+        Args:
+            key: Hashable (ключ таймера, например идентификатор участника)
+            deadline: float (время срабатывания в единицах clock)
+            callback: Callable (функция от ключа, может вернуть корутину)
+        """
+        self._discard(key)
+        entry = [deadline, next(self._seq), key, callback]
+        self._timers[key] = entry
+        heapq.heappush(self._heap, entry)
+        self._ensure_worker()
+        if self._heap[0] is entry:
+            # Новый таймер раньше остальных: задача должна проснуться
+            # раньше, чем собиралась.
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Отменяет таймер.
+
+        Args:
+            key: Hashable (ключ таймера)
+
+        Returns:
+            bool:
+                True - таймер отменён
+                False - таймера с таким ключом нет
+        """
+        return self._discard(key)
+
+    def get_deadline(self, key: Hashable) -> Optional[float]:
+        """
+        Возвращает время срабатывания таймера или None, если таймера нет.
+        """
+        entry = self._timers.get(key)
+        if entry is not None:
+            return entry[0]
+
+    def next_deadline(self) -> Optional[float]:
+        """
+        Возвращает время срабатывания ближайшего таймера.
+
+        Returns:
+            float: время срабатывания.
+            None: таймеров нет.
+        """
+        heap = self._heap
+        while heap and heap[0][3] is None:
+            heapq.heappop(heap)
+            self._cancelled -= 1
+        return heap[0][0] if heap else None
+
+    def pop_expired(self, now: Optional[float] = None) -> list[tuple]:
+        """
+        Извлекает таймеры, срок которых наступил.
+
+        Args:
+            now: Optional[float] (текущее время, по умолчанию clock())
+
+        Returns:
+            list[tuple]: пары (ключ, функция) в порядке сроков.
+        """
+        if now is None:
+            now = self.clock()
+        heap = self._heap
+        expired = []
+        while heap and heap[0][0] <= now:
+            _, _, key, callback = heapq.heappop(heap)
+            if callback is None:
+                self._cancelled -= 1
+                continue
+            del self._timers[key]
+            expired.append((key, callback))
+        return expired
+
+    def _discard(self, key: Hashable) -> bool:
+        entry = self._timers.pop(key, None)
+        if entry is None:
+            return False
+        entry[3] = None
+        self._cancelled += 1
+        # Перенос таймера на каждом ходу тоже оставляет отменённую запись,
+        # поэтому куча проверяется при любом удалении записи.
+        if self._cancelled >= COMPACT_MIN and \
+                self._cancelled * 2 > len(self._heap):
+            self._compact()
+        return True
+
+    def _compact(self) -> None:
+        self._heap = [entry for entry in self._heap if entry[3] is not None]
+        heapq.heapify(self._heap)
+        self._cancelled = 0
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and not self._worker.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._worker = loop.create_task(self._run())
+
+    async def _wait(self, timeout: Optional[float]) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None:
+                # Таймеров нет: задача завершается и будет запущена заново
+                # при постановке следующего таймера.
+                self._worker = None
+                return
+            timeout = deadline - self.clock()
+            if timeout > 0:
+                await self._wait(timeout)
+                continue
+            for key, callback in self.pop_expired():
+                self._fire(key, callback)
+
+    def _fire(self, key: Hashable, callback: Callable) -> None:
+        self.fired += 1
+        try:
+            result = callback(key)
+        except Exception:
+            # Ошибка одного таймера не должна останавливать остальные.
+            logger.exception('Ошибка таймера %r', key)
+            return
+        if asyncio.iscoroutine(result):
+            task = asyncio.create_task(result)
+            self._tasks.add(task)
+            task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error('Ошибка таймера', exc_info=task.exception())
+
+    async def drain(self) -> None:
+        """
+        Дожидается завершения уже запущенных обработчиков таймеров.
+        """
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stop(self) -> None:
+        """
+        Останавливает задачу обслуживания таймеров. Поставленные таймеры
+        сохраняются и начнут срабатывать при следующей постановке таймера.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None